@@ -47,6 +47,10 @@ python manage.py makemigrations --noinput
 echo -e "${YELLOW}🔄 Running database migrations...${NC}"
 python manage.py migrate --noinput
 
+# Create cache table (CACHE_BACKEND=database)
+echo -e "${YELLOW}🗄️  Creating cache table...${NC}"
+python manage.py createcachetable
+
 # Collect static files
 echo -e "${YELLOW}📦 Collecting static files...${NC}"
 python manage.py collectstatic --noinput
@@ -5,10 +5,12 @@ from .student_actor import StudentActor
 from .score_actor import ScoreActor
 from .test_actor import TestActor
 from .testfiledata_actor import TestFiledataActor
+from .event_actor import EventActor
 
 __all__ = [
     'StudentActor',
     'ScoreActor',
     'TestActor',
     'TestFiledataActor',
+    'EventActor',
 ]
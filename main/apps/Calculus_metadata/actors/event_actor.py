@@ -0,0 +1,64 @@
+"""
+Event Actor - 即時異動推送 (Server-Sent Events)
+"""
+import json
+import logging
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+from main.apps.Calculus_metadata.services.common import ValidationService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.apps.Calculus_metadata.services.optional.events import EventService
+from main.utils.async_views import async_csrf_exempt, async_require_http_methods
+from main.utils.response import error_response
+from main.utils.logger import LogPayload
+
+logger = logging.getLogger(__name__)
+
+
+class EventActor:
+    """事件 Actor - 推送學期內成績 / 學生 / 考試的異動事件，取代輪詢"""
+
+    @staticmethod
+    @async_csrf_exempt
+    @async_require_http_methods(["POST"])
+    async def stream(request):
+        """
+        訂閱學期異動事件（text/event-stream，需以 ASGI 伺服器啟動）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Event_MetadataWriter/stream
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Opening event stream: %s", LogPayload(data))
+
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(data, ['semester'])
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+
+            try:
+                cursor, _, _ = ChangeFeedService.parse_request(data)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+
+            # Step 3: 長連線串流僅支援 ASGI（WSGI worker 會被占住）
+            if not isinstance(request, ASGIRequest):
+                return error_response(
+                    "Event stream requires an ASGI server (uvicorn main.asgi:application)", None, 501
+                )
+
+            # Step 4: 回傳 SSE 串流（帶 cursor 時先補送遺漏的異動）
+            response = StreamingHttpResponse(
+                EventService.stream(str(data['semester']), cursor if 'cursor' in data else None),
+                content_type='text/event-stream'
+            )
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error opening event stream: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
@@ -3,27 +3,27 @@ Score Actor - 分數管理
 """
 import json
 import logging
-import io
-import os
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
 from django.http import HttpResponse
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # 使用非 GUI 後端
-    import matplotlib.pyplot as plt
-    import matplotlib.font_manager as fm
-except ImportError:
-    plt = None
-    fm = None
-
-from main.apps.Calculus_metadata.models import Score, Students, Test
+from asgiref.sync import sync_to_async
+from main.apps.Calculus_metadata.models import Score, Students
 from main.apps.Calculus_metadata.serializers import ScoreWriteSerializer, ScoreReadSerializer
 from main.apps.Calculus_metadata.services.common import UuidService, TimestampService, ValidationService
 from main.apps.Calculus_metadata.services.business import SqlDbBusinessService, NoSqlDbBusinessService
-from main.apps.Calculus_metadata.services.optional.calculation import CalculationService
+from main.apps.Calculus_metadata.services.optional.calculation import (
+    BinningService, CalculationRunService, CalculationService, ExamSlotService, ScoreMatrixService,
+    SemesterScoreMatrix
+)
+from main.apps.Calculus_metadata.services.optional.partition import SemesterPartitionService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.apps.Calculus_metadata.services.optional.rendering import ChartRenderService
+from main.apps.Calculus_metadata.services.optional.summary import SemesterSummaryService
 from main.utils.response import success_response, error_response
+from main.utils.async_views import async_csrf_exempt, async_require_http_methods
+from main.utils.background import submit_background_task, create_background_task
+from main.utils.logger import LogPayload
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +43,7 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Creating/Updating score with data: {data}")
+            logger.info("Creating/Updating score with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
@@ -70,7 +70,7 @@ class ScoreActor:
             # Step 6: 查詢是否已有成績記錄
             existing_score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', data['f_student_uuid'])
             
-            timestamp = TimestampService.get_current_timestamp()
+            timestamp = TimestampService.get_current_datetime()
             
             if existing_score:
                 # 更新現有成績
@@ -83,10 +83,13 @@ class ScoreActor:
                 message = "Score updated successfully"
             else:
                 # 創建新成績記錄
+                SemesterPartitionService.ensure_partition(Score, student.student_semester)
                 score_uuid = UuidService.generate_score_uuid(student.student_semester)
                 score_data = {
                     'score_uuid': score_uuid,
+                    'student': student,
                     'f_student_uuid': data['f_student_uuid'],
+                    'score_semester': student.student_semester,
                     'score_quiz1': '',
                     'score_midterm': '',
                     'score_quiz2': '',
@@ -100,13 +103,13 @@ class ScoreActor:
                 output = ScoreReadSerializer(new_score).data
                 message = "Score created successfully"
             
-            logger.info(f"Score operation successful for student: {data['f_student_uuid']}")
+            logger.info("Score operation successful for student: %s", data['f_student_uuid'])
             return success_response(output, message, 201)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error creating/updating score: {str(e)}")
+            logger.error("Error creating/updating score: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -121,7 +124,7 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Updating score with data: {data}")
+            logger.info("Updating score with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
@@ -148,20 +151,20 @@ class ScoreActor:
             # Step 6: 更新分數
             update_data = {
                 data['update_field']: str(data['score_value']),
-                'score_updated_at': TimestampService.get_current_timestamp()
+                'score_updated_at': TimestampService.get_current_datetime()
             }
             updated_score = SqlDbBusinessService.update_entity(score, update_data)
             
             # Step 7: 格式化輸出
             output = ScoreReadSerializer(updated_score).data
-            logger.info(f"Score updated successfully: {data['score_uuid']}")
+            logger.info("Score updated successfully: %s", data['score_uuid'])
             
             return success_response(output, "Score updated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error updating score: {str(e)}")
+            logger.error("Error updating score: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -176,7 +179,7 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Deleting score with data: {data}")
+            logger.info("Deleting score with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['score_uuid'])
@@ -191,13 +194,13 @@ class ScoreActor:
             # Step 4: 刪除成績
             SqlDbBusinessService.delete_entity(score)
 
-            logger.info(f"Score deleted successfully: {data['score_uuid']}")
+            logger.info("Score deleted successfully: %s", data['score_uuid'])
             return success_response(None, "Score deleted successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error deleting score: {str(e)}")
+            logger.error("Error deleting score: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -211,35 +214,99 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Reading scores with filters: {data}")
+            logger.info("Reading scores with filters: %s", LogPayload(data))
+            include_rank = bool(data.pop('include_rank', False))
             
             # Step 2: 查詢成績 (統一返回數組格式)
             if 'score_uuid' in data:
                 score = SqlDbBusinessService.get_entity(Score, 'score_uuid', data['score_uuid'])
                 if not score:
                     return error_response("Score not found", None, 404)
-                output = ScoreReadSerializer([score], many=True).data
+                scores = [score]
             elif 'f_student_uuid' in data:
                 score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', data['f_student_uuid'])
                 if not score:
                     return error_response("Score not found", None, 404)
-                output = ScoreReadSerializer([score], many=True).data
+                scores = [score]
             elif data:
                 scores = SqlDbBusinessService.get_entities(Score, data)
-                output = ScoreReadSerializer(scores, many=True).data
             else:
                 scores = SqlDbBusinessService.get_entities(Score, {})
-                output = ScoreReadSerializer(scores, many=True).data
+            output = ScoreReadSerializer(scores, many=True).data
+            
+            # Step 3: 附加學期名次與百分位（自學期成績矩陣的排名索引查詢）
+            if include_rank:
+                matrices = ScoreMatrixService.get_matrices([score.score_semester for score in scores])
+                ScoreActor._attach_ranks(scores, output, matrices)
+            
+            logger.info("Scores retrieved successfully")
+            return success_response(output, "Scores retrieved successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error reading scores: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+    
+    @staticmethod
+    @async_csrf_exempt
+    @async_require_http_methods(["POST"])
+    async def read_async(request):
+        """
+        查詢分數（async ORM 版本，ASYNC_ACTORS=True 時掛載於 read 路徑）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/read
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading scores with filters: %s", LogPayload(data))
+            include_rank = bool(data.pop('include_rank', False))
             
-            logger.info(f"Scores retrieved successfully")
+            # Step 2: 查詢成績 (統一返回數組格式)
+            if 'score_uuid' in data or 'f_student_uuid' in data:
+                uuid_field = 'score_uuid' if 'score_uuid' in data else 'f_student_uuid'
+                score = await SqlDbBusinessService.aget_entity(Score, uuid_field, data[uuid_field])
+                if not score:
+                    return error_response("Score not found", None, 404)
+                scores = [score]
+            else:
+                scores = await SqlDbBusinessService.aget_entities(Score, data)
+            output = ScoreReadSerializer(scores, many=True).data
+            
+            # Step 3: 附加學期名次與百分位（自學期成績矩陣的排名索引查詢）
+            if include_rank:
+                matrices = await sync_to_async(ScoreMatrixService.get_matrices)(
+                    [score.score_semester for score in scores]
+                )
+                ScoreActor._attach_ranks(scores, output, matrices)
+            
+            logger.info("Scores retrieved successfully")
             return success_response(output, "Scores retrieved successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error reading scores: {str(e)}")
+            logger.error("Error reading scores: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
+    @staticmethod
+    def _attach_ranks(scores, output, matrices) -> None:
+        """
+        於讀取結果加入 score_rank：{分數欄位: {rank, percentile, count} 或 None}
+
+        Args:
+            scores: Score 實例列表（與 output 順序一致）
+            output: ScoreReadSerializer 輸出
+            matrices: {學期: SemesterScoreMatrix}
+        """
+        for score, item in zip(scores, output):
+            matrix = matrices.get(score.score_semester)
+            row = matrix.row_of(score.student_id) if matrix is not None else None
+            item['score_rank'] = {
+                field: None if row is None else matrix.rank(row, field)
+                for field in SemesterScoreMatrix.SCORE_FIELDS
+            }
+
     @staticmethod
     @csrf_exempt
     @require_http_methods(["POST"])
@@ -252,7 +319,7 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Calculating final scores for semester: {data}")
+            logger.info("Calculating final scores for semester: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_semester', 'passing_score'])
@@ -262,70 +329,110 @@ class ScoreActor:
             semester = data['test_semester']
             passing_threshold = float(data['passing_score'])
             
-            # Step 3: 獲取該學期所有考試權重
-            tests = SqlDbBusinessService.get_entities(Test, {'test_semester': semester})
-            if not tests:
+            # Step 3: 獲取該學期各考試項目（test_slot）的權重
+            slot_tests = ExamSlotService.get_slot_tests(semester)
+            unassigned_tests = ExamSlotService.get_unassigned_tests(semester)
+            if not slot_tests and not unassigned_tests:
                 return error_response("No tests found for this semester", None, 404)
             
-            weights = {}
-            for test in tests:
-                if test.test_weight:
-                    weights[test.test_name] = float(test.test_weight)
+            # 有權重但未指定考試項目的考試無法對應分數欄位，不可略過
+            unassigned_weighted = [test.test_name for test in unassigned_tests if test.test_weight]
+            if unassigned_weighted:
+                return error_response(f"Weighted tests without test_slot: {unassigned_weighted}", None, 400)
+            
+            weights = {slot: float(test.test_weight) for slot, test in slot_tests.items() if test.test_weight}
             
             if not weights or sum(weights.values()) != 1.0:
                 return error_response("Test weights invalid or not sum to 1.0", None, 400)
             
-            # Step 4: 獲取該學期所有學生
-            students = SqlDbBusinessService.get_entities(Students, {'student_semester': semester})
+            # Step 4: 決定計算範圍（incremental 需上次計算的權重與及格分數相同，否則改為全量）
+            mode = data.get('mode', CalculationRunService.MODE_FULL)
+            if mode not in CalculationRunService.MODES:
+                return error_response(f"mode must be one of: {', '.join(CalculationRunService.MODES)}", None, 400)
+            inputs_hash = CalculationRunService.inputs_hash(weights, passing_threshold)
+            # 讀取資料前的游標（只含已提交的異動）：計算期間仍未提交的修正與本次寫入皆落在游標之後，
+            # 下次增量計算時會重新檢查
+            cursor = ChangeFeedService.latest_cursor(ScoreMatrixService.SOURCE_ENTITIES, semester)
+            if mode == CalculationRunService.MODE_INCREMENTAL:
+                last_run = CalculationRunService.last_run(semester)
+                if last_run is None or last_run.run_inputs_hash != inputs_hash:
+                    logger.info("No matching previous run for %s, falling back to full calculation", semester)
+                    mode = CalculationRunService.MODE_FULL
+                elif CalculationRunService.is_expired(last_run):
+                    logger.info("Previous run for %s predates change_log retention, falling back to full calculation", semester)
+                    mode = CalculationRunService.MODE_FULL
+            
+            # Step 5: 取得需計算的學生（四次考試皆已填寫，跳過二退學生）
+            exam_fields = ScoreActor.FINAL_EXAM_FIELDS
+            weighted_fields = [(slot, field) for slot, field in exam_fields if slot in weights]
+            if mode == CalculationRunService.MODE_FULL:
+                # 重新建立學期成績矩陣（寫入流程不使用快取）
+                matrix = ScoreMatrixService.get_matrix(semester, refresh=True)
+                complete_rows = matrix.complete_rows([field for _, field in exam_fields])
+                score_matrix = matrix.matrix([field for _, field in weighted_fields], complete_rows)
+                score_entities = SqlDbBusinessService.get_entities_with_related(
+                    Score, {'id__in': [matrix.score_ids[row] for row in complete_rows]}, ['student']
+                )
+                scores_by_id = {score.id: score for score in score_entities}
+                targets = [scores_by_id.get(matrix.score_ids[row]) for row in complete_rows]
+            else:
+                score_matrix, targets = [], []
+                for score in CalculationRunService.dirty_scores(semester, last_run.run_cursor):
+                    values = CalculationRunService.eligible_values(score, semester, [field for _, field in exam_fields])
+                    if values is None:
+                        continue
+                    score_matrix.append([values[field] for _, field in weighted_fields])
+                    targets.append(score)
+            
+            # Step 6: 批次計算加權總分與及格判定
+            totals = CalculationService.calculate_weighted_totals(
+                score_matrix, [weights[slot] for slot, _ in weighted_fields]
+            )
+            passing = CalculationService.passing_mask(totals, passing_threshold)
             
+            # Step 7: 更新總分與學生狀態（與現值相同時不寫入；學期彙總於批次結束時一次更新）
+            evaluated_count = 0
             updated_count = 0
-            for student in students:
-                # 跳過二退學生
-                if student.student_status == '二退':
-                    continue
+            with SemesterSummaryService.batch():
+                for score, total_score, is_passing in zip(targets, totals, passing):
+                    if score is None:
+                        continue
+                    evaluated_count += 1
+                    new_total = str(round(total_score, 2))
+                    new_status = '修業完畢' if is_passing else '被當'
+                    changed = False
+                    if score.score_total != new_total:
+                        update_data = {
+                            'score_total': new_total,
+                            'score_updated_at': TimestampService.get_current_datetime()
+                        }
+                        SqlDbBusinessService.update_entity(score, update_data)
+                        changed = True
                 
-                # 獲取學生成績
-                score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', student.student_uuid)
-                if not score:
-                    continue
-                
-                # 計算總分
-                scores_dict = {
-                    '第一次小考': score.score_quiz1,
-                    '期中考': score.score_midterm,
-                    '第二次小考': score.score_quiz2,
-                    '期末考': score.score_finalexam,
-                }
-                
-                # 檢查是否所有成績都已填寫
-                if not all(scores_dict.values()):
-                    continue
-                
-                # 轉換為浮點數並計算加權總分
-                scores_float = {k: float(v) for k, v in scores_dict.items() if v}
-                total_score = CalculationService.calculate_weighted_total(scores_float, weights)
+                    if score.student.student_status != new_status:
+                        student_update = {
+                            'student_status': new_status,
+                            'student_updated_at': TimestampService.get_current_datetime()
+                        }
+                        SqlDbBusinessService.update_entity(score.student, student_update)
+                        changed = True
                 
-                # 更新總分
-                update_data = {
-                    'score_total': str(round(total_score, 2)),
-                    'score_updated_at': TimestampService.get_current_timestamp()
-                }
-                SqlDbBusinessService.update_entity(score, update_data)
-                
-                # 更新學生狀態
-                is_passing = CalculationService.check_passing(total_score, passing_threshold)
-                new_status = '修業完畢' if is_passing else '被當'
-                student_update = {
-                    'student_status': new_status,
-                    'student_updated_at': TimestampService.get_current_timestamp()
-                }
-                SqlDbBusinessService.update_entity(student, student_update)
-                
-                updated_count += 1
+                    if changed:
+                        updated_count += 1
+            
+            # Step 8: 寫入計算紀錄
+            run = CalculationRunService.record_run(
+                semester, mode, inputs_hash, weights, passing_threshold, cursor, evaluated_count, updated_count
+            )
             
-            logger.info(f"Final scores calculated for {updated_count} students")
+            logger.info("Final scores calculated (%s): %s updated of %s evaluated", mode, updated_count, evaluated_count)
             return success_response(
-                {'updated_count': updated_count},
+                {
+                    'updated_count': updated_count,
+                    'evaluated_count': evaluated_count,
+                    'mode': mode,
+                    'run_uuid': run.run_uuid,
+                },
                 f"Final scores calculated successfully for {updated_count} students",
                 200
             )
@@ -333,7 +440,167 @@ class ScoreActor:
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error calculating final scores: {str(e)}")
+            logger.error("Error calculating final scores: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+    
+    # 總成績計算的考試（test_slot, 分數欄位），與 calculation_final 相同
+    FINAL_EXAM_FIELDS = ExamSlotService.SLOT_FIELDS
+    # simulate 單次請求的情境 / 門檻數上限
+    MAX_SIMULATION_SCENARIOS = 200
+    MAX_SIMULATION_THRESHOLDS = 50
+
+    @staticmethod
+    def _parse_scenario_weights(weights) -> list:
+        """
+        驗證試算權重並轉為 FINAL_EXAM_FIELDS 順序的權重向量（鍵為 test_slot 或預設考試名稱）
+
+        Raises:
+            ValueError: 權重格式錯誤或總和不為 1.0
+        """
+        if not isinstance(weights, dict) or not weights:
+            raise ValueError("weights must be a non-empty object")
+        slot_by_key = {slot: slot for slot in ExamSlotService.SLOTS}
+        slot_by_key.update({name: slot for slot, name in ExamSlotService.SLOT_NAMES.items()})
+        unknown = [key for key in weights if key not in slot_by_key]
+        if unknown:
+            raise ValueError(
+                f"Unknown tests in weights: {unknown}. Must be among: {', '.join(slot_by_key)}"
+            )
+        slot_weights = {}
+        try:
+            for key, weight in weights.items():
+                slot = slot_by_key[key]
+                if slot in slot_weights:
+                    raise ValueError(f"Duplicate weight for test_slot '{slot}'")
+                slot_weights[slot] = float(weight)
+        except TypeError:
+            raise ValueError("weights values must be numbers")
+        vector = [slot_weights.get(slot, 0.0) for slot, _ in ScoreActor.FINAL_EXAM_FIELDS]
+        if any(weight < 0 for weight in vector):
+            raise ValueError("weights must not be negative")
+        # 與 setweight 相同的容許誤差
+        if abs(sum(vector) - 1.0) > 0.001:
+            raise ValueError("Total weight must equal 1.0")
+        return vector
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def simulate(request):
+        """
+        總成績試算：以多組權重 / 及格門檻計算總分分布與不及格人數（唯讀，不更新 score_total / student_status）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/simulate
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Simulating final scores: %s", LogPayload(data))
+            
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_semester'])
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+            
+            semester = data['test_semester']
+            scenarios_data = data.get('scenarios', [])
+            passing_scores = data.get('passing_scores', [60])
+            include_current = data.get('include_current', True)
+            
+            # Step 3: 驗證試算情境、及格門檻與級距設定
+            if not isinstance(scenarios_data, list) or len(scenarios_data) > ScoreActor.MAX_SIMULATION_SCENARIOS:
+                return error_response(
+                    f"scenarios must be a list of at most {ScoreActor.MAX_SIMULATION_SCENARIOS} items", None, 400
+                )
+            if (not isinstance(passing_scores, list) or not passing_scores
+                    or len(passing_scores) > ScoreActor.MAX_SIMULATION_THRESHOLDS):
+                return error_response(
+                    f"passing_scores must be a non-empty list of at most {ScoreActor.MAX_SIMULATION_THRESHOLDS} numbers",
+                    None,
+                    400
+                )
+            try:
+                try:
+                    passing_scores = [float(score) for score in passing_scores]
+                except (TypeError, ValueError):
+                    raise ValueError("passing_scores must be numbers")
+                bins = BinningService.parse_config(data.get('bins', BinningService.DEFAULT_CONFIG))
+                scenarios = []
+                for index, scenario in enumerate(scenarios_data):
+                    if not isinstance(scenario, dict):
+                        raise ValueError(f"scenarios[{index}] must be an object")
+                    scenarios.append({
+                        'name': scenario.get('name', f'scenario_{index + 1}'),
+                        'weights': ScoreActor._parse_scenario_weights(scenario.get('weights')),
+                    })
+            except (TypeError, ValueError) as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 4: 加入目前設定的權重作為對照（權重未設定完整時略過）
+            if include_current:
+                current = {
+                    slot: test.test_weight
+                    for slot, test in ExamSlotService.get_slot_tests(semester).items() if test.test_weight
+                }
+                try:
+                    scenarios.insert(0, {'name': 'current', 'weights': ScoreActor._parse_scenario_weights(current)})
+                except ValueError:
+                    pass
+            if not scenarios:
+                return error_response("No scenarios to simulate", None, 400)
+            
+            # Step 5: 自學期成績矩陣取出四次考試皆已填寫的學生（跳過二退學生，與 calculation_final 相同）
+            matrix = ScoreMatrixService.get_matrix(semester)
+            exam_fields = [field for _, field in ScoreActor.FINAL_EXAM_FIELDS]
+            complete_rows = matrix.complete_rows(exam_fields)
+            if not complete_rows:
+                return error_response("No students with complete scores found", None, 404)
+            
+            # Step 6: 一次計算所有情境的加權總分，並依各門檻統計不及格人數
+            all_totals = CalculationService.calculate_weighted_totals_batch(
+                matrix.matrix(exam_fields, complete_rows),
+                [scenario['weights'] for scenario in scenarios]
+            )
+            exam_names = [ExamSlotService.SLOT_NAMES[slot] for slot, _ in ScoreActor.FINAL_EXAM_FIELDS]
+            student_count = len(complete_rows)
+            results = []
+            for scenario, totals in zip(scenarios, all_totals):
+                summary = CalculationService.describe(totals)
+                fail_counts = CalculationService.count_below(totals, passing_scores)
+                results.append({
+                    'name': scenario['name'],
+                    'weights': dict(zip(exam_names, scenario['weights'])),
+                    'average': round(summary['average'], 2),
+                    'median': round(summary['median'], 2),
+                    'min': round(summary['min'], 2),
+                    'max': round(summary['max'], 2),
+                    'q1': round(summary['q1'], 2),
+                    'q3': round(summary['q3'], 2),
+                    'distribution': BinningService.compute_histogram(totals, bins),
+                    'passing': [
+                        {
+                            'passing_score': passing_score,
+                            'pass_count': student_count - fail_count,
+                            'fail_count': fail_count,
+                            'fail_rate': round(fail_count / student_count, 4),
+                        }
+                        for passing_score, fail_count in zip(passing_scores, fail_counts)
+                    ],
+                })
+            
+            output = {
+                'semester': semester,
+                'student_count': student_count,
+                'passing_scores': passing_scores,
+                'scenarios': results,
+            }
+            
+            logger.info("Simulated %s scenarios for %s students", len(results), student_count)
+            return success_response(output, "Simulation completed successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error simulating final scores: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -347,7 +614,7 @@ class ScoreActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Calculating test statistics: {data}")
+            logger.info("Calculating test statistics: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
@@ -365,67 +632,234 @@ class ScoreActor:
             if score_field not in allowed_fields:
                 return error_response(f"Invalid score_field. Must be one of: {', '.join(allowed_fields)}", None, 400)
             
-            # Step 4: 獲取該學期所有學生的成績
-            students = SqlDbBusinessService.get_entities(Students, {'student_semester': semester})
-            student_uuids = [s.student_uuid for s in students if s.student_status != '二退']
-            
-            scores = []
-            for student_uuid in student_uuids:
-                score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', student_uuid)
-                if score:
-                    score_value = getattr(score, score_field, '')
-                    if score_value and score_value.strip():
-                        try:
-                            scores.append(float(score_value))
-                        except ValueError:
-                            continue
+            # Step 4: 讀取學期成績彙總（單列查詢，排除二退學生；中位數來自分位數摘要）
+            if exclude_empty:
+                summary_row = SemesterSummaryService.get_summary(semester, score_field)
+            else:
+                # 空白分數以 0 分計入：自學期成績矩陣取出所有列入統計的學生
+                matrix = ScoreMatrixService.get_matrix(semester)
+                scores = [matrix.value(row, score_field) or 0.0 for row in matrix.active_rows()]
+                summary_row = SemesterSummaryService.aggregate(semester, score_field, scores)
+            summary = SemesterSummaryService.statistics(summary_row)
+            
+            if not summary['count']:
+                return error_response("No valid scores found", None, 404)
+            
+            output = {
+                'semester': semester,
+                'score_field': score_field,
+                'total_count': summary['count'],
+                'average': round(summary['average'], 2),
+                'median': round(summary['median'], 2),
+                'median_exact': summary['exact'],
+                'std_dev': round(summary['std_dev'], 2),
+                'pass_count': summary['pass_count'],
+                'fail_count': summary['fail_count'],
+                'passing_threshold': SemesterSummaryService.passing_threshold(),
+            }
+            
+            logger.info("Test statistics calculated successfully")
+            return success_response(output, "Test statistics calculated successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error calculating test statistics: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+    
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def distribution(request):
+        """
+        取得成績分布資料（級距人數、平均、中位數、四分位數，不繪圖、不寫入 MongoDB）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/distribution
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Calculating score distribution: %s", LogPayload(data))
+            
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(
+                data, ['score_semester', 'score_field']
+            )
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+            
+            semester = data['score_semester']
+            score_field = data['score_field']
+            
+            # Step 3: 驗證分數欄位與級距設定（與 step_diagram 相同的 bins 格式）
+            allowed_fields = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total']
+            if score_field not in allowed_fields:
+                return error_response(f"Invalid score_field. Must be one of: {', '.join(allowed_fields)}", None, 400)
+            try:
+                bins = BinningService.parse_config(data.get('bins', BinningService.DEFAULT_CONFIG))
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 4: 自學期成績矩陣取出有效分數（排除二退學生）
+            scores = ScoreMatrixService.get_matrix(semester).values(score_field)
             
             if not scores:
                 return error_response("No valid scores found", None, 404)
             
-            # Step 5: 計算統計數據
-            average = CalculationService.calculate_average(scores)
-            median = CalculationService.calculate_median(scores)
+            # Step 5: 計算分布摘要與級距人數
+            summary = CalculationService.describe(scores)
+            histogram = BinningService.compute_histogram(scores, bins)
             
             output = {
                 'semester': semester,
                 'score_field': score_field,
-                'total_count': len(scores),
-                'average': round(average, 2),
-                'median': round(median, 2),
+                'total_count': summary['count'],
+                'average': round(summary['average'], 2),
+                'median': round(summary['median'], 2),
+                'min': summary['min'],
+                'max': summary['max'],
+                'quartiles': {
+                    'q1': round(summary['q1'], 2),
+                    'q2': round(summary['median'], 2),
+                    'q3': round(summary['q3'], 2),
+                },
+                'bins': histogram,
             }
             
-            logger.info(f"Test statistics calculated successfully")
-            return success_response(output, "Test statistics calculated successfully", 200)
+            logger.info("Score distribution calculated successfully")
+            return success_response(output, "Score distribution calculated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error calculating test statistics: {str(e)}")
+            logger.error("Error calculating score distribution: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
+    # statistics 單次請求的學期數上限
+    MAX_STATISTICS_SEMESTERS = 20
+
+    @staticmethod
+    def _summary_output(row) -> dict:
+        """彙總列 → statistics 回應格式"""
+        summary = SemesterSummaryService.statistics(row)
+        if not summary['count']:
+            return {'total_count': 0}
+        return {
+            'total_count': summary['count'],
+            'average': round(summary['average'], 2),
+            'median': round(summary['median'], 2),
+            'min': summary['min'],
+            'max': summary['max'],
+            'q1': round(summary['q1'], 2),
+            'q3': round(summary['q3'], 2),
+            'exact': summary['exact'],
+        }
+
     @staticmethod
     @csrf_exempt
     @require_http_methods(["POST"])
-    def step_diagram(request):
+    def statistics(request):
         """
-        生成成績分布圖（直方圖）
-        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/step_diagram
+        多學期、多考試欄位統計（一次請求回傳所有組合）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/statistics
         """
         try:
-            # Step 1: 檢查 matplotlib 是否安裝
-            if plt is None:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Calculating multi-semester statistics: %s", LogPayload(data))
+            
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(data, ['score_semesters'])
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+            
+            allowed_fields = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total']
+            semesters = data['score_semesters']
+            score_fields = data.get('score_fields', allowed_fields[:4])
+            
+            # Step 3: 驗證學期與分數欄位列表
+            if not isinstance(semesters, list) or not semesters or not all(isinstance(s, str) for s in semesters):
+                return error_response("score_semesters must be a non-empty list of strings", None, 400)
+            if len(semesters) > ScoreActor.MAX_STATISTICS_SEMESTERS:
                 return error_response(
-                    "Matplotlib not available. Please install: pip install matplotlib",
+                    f"Too many semesters (max {ScoreActor.MAX_STATISTICS_SEMESTERS})", None, 400
+                )
+            if not isinstance(score_fields, list) or not score_fields:
+                return error_response("score_fields must be a non-empty list", None, 400)
+            invalid_fields = [field for field in score_fields if field not in allowed_fields]
+            if invalid_fields:
+                return error_response(
+                    f"Invalid score_fields: {invalid_fields}. Must be one of: {', '.join(allowed_fields)}",
                     None,
-                    500
+                    400
                 )
             
-            # Step 2: 解析請求
+            # Step 4: 以單一查詢讀取所有學期 × 欄位的彙總列
+            summaries = SemesterSummaryService.get_summaries(semesters, score_fields)
+            
+            # Step 5: 各學期統計與跨學期合併（分位數摘要直接合併，不需讀取原始分數）
+            results, combined = {}, {}
+            for (semester, score_field), row in summaries.items():
+                results.setdefault(semester, {})[score_field] = ScoreActor._summary_output(row)
+            if len(results) > 1:
+                for score_field in score_fields:
+                    rows = [summaries[(semester, score_field)] for semester in results]
+                    combined[score_field] = ScoreActor._summary_output(
+                        SemesterSummaryService.merge(rows, '*', score_field)
+                    )
+            
+            output = {
+                'score_fields': score_fields,
+                'semesters': results,
+                'combined': combined,
+            }
+            
+            logger.info("Multi-semester statistics calculated successfully")
+            return success_response(output, "Statistics calculated successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error calculating statistics: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+    
+    @staticmethod
+    def _render_histogram(scores: list, bins: dict, title: str, output_format: str):
+        """
+        依級距策略計算分布並交由 renderer 進程池繪製直方圖
+
+        Args:
+            bins: BinningService.parse_config 驗證後的級距設定
+
+        Returns:
+            (image_bytes, content_type, file_ext)
+        """
+        histogram = BinningService.compute_histogram(scores, bins)
+        spec = {
+            'bin_edges': histogram['bin_edges'],
+            'counts': histogram['counts'],
+            'labels': histogram['labels'],
+            'title': title,
+            'output_format': output_format,
+            'total': len(scores),
+            'average': CalculationService.calculate_average(scores),
+            'median': CalculationService.calculate_median(scores),
+        }
+        return ChartRenderService.render_histogram(spec)
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def step_diagram(request):
+        """
+        生成成績分布圖（直方圖）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/step_diagram
+        """
+        try:
+            # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Generating score distribution diagram: {data}")
+            logger.info("Generating score distribution diagram: %s", LogPayload(data))
             
-            # Step 3: 驗證必要欄位
+            # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
                 data, ['test_semester', 'score_field']
             )
@@ -434,11 +868,11 @@ class ScoreActor:
             
             semester = data['test_semester']
             score_field = data['score_field']
-            bins_config = data.get('bins', {'type': 'fixed_width', 'width': 10})
+            bins_config = data.get('bins', BinningService.DEFAULT_CONFIG)
             title = data.get('title', f'{semester} {score_field} 分數分布')
             output_format = data.get('format', 'png')
             
-            # Step 4: 驗證分數欄位
+            # Step 3: 驗證分數欄位、輸出格式（svg / png 不需 matplotlib）與級距設定
             allowed_fields = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam']
             if score_field not in allowed_fields:
                 return error_response(
@@ -446,215 +880,246 @@ class ScoreActor:
                     None,
                     400
                 )
+            if not ChartRenderService.is_available(output_format):
+                return error_response(
+                    "Matplotlib not available. Please install: pip install matplotlib",
+                    None,
+                    500
+                )
+            try:
+                bins = BinningService.parse_config(bins_config)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
             
-            # Step 5: 獲取該學期所有學生的成績
-            students = SqlDbBusinessService.get_entities(Students, {'student_semester': semester})
-            student_uuids = [s.student_uuid for s in students if s.student_status != '二退']
-            
-            scores = []
-            for student_uuid in student_uuids:
-                score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', student_uuid)
-                if score:
-                    score_value = getattr(score, score_field, '')
-                    if score_value and score_value.strip():
-                        try:
-                            scores.append(float(score_value))
-                        except ValueError:
-                            continue
-            
+            # Step 4: 自學期成績矩陣取出有效分數（排除二退學生）
+            scores = ScoreMatrixService.get_matrix(semester).values(score_field)
             if not scores:
                 return error_response("No valid scores found", None, 404)
             
-            # Step 6: 計算級距分布
-            bin_width = bins_config.get('width', 10)
-            histogram_data = CalculationService.generate_histogram_data(scores, bin_width)
+            # Step 5: 依級距策略計算分布並繪製圖表
+            image_bytes, content_type, file_ext = ScoreActor._render_histogram(
+                scores, bins, title, output_format
+            )
+            
+            # Step 6: GridFS 上傳與 MongoDB / PostgreSQL 更新移至背景執行，圖片先回傳
+            submit_background_task(
+                ScoreActor._persist_histogram, semester, score_field, image_bytes, content_type, file_ext
+            )
             
-            # Step 7: 生成圖表
-            fig, ax = plt.subplots(figsize=(12, 6))
+            # Step 7: 返回圖片給前端
+            response = HttpResponse(image_bytes, content_type=content_type)
+            response['Content-Disposition'] = f'attachment; filename="score_distribution_{semester}_{score_field}.{file_ext}"'
             
-            # 設定中文字體
-            try:
-                import matplotlib.font_manager as fm
-                # 優先使用容器內安裝的 WenQuanYi Zen Hei 字體
-                wqy_font_path = '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc'
-                if os.path.exists(wqy_font_path):
-                    prop = fm.FontProperties(fname=wqy_font_path)
-                    plt.rcParams['font.sans-serif'] = [prop.get_name(), 'DejaVu Sans']
-                    plt.rcParams['axes.unicode_minus'] = False
-                else:
-                    chinese_fonts = ['WenQuanYi Zen Hei', 'Microsoft YaHei', 'SimHei', 'DejaVu Sans']
-                    plt.rcParams['font.sans-serif'] = chinese_fonts
-                    plt.rcParams['axes.unicode_minus'] = False
-            except Exception:
-                pass
-            
-            # 準備資料
-            bins = sorted(histogram_data.keys(), key=lambda x: int(x.split('-')[0]))
-            counts = [histogram_data[bin_key] for bin_key in bins]
-            
-            # 繪製長條圖
-            x_pos = range(len(bins))
-            bars = ax.bar(x_pos, counts, alpha=0.7, color='steelblue', edgecolor='black')
-            
-            # 在長條上顯示數值
-            for i, (bar, count) in enumerate(zip(bars, counts)):
-                if count > 0:
-                    ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
-                           str(count), ha='center', va='bottom', fontsize=10)
-            
-            # 設定標籤
-            ax.set_xlabel('Score Range (分數區間)', fontsize=12)
-            ax.set_ylabel('Student Count (學生人數)', fontsize=12)
-            ax.set_title(title, fontsize=14, fontweight='bold')
-            ax.set_xticks(x_pos)
-            ax.set_xticklabels(bins, rotation=45, ha='right')
-            ax.grid(axis='y', alpha=0.3, linestyle='--')
-            
-            # 顯示統計資訊
-            avg = CalculationService.calculate_average(scores)
-            median = CalculationService.calculate_median(scores)
-            stats_text = f'Total: {len(scores)} | Avg: {avg:.2f} | Median: {median:.2f}'
-            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
-                   verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+            logger.info("Score distribution diagram generated successfully, upload scheduled")
+            return response
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except TimeoutError as e:
+            logger.warning("Diagram rendering unavailable: %s", e)
+            return error_response(str(e), None, 503)
+        except Exception as e:
+            logger.error("Error generating diagram: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    def _persist_histogram(semester: str, score_field: str,
+                           image_bytes: bytes, content_type: str, file_ext: str) -> None:
+        """背景工作：依 score_field 找到考試，上傳直方圖並同步 MongoDB 文檔 / Test 狀態"""
+        matched_test = ExamSlotService.get_test_for_field(semester, score_field)
+        if not matched_test:
+            return
+        try:
+            ScoreActor._store_histogram(matched_test, semester, score_field, image_bytes, content_type, file_ext)
+        except Exception as upload_error:
+            logger.warning("Failed to auto-upload histogram for test %s: %s", matched_test.test_uuid, upload_error)
 
-            # 顯示平均與中位數垂直線
-            # x 座標換算：bar n 以 x=n 為中心，左緣在 x=n-0.5
-            # 因此分數 v 對應 x = v/bin_width - 0.5
-            avg_x = avg / bin_width - 0.5
-            median_x = median / bin_width - 0.5
-            ax.axvline(x=avg_x, color='red', linestyle='--', linewidth=2, alpha=0.85,
-                       label=f'平均: {avg:.1f}')
-            ax.axvline(x=median_x, color='green', linestyle='-', linewidth=2, alpha=0.85,
-                       label=f'中位數: {median:.1f}')
-            ax.legend(loc='upper right', fontsize=10)
+    @staticmethod
+    def _store_histogram(matched_test, semester: str, score_field: str,
+                         image_bytes: bytes, content_type: str, file_ext: str) -> None:
+        """上傳直方圖至 GridFS 並同步 MongoDB 文檔 / Test 狀態"""
+        collection = 'test_pic_information'
+        gridfs_filename = f"histogram_{semester}_{score_field}.{file_ext}"
+        histogram_gridfs_id = NoSqlDbBusinessService.upload_file_to_gridfs(
+            gridfs_filename, image_bytes, content_type
+        )
+        timestamp_now = TimestampService.get_current_timestamp()
+        new_document = {
+            'test_uuid': matched_test.test_uuid,
+            'test_semester': matched_test.test_semester,
+            'test_name': matched_test.test_name,
+            'test_pic_gridfs_id': '',
+            'test_pic_histogram_gridfs_id': histogram_gridfs_id,
+            'pic_created_at': timestamp_now,
+            'pic_updated_at': timestamp_now,
+        }
 
-            plt.tight_layout()
-            
-            # Step 8: 儲存圖片到記憶體
-            img_buffer = io.BytesIO()
-            
-            if output_format.lower() == 'png':
-                plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-                content_type = 'image/png'
-                file_ext = 'png'
-            elif output_format.lower() == 'jpg' or output_format.lower() == 'jpeg':
-                plt.savefig(img_buffer, format='jpeg', dpi=150, bbox_inches='tight')
-                content_type = 'image/jpeg'
-                file_ext = 'jpg'
+        if matched_test.pt_opt_score_uuid:
+            file_uuid = matched_test.pt_opt_score_uuid
+            existing_doc = NoSqlDbBusinessService.get_document(collection, {'test_pic_uuid': file_uuid})
+            if existing_doc:
+                # 刪除舊 GridFS 直方圖（若存在）
+                old_gridfs_id = existing_doc.get('test_pic_histogram_gridfs_id', '')
+                if old_gridfs_id:
+                    try:
+                        NoSqlDbBusinessService.delete_file_from_gridfs(old_gridfs_id)
+                    except Exception:
+                        pass
+                NoSqlDbBusinessService.update_document(
+                    collection,
+                    {'test_pic_uuid': file_uuid},
+                    {
+                        'test_pic_histogram_gridfs_id': histogram_gridfs_id,
+                        'pic_updated_at': timestamp_now,
+                    }
+                )
             else:
-                plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-                content_type = 'image/png'
-                file_ext = 'png'
-            
-            plt.close(fig)
-            img_buffer.seek(0)
-            
-            # Step 9: 自動上傳直方圖至 GridFS，並更新 MongoDB / PostgreSQL
-            # 依 score_field 關鍵字找到正確的考試記錄
-            SCORE_FIELD_KEYWORDS = {
-                'score_quiz1': '第一',
-                'score_midterm': '期中',
-                'score_quiz2': '第二',
-                'score_finalexam': '期末',
-            }
-            tests = SqlDbBusinessService.get_entities(Test, {'test_semester': semester})
-            keyword = SCORE_FIELD_KEYWORDS.get(score_field, '')
-            matched_test = None
-            for t in tests:
-                if keyword and keyword in t.test_name:
-                    matched_test = t
-                    break
+                NoSqlDbBusinessService.create_document(collection, {'test_pic_uuid': file_uuid, **new_document})
+        else:
+            # 考試尚無 file_uuid，建立新 MongoDB 文檔並回填 pt_opt_score_uuid
+            new_file_uuid = UuidService.generate_test_pic_uuid(matched_test.test_semester, 'file')
+            NoSqlDbBusinessService.create_document(collection, {'test_pic_uuid': new_file_uuid, **new_document})
+            SqlDbBusinessService.update_entity(matched_test, {
+                'pt_opt_score_uuid': new_file_uuid,
+                'test_updated_at': TimestampService.get_current_datetime(),
+            })
 
-            if matched_test:
-                try:
-                    # 上傳圖片 binary 至 GridFS
-                    gridfs_filename = f"histogram_{semester}_{score_field}.{file_ext}"
-                    img_buffer.seek(0)
-                    histogram_gridfs_id = NoSqlDbBusinessService.upload_file_to_gridfs(
-                        gridfs_filename, img_buffer.read(), content_type
-                    )
-                    timestamp_now = TimestampService.get_current_timestamp()
+        ChangeFeedService.record(
+            ChangeFeedService.ENTITY_TEST_PIC,
+            matched_test.pt_opt_score_uuid,
+            ChangeFeedService.OPERATION_UPDATE,
+            matched_test.test_semester
+        )
 
-                    # 更新或創建 MongoDB 文檔並同步 PostgreSQL
-                    if matched_test.pt_opt_score_uuid:
-                        file_uuid = matched_test.pt_opt_score_uuid
-                        existing_doc = NoSqlDbBusinessService.get_document(
-                            'test_pic_information',
-                            {'test_pic_uuid': file_uuid}
-                        )
-                        if existing_doc:
-                            # 刪除舊 GridFS 直方圖（若存在）
-                            old_gridfs_id = existing_doc.get('test_pic_histogram_gridfs_id', '')
-                            if old_gridfs_id:
-                                try:
-                                    NoSqlDbBusinessService.delete_file_from_gridfs(old_gridfs_id)
-                                except Exception:
-                                    pass
-                            NoSqlDbBusinessService.update_document(
-                                'test_pic_information',
-                                {'test_pic_uuid': file_uuid},
-                                {
-                                    'test_pic_histogram_gridfs_id': histogram_gridfs_id,
-                                    'pic_updated_at': timestamp_now,
-                                }
-                            )
-                        else:
-                            NoSqlDbBusinessService.create_document(
-                                'test_pic_information',
-                                {
-                                    'test_pic_uuid': file_uuid,
-                                    'test_uuid': matched_test.test_uuid,
-                                    'test_semester': matched_test.test_semester,
-                                    'test_name': matched_test.test_name,
-                                    'test_pic_gridfs_id': '',
-                                    'test_pic_histogram_gridfs_id': histogram_gridfs_id,
-                                    'pic_created_at': timestamp_now,
-                                    'pic_updated_at': timestamp_now,
-                                }
-                            )
-                    else:
-                        # 考試尚無 file_uuid，建立新 MongoDB 文檔並回填 pt_opt_score_uuid
-                        new_file_uuid = UuidService.generate_test_pic_uuid(matched_test.test_semester, 'file')
-                        NoSqlDbBusinessService.create_document(
-                            'test_pic_information',
-                            {
-                                'test_pic_uuid': new_file_uuid,
-                                'test_uuid': matched_test.test_uuid,
-                                'test_semester': matched_test.test_semester,
-                                'test_name': matched_test.test_name,
-                                'test_pic_gridfs_id': '',
-                                'test_pic_histogram_gridfs_id': histogram_gridfs_id,
-                                'pic_created_at': timestamp_now,
-                                'pic_updated_at': timestamp_now,
-                            }
-                        )
-                        SqlDbBusinessService.update_entity(matched_test, {
-                            'pt_opt_score_uuid': new_file_uuid,
-                            'test_updated_at': timestamp_now,
-                        })
+        # 自動更新考試狀態
+        if matched_test.test_states == '考卷完成':
+            SqlDbBusinessService.update_entity(matched_test, {
+                'test_states': '考卷成績結算',
+                'test_updated_at': TimestampService.get_current_datetime(),
+            })
+            logger.info("Auto-updated test status to '考卷成績結算' for test: %s", matched_test.test_uuid)
 
-                    # 自動更新考試狀態
-                    if matched_test.test_states == '考卷完成':
-                        SqlDbBusinessService.update_entity(matched_test, {
-                            'test_states': '考卷成績結算',
-                            'test_updated_at': timestamp_now,
-                        })
-                        logger.info(f"Auto-updated test status to '考卷成績結算' for test: {matched_test.test_uuid}")
+        logger.info("Histogram uploaded to GridFS (%s) for test: %s", histogram_gridfs_id, matched_test.test_uuid)
 
-                    logger.info(f"Histogram uploaded to GridFS ({histogram_gridfs_id}) for test: {matched_test.test_uuid}")
-                except Exception as upload_error:
-                    logger.warning(f"Failed to auto-upload histogram for test {matched_test.test_uuid}: {str(upload_error)}")
+    @staticmethod
+    @async_csrf_exempt
+    @async_require_http_methods(["POST"])
+    async def step_diagram_async(request):
+        """
+        生成成績分布圖（async 版本：繪圖於執行緒池執行，上傳於背景 task 執行）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/step_diagram
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Generating score distribution diagram: %s", LogPayload(data))
+            
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(
+                data, ['test_semester', 'score_field']
+            )
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+            
+            semester = data['test_semester']
+            score_field = data['score_field']
+            bins_config = data.get('bins', BinningService.DEFAULT_CONFIG)
+            title = data.get('title', f'{semester} {score_field} 分數分布')
+            output_format = data.get('format', 'png')
+            
+            # Step 3: 驗證分數欄位、輸出格式（svg / png 不需 matplotlib）與級距設定
+            allowed_fields = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam']
+            if score_field not in allowed_fields:
+                return error_response(
+                    f"Invalid score_field. Must be one of: {', '.join(allowed_fields)}",
+                    None,
+                    400
+                )
+            if not ChartRenderService.is_available(output_format):
+                return error_response(
+                    "Matplotlib not available. Please install: pip install matplotlib",
+                    None,
+                    500
+                )
+            try:
+                bins = BinningService.parse_config(bins_config)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 4: 自學期成績矩陣取出有效分數（排除二退學生）
+            matrix = await sync_to_async(ScoreMatrixService.get_matrix)(semester)
+            scores = matrix.values(score_field)
+            if not scores:
+                return error_response("No valid scores found", None, 404)
             
-            # Step 10: 返回圖片給前端
-            img_buffer.seek(0)
-            response = HttpResponse(img_buffer.read(), content_type=content_type)
+            # Step 5: 依級距策略計算分布並繪製圖表（等待 renderer 進程池，不阻塞 event loop）
+            image_bytes, content_type, file_ext = await sync_to_async(
+                ScoreActor._render_histogram, thread_sensitive=False
+            )(scores, bins, title, output_format)
+            
+            # Step 6: GridFS 上傳與 MongoDB / PostgreSQL 更新於背景 task 執行，圖片先回傳
+            create_background_task(ScoreActor._persist_histogram_async(
+                semester, score_field, image_bytes, content_type, file_ext
+            ))
+            
+            # Step 7: 返回圖片給前端
+            response = HttpResponse(image_bytes, content_type=content_type)
             response['Content-Disposition'] = f'attachment; filename="score_distribution_{semester}_{score_field}.{file_ext}"'
             
-            logger.info(f"Score distribution diagram generated and uploaded successfully")
+            logger.info("Score distribution diagram generated successfully, upload scheduled")
             return response
             
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except TimeoutError as e:
+            logger.warning("Diagram rendering unavailable: %s", e)
+            return error_response(str(e), None, 503)
+        except Exception as e:
+            logger.error("Error generating diagram: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    async def _persist_histogram_async(semester: str, score_field: str,
+                                       image_bytes: bytes, content_type: str, file_ext: str) -> None:
+        """背景 task：與 sync 版本共用 _persist_histogram（GridFS / MongoDB / Test 更新於執行緒中執行）"""
+        await sync_to_async(ScoreActor._persist_histogram)(semester, score_field, image_bytes, content_type, file_ext)
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def changes(request):
+        """
+        查詢成績增量異動（change feed，依游標同步）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Score_MetadataWriter/changes
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading score changes: %s", LogPayload(data))
+            
+            # Step 2: 驗證游標參數
+            try:
+                cursor, limit, semester = ChangeFeedService.parse_request(data)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 3: 讀取游標之後的異動
+            changes, next_cursor, has_more = ChangeFeedService.get_changes(
+                ChangeFeedService.ENTITY_SCORE, cursor, limit, semester
+            )
+            
+            # Step 4: 批次查詢目前資料（已刪除者不在結果中）
+            uuids = [change.change_entity_uuid for change in changes]
+            entities = SqlDbBusinessService.get_entities(Score, {'score_uuid__in': uuids}) if uuids else []
+            current = {item['score_uuid']: item for item in ScoreReadSerializer(entities, many=True).data}
+            
+            # Step 5: 格式化輸出
+            output = ChangeFeedService.build_feed(changes, current, next_cursor, has_more)
+            logger.info("Score changes retrieved: %s (next_cursor=%s)", len(changes), next_cursor)
+            return success_response(output, "Score changes retrieved successfully", 200)
+            
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error generating diagram: {str(e)}")
+            logger.error("Error reading score changes: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
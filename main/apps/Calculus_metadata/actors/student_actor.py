@@ -4,24 +4,20 @@ Students Actor - 學生資料管理
 import json
 import logging
 import io
+import importlib
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
 from django.http import HttpResponse
-try:
-    from openpyxl import load_workbook, Workbook
-    from openpyxl.styles import PatternFill, Font
-except ImportError:
-    load_workbook = None
-    Workbook = None
-    PatternFill = None
-    Font = None
-
 from main.apps.Calculus_metadata.models import Students, Score
 from main.apps.Calculus_metadata.serializers import StudentsWriteSerializer, StudentsReadSerializer
 from main.apps.Calculus_metadata.services.common import UuidService, TimestampService, ValidationService
 from main.apps.Calculus_metadata.services.business import SqlDbBusinessService
+from main.apps.Calculus_metadata.services.optional.partition import SemesterPartitionService
+from main.apps.Calculus_metadata.services.optional.calculation import ScoreMatrixService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
 from main.utils.response import success_response, error_response
+from main.utils.logger import LogPayload
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +37,7 @@ class StudentActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Creating student with data: {data}")
+            logger.info("Creating student with data: %s", LogPayload(data))
             
             # Step 2: 驗證數據
             serializer = StudentsWriteSerializer(data=data)
@@ -52,7 +48,7 @@ class StudentActor:
             
             # Step 3: 生成 UUID 和時間戳
             student_uuid = UuidService.generate_student_uuid(validated_data['student_semester'])
-            timestamp = TimestampService.get_current_timestamp()
+            timestamp = TimestampService.get_current_datetime()
             
             # Step 4: 準備完整數據
             complete_data = {
@@ -65,14 +61,18 @@ class StudentActor:
                 'student_updated_at': timestamp,
             }
             
-            # Step 5: 創建學生（通過 Business Service）
+            # Step 5: 創建學生（通過 Business Service，新學期自動建立分區）
+            SemesterPartitionService.ensure_partition(Students, validated_data['student_semester'])
+            SemesterPartitionService.ensure_partition(Score, validated_data['student_semester'])
             student = SqlDbBusinessService.create_entity(Students, complete_data)
             
             # Step 6: 同時創建對應的成績記錄
             score_uuid = UuidService.generate_score_uuid(validated_data['student_semester'])
             score_data = {
                 'score_uuid': score_uuid,
+                'student': student,
                 'f_student_uuid': student_uuid,
+                'score_semester': validated_data['student_semester'],
                 'score_quiz1': '',
                 'score_midterm': '',
                 'score_quiz2': '',
@@ -85,14 +85,14 @@ class StudentActor:
             
             # Step 7: 格式化輸出
             output = StudentsReadSerializer(student).data
-            logger.info(f"Student created successfully: {student_uuid}")
+            logger.info("Student created successfully: %s", student_uuid)
             
             return success_response(output, "Student created successfully", 201)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error creating student: {str(e)}")
+            logger.error("Error creating student: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -106,7 +106,7 @@ class StudentActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Reading students with filters: {data}")
+            logger.info("Reading students with filters: %s", LogPayload(data))
             
             # Step 2: 判斷查詢類型
             if 'student_uuid' in data:
@@ -124,13 +124,13 @@ class StudentActor:
                 students = SqlDbBusinessService.get_entities(Students, {})
                 output = StudentsReadSerializer(students, many=True).data
             
-            logger.info(f"Students retrieved successfully")
+            logger.info("Students retrieved successfully")
             return success_response(output, "Students retrieved successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error reading students: {str(e)}")
+            logger.error("Error reading students: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -145,7 +145,7 @@ class StudentActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Updating student with data: {data}")
+            logger.info("Updating student with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['student_uuid'])
@@ -164,21 +164,31 @@ class StudentActor:
                 return error_response("Validation failed", serializer.errors, 400)
             
             # Step 5: 更新時間戳
-            update_fields['student_updated_at'] = TimestampService.get_current_timestamp()
-            
-            # Step 6: 執行更新
+            update_fields['student_updated_at'] = TimestampService.get_current_datetime()
+            
+            # Step 6: 執行更新（學期變更時同步成績的分區鍵）
+            new_semester = update_fields.get('student_semester')
+            if new_semester and new_semester != student.student_semester:
+                SemesterPartitionService.ensure_partition(Students, new_semester)
+                SemesterPartitionService.ensure_partition(Score, new_semester)
+                scores = SqlDbBusinessService.get_entities(Score, {'f_student_uuid': student.student_uuid})
+                for score in scores:
+                    SqlDbBusinessService.update_entity(score, {
+                        'score_semester': new_semester,
+                        'score_updated_at': update_fields['student_updated_at'],
+                    })
             updated_student = SqlDbBusinessService.update_entity(student, update_fields)
             
             # Step 7: 格式化輸出
             output = StudentsReadSerializer(updated_student).data
-            logger.info(f"Student updated successfully: {data['student_uuid']}")
+            logger.info("Student updated successfully: %s", data['student_uuid'])
             
             return success_response(output, "Student updated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error updating student: {str(e)}")
+            logger.error("Error updating student: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -193,7 +203,7 @@ class StudentActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Deleting student with data: {data}")
+            logger.info("Deleting student with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['student_uuid'])
@@ -205,20 +215,16 @@ class StudentActor:
             if not student:
                 return error_response("Student not found", None, 404)
             
-            # Step 4: 刪除相關成績（級聯刪除）
-            deleted_scores = SqlDbBusinessService.delete_entities(Score, {'f_student_uuid': data['student_uuid']})
-            logger.info(f"Deleted {deleted_scores} related scores")
-            
-            # Step 5: 刪除學生
+            # Step 4: 刪除學生（相關成績由 Score.student 外鍵 CASCADE 一併刪除）
             SqlDbBusinessService.delete_entity(student)
             
-            logger.info(f"Student deleted successfully: {data['student_uuid']}")
+            logger.info("Student deleted successfully: %s", data['student_uuid'])
             return success_response(None, "Student and related scores deleted successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error deleting student: {str(e)}")
+            logger.error("Error deleting student: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -233,7 +239,7 @@ class StudentActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Updating student status with data: {data}")
+            logger.info("Updating student status with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['student_uuid', 'student_status'])
@@ -253,7 +259,7 @@ class StudentActor:
             # Step 5: 更新狀態
             update_data = {
                 'student_status': data['student_status'],
-                'student_updated_at': TimestampService.get_current_timestamp()
+                'student_updated_at': TimestampService.get_current_datetime()
             }
             
             # Step 6: 如果狀態改為「二退」，清空該學生的所有成績
@@ -266,25 +272,33 @@ class StudentActor:
                         'score_quiz2': '',
                         'score_finalexam': '',
                         'score_total': '',
-                        'score_updated_at': TimestampService.get_current_timestamp()
+                        'score_updated_at': TimestampService.get_current_datetime()
                     }
                     SqlDbBusinessService.update_entity(score, clear_data)
-                logger.info(f"Cleared scores for student: {data['student_uuid']}")
+                logger.info("Cleared scores for student: %s", data['student_uuid'])
             
             updated_student = SqlDbBusinessService.update_entity(student, update_data)
             
             # Step 7: 格式化輸出
             output = StudentsReadSerializer(updated_student).data
-            logger.info(f"Student status updated successfully: {data['student_uuid']}")
+            logger.info("Student status updated successfully: %s", data['student_uuid'])
             
             return success_response(output, "Student status updated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error updating student status: {str(e)}")
+            logger.error("Error updating student status: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
+    @staticmethod
+    def _load_openpyxl():
+        """延遲載入 openpyxl（僅 Excel 匯入 / 匯出使用，避免拖慢啟動），未安裝時回傳 None"""
+        try:
+            return importlib.import_module('openpyxl')
+        except ImportError:
+            return None
+
     @staticmethod
     @csrf_exempt
     @require_http_methods(["POST"])
@@ -295,8 +309,9 @@ class StudentActor:
         POST /api/v0.1/Calculus_oom/Calculus_metadata/Student_MetadataWriter/upload_excel
         """
         try:
-            # Step 1: 檢查 openpyxl 是否安裝
-            if load_workbook is None or Workbook is None:
+            # Step 1: 檢查 openpyxl 是否安裝（首次使用時才載入）
+            openpyxl = StudentActor._load_openpyxl()
+            if openpyxl is None:
                 return error_response(
                     "Excel support not available. Please install openpyxl: pip install openpyxl",
                     None,
@@ -311,12 +326,19 @@ class StudentActor:
             student_semester = request.POST.get('student_semester', '').strip()
             if not student_semester:
                 return error_response("Missing required field: student_semester", None, 400)
+            is_valid_semester, error_msg = ValidationService.validate_semester_format(student_semester)
+            if not is_valid_semester:
+                return error_response(error_msg, None, 400)
+
+            logger.info("Uploading student Excel file: %s, semester: %s", uploaded_file.name, student_semester)
 
-            logger.info(f"Uploading student Excel file: {uploaded_file.name}, semester: {student_semester}")
+            # 新學期首次出現時自動建立分區
+            SemesterPartitionService.ensure_partition(Students, student_semester)
+            SemesterPartitionService.ensure_partition(Score, student_semester)
 
             # Step 3: 讀取 Excel
             try:
-                workbook = load_workbook(filename=io.BytesIO(uploaded_file.read()))
+                workbook = openpyxl.load_workbook(filename=io.BytesIO(uploaded_file.read()))
                 sheet = workbook.active
             except Exception as e:
                 return error_response(f"Invalid Excel file: {str(e)}", None, 400)
@@ -351,7 +373,7 @@ class StudentActor:
 
                     # 生成 UUID 和時間戳
                     student_uuid = UuidService.generate_student_uuid(student_semester)
-                    timestamp = TimestampService.get_current_timestamp()
+                    timestamp = TimestampService.get_current_datetime()
 
                     # 準備完整數據
                     complete_data = {
@@ -376,7 +398,9 @@ class StudentActor:
                     score_uuid = UuidService.generate_score_uuid(student_semester)
                     score_data = {
                         'score_uuid': score_uuid,
+                        'student': student,
                         'f_student_uuid': student_uuid,
+                        'score_semester': student_semester,
                         'score_quiz1': '',
                         'score_midterm': '',
                         'score_quiz2': '',
@@ -401,7 +425,7 @@ class StudentActor:
                 'errors': errors[:10] if errors else []  # 最多返回前 10 個錯誤
             }
             
-            logger.info(f"Excel upload completed: {len(created_students)} created, {len(errors)} errors")
+            logger.info("Excel upload completed: %s created, %s errors", len(created_students), len(errors))
             
             if len(created_students) > 0:
                 return success_response(
@@ -413,7 +437,7 @@ class StudentActor:
                 return error_response("No students created", output, 400)
             
         except Exception as e:
-            logger.error(f"Error uploading Excel: {str(e)}")
+            logger.error("Error uploading Excel: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -425,17 +449,19 @@ class StudentActor:
         POST /api/v0.1/Calculus_oom/Calculus_metadata/Student_MetadataWriter/feedback_excel
         """
         try:
-            # Step 1: 檢查 openpyxl 是否安裝
-            if Workbook is None:
+            # Step 1: 檢查 openpyxl 是否安裝（首次使用時才載入）
+            openpyxl = StudentActor._load_openpyxl()
+            if openpyxl is None:
                 return error_response(
                     "Excel support not available. Please install openpyxl: pip install openpyxl",
                     None,
                     500
                 )
+            from openpyxl.styles import PatternFill, Font
             
             # Step 2: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Exporting student scores to Excel: {data}")
+            logger.info("Exporting student scores to Excel: %s", LogPayload(data))
             
             # Step 3: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['student_semester'])
@@ -451,7 +477,7 @@ class StudentActor:
                 return error_response(f"No students found for semester {semester}", None, 404)
             
             # Step 5: 創建 Excel 工作簿
-            workbook = Workbook()
+            workbook = openpyxl.Workbook()
             sheet = workbook.active
             sheet.title = f"成績_{semester}"
 
@@ -469,22 +495,22 @@ class StudentActor:
             red_fill = PatternFill(start_color='FFCCCC', end_color='FFCCCC', fill_type='solid')
             red_font = Font(color='CC0000', bold=True)
 
-            # Step 6: 填充資料
+            # Step 6: 填充資料（自學期成績矩陣取分數，以學生 id 對應；分數以數值儲存格輸出）
+            matrix = ScoreMatrixService.get_matrix(semester)
+            score_fields = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total']
             for student in students:
-                score = SqlDbBusinessService.get_entity(Score, 'f_student_uuid', student.student_uuid)
+                row = matrix.row_of(student.id)
                 is_failed = (student.student_status == '被當')
                 pass_fail_label = '被當' if is_failed else '通過'
 
-                row_data = [
-                    student.student_name,
-                    student.student_number,
-                    score.score_quiz1 if score else '',
-                    score.score_midterm if score else '',
-                    score.score_quiz2 if score else '',
-                    score.score_finalexam if score else '',
-                    score.score_total if score else '',
-                    pass_fail_label,
-                ]
+                row_data = [student.student_name, student.student_number]
+                for field in score_fields:
+                    value = matrix.value(row, field) if row is not None else None
+                    if value is None:
+                        row_data.append('')
+                    else:
+                        row_data.append(int(value) if value.is_integer() else value)
+                row_data.append(pass_fail_label)
                 sheet.append(row_data)
 
                 # 對被當學生整行標紅
@@ -507,11 +533,51 @@ class StudentActor:
             )
             response['Content-Disposition'] = f'attachment; filename="students_scores_{semester}.xlsx"'
             
-            logger.info(f"Excel exported successfully for semester {semester}")
+            logger.info("Excel exported successfully for semester %s", semester)
             return response
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error exporting Excel: {str(e)}")
+            logger.error("Error exporting Excel: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def changes(request):
+        """
+        查詢學生增量異動（change feed，依游標同步）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Student_MetadataWriter/changes
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading student changes: %s", LogPayload(data))
+            
+            # Step 2: 驗證游標參數
+            try:
+                cursor, limit, semester = ChangeFeedService.parse_request(data)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 3: 讀取游標之後的異動
+            changes, next_cursor, has_more = ChangeFeedService.get_changes(
+                ChangeFeedService.ENTITY_STUDENTS, cursor, limit, semester
+            )
+            
+            # Step 4: 批次查詢目前資料（已刪除者不在結果中）
+            uuids = [change.change_entity_uuid for change in changes]
+            entities = SqlDbBusinessService.get_entities(Students, {'student_uuid__in': uuids}) if uuids else []
+            current = {item['student_uuid']: item for item in StudentsReadSerializer(entities, many=True).data}
+            
+            # Step 5: 格式化輸出
+            output = ChangeFeedService.build_feed(changes, current, next_cursor, has_more)
+            logger.info("Student changes retrieved: %s (next_cursor=%s)", len(changes), next_cursor)
+            return success_response(output, "Student changes retrieved successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error reading student changes: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
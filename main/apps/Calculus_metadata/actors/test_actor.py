@@ -5,13 +5,16 @@ import json
 import logging
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 from main.apps.Calculus_metadata.models import Test
 from main.apps.Calculus_metadata.serializers import TestWriteSerializer, TestReadSerializer
 from main.apps.Calculus_metadata.services.common import UuidService, TimestampService, ValidationService
 from main.apps.Calculus_metadata.services.business import SqlDbBusinessService
+from main.apps.Calculus_metadata.services.optional.calculation import ExamSlotService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
 from main.utils.response import success_response, error_response
+from main.utils.logger import LogPayload
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +34,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Creating test with data: {data}")
+            logger.info("Creating test with data: %s", LogPayload(data))
             
             # Step 2: 驗證數據
             serializer = TestWriteSerializer(data=data)
@@ -40,15 +43,27 @@ class TestActor:
             
             validated_data = serializer.validated_data
             
-            # Step 3: 生成 UUID 和時間戳
-            test_type = "q1"  # 預設，可根據 test_name 推斷
+            # Step 3: 決定考試項目（未提供時依 test_name 推斷），同一學期同一項目僅能有一筆
+            test_slot = validated_data.get('test_slot')
+            if test_slot is None:
+                test_slot = ExamSlotService.infer_slot(validated_data['test_name'])
+            if ExamSlotService.slot_taken(validated_data['test_semester'], test_slot):
+                return error_response(
+                    f"test_slot '{test_slot}' already exists in semester {validated_data['test_semester']}",
+                    None,
+                    400
+                )
+            
+            # Step 4: 生成 UUID 和時間戳
+            test_type = ExamSlotService.SLOT_UUID_TYPES.get(test_slot, 'q1')
             test_uuid = UuidService.generate_test_uuid(validated_data['test_semester'], test_type)
-            timestamp = TimestampService.get_current_timestamp()
+            timestamp = TimestampService.get_current_datetime()
             
-            # Step 4: 準備完整數據
+            # Step 5: 準備完整數據
             complete_data = {
                 'test_uuid': test_uuid,
                 'test_name': validated_data['test_name'],
+                'test_slot': test_slot,
                 'test_date': validated_data['test_date'],
                 'test_range': validated_data['test_range'],
                 'test_semester': validated_data['test_semester'],
@@ -59,19 +74,23 @@ class TestActor:
                 'test_updated_at': timestamp,
             }
             
-            # Step 5: 創建考試
+            # Step 6: 創建考試
             test = SqlDbBusinessService.create_entity(Test, complete_data)
             
-            # Step 6: 格式化輸出
+            # Step 7: 格式化輸出
             output = TestReadSerializer(test).data
-            logger.info(f"Test created successfully: {test_uuid}")
+            logger.info("Test created successfully: %s", test_uuid)
             
             return success_response(output, "Test created successfully", 201)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
+        except IntegrityError as e:
+            # 並行寫入同一學期同一考試項目時，由 test_semester_slot_uniq 約束擋下
+            logger.warning("Integrity error creating test: %s", e)
+            return error_response(f"Integrity error: {str(e)}", None, 400)
         except Exception as e:
-            logger.error(f"Error creating test: {str(e)}")
+            logger.error("Error creating test: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -85,7 +104,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Reading tests with filters: {data}")
+            logger.info("Reading tests with filters: %s", LogPayload(data))
             
             # Step 2: 查詢考試
             if 'test_uuid' in data:
@@ -100,13 +119,13 @@ class TestActor:
                 tests = SqlDbBusinessService.get_entities(Test, {})
                 output = TestReadSerializer(tests, many=True).data
             
-            logger.info(f"Tests retrieved successfully")
+            logger.info("Tests retrieved successfully")
             return success_response(output, "Tests retrieved successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error reading tests: {str(e)}")
+            logger.error("Error reading tests: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -121,7 +140,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Updating test with data: {data}")
+            logger.info("Updating test with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_uuid'])
@@ -139,22 +158,37 @@ class TestActor:
             if not serializer.is_valid():
                 return error_response("Validation failed", serializer.errors, 400)
             
+            # 變更考試項目或學期時，同一學期同一項目僅能有一筆
+            if 'test_slot' in update_fields or 'test_semester' in update_fields:
+                target_semester = update_fields.get('test_semester', test.test_semester)
+                target_slot = update_fields.get('test_slot', test.test_slot)
+                if ExamSlotService.slot_taken(target_semester, target_slot, exclude_uuid=test.test_uuid):
+                    return error_response(
+                        f"test_slot '{target_slot}' already exists in semester {target_semester}",
+                        None,
+                        400
+                    )
+            
             # Step 5: 更新時間戳
-            update_fields['test_updated_at'] = TimestampService.get_current_timestamp()
+            update_fields['test_updated_at'] = TimestampService.get_current_datetime()
             
             # Step 6: 執行更新
             updated_test = SqlDbBusinessService.update_entity(test, update_fields)
             
             # Step 7: 格式化輸出
             output = TestReadSerializer(updated_test).data
-            logger.info(f"Test updated successfully: {data['test_uuid']}")
+            logger.info("Test updated successfully: %s", data['test_uuid'])
             
             return success_response(output, "Test updated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
+        except IntegrityError as e:
+            # 並行寫入同一學期同一考試項目時，由 test_semester_slot_uniq 約束擋下
+            logger.warning("Integrity error updating test: %s", e)
+            return error_response(f"Integrity error: {str(e)}", None, 400)
         except Exception as e:
-            logger.error(f"Error updating test: {str(e)}")
+            logger.error("Error updating test: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -169,7 +203,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Deleting test with data: {data}")
+            logger.info("Deleting test with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_uuid'])
@@ -184,13 +218,13 @@ class TestActor:
             # Step 4: 刪除考試
             SqlDbBusinessService.delete_entity(test)
             
-            logger.info(f"Test deleted successfully: {data['test_uuid']}")
+            logger.info("Test deleted successfully: %s", data['test_uuid'])
             return success_response(None, "Test deleted successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error deleting test: {str(e)}")
+            logger.error("Error deleting test: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -205,7 +239,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Updating test status with data: {data}")
+            logger.info("Updating test status with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_uuid', 'test_state'])
@@ -225,20 +259,20 @@ class TestActor:
             # Step 5: 更新狀態
             update_data = {
                 'test_states': data['test_state'],
-                'test_updated_at': TimestampService.get_current_timestamp()
+                'test_updated_at': TimestampService.get_current_datetime()
             }
             updated_test = SqlDbBusinessService.update_entity(test, update_data)
             
             # Step 6: 格式化輸出
             output = TestReadSerializer(updated_test).data
-            logger.info(f"Test status updated successfully: {data['test_uuid']}")
+            logger.info("Test status updated successfully: %s", data['test_uuid'])
             
             return success_response(output, "Test status updated successfully", 200)
             
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error updating test status: {str(e)}")
+            logger.error("Error updating test status: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
     
     @staticmethod
@@ -253,7 +287,7 @@ class TestActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Setting test weights with data: {data}")
+            logger.info("Setting test weights with data: %s", LogPayload(data))
             
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(data, ['test_semester', 'weights'])
@@ -279,18 +313,18 @@ class TestActor:
                 for test in tests:
                     update_data = {
                         'test_weight': str(weight),
-                        'test_updated_at': TimestampService.get_current_timestamp()
+                        'test_updated_at': TimestampService.get_current_datetime()
                     }
                     
                     # 只有當狀態為"考卷完成"時，才自動更新為"考卷成績結算"
                     if test.test_states == '考卷完成':
                         update_data['test_states'] = '考卷成績結算'
-                        logger.info(f"Auto-updating test status to '考卷成績結算' for test: {test.test_name}")
+                        logger.info("Auto-updating test status to '考卷成績結算' for test: %s", test.test_name)
                     
                     SqlDbBusinessService.update_entity(test, update_data)
                     updated_count += 1
             
-            logger.info(f"Test weights set successfully for {updated_count} tests")
+            logger.info("Test weights set successfully for %s tests", updated_count)
             return success_response(
                 {'updated_count': updated_count},
                 f"Weights set successfully for {updated_count} tests",
@@ -300,5 +334,45 @@ class TestActor:
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error setting test weights: {str(e)}")
+            logger.error("Error setting test weights: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def changes(request):
+        """
+        查詢考試增量異動（change feed，依游標同步）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/Test_MetadataWriter/changes
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading test changes: %s", LogPayload(data))
+            
+            # Step 2: 驗證游標參數
+            try:
+                cursor, limit, semester = ChangeFeedService.parse_request(data)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+            
+            # Step 3: 讀取游標之後的異動
+            changes, next_cursor, has_more = ChangeFeedService.get_changes(
+                ChangeFeedService.ENTITY_TEST, cursor, limit, semester
+            )
+            
+            # Step 4: 批次查詢目前資料（已刪除者不在結果中）
+            uuids = [change.change_entity_uuid for change in changes]
+            entities = SqlDbBusinessService.get_entities(Test, {'test_uuid__in': uuids}) if uuids else []
+            current = {item['test_uuid']: item for item in TestReadSerializer(entities, many=True).data}
+            
+            # Step 5: 格式化輸出
+            output = ChangeFeedService.build_feed(changes, current, next_cursor, has_more)
+            logger.info("Test changes retrieved: %s (next_cursor=%s)", len(changes), next_cursor)
+            return success_response(output, "Test changes retrieved successfully", 200)
+            
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error reading test changes: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
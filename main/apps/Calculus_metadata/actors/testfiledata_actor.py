@@ -10,9 +10,16 @@ from django.http import FileResponse, HttpResponse
 from django.db import transaction
 
 from main.apps.Calculus_metadata.services.common import UuidService, TimestampService, ValidationService
-from main.apps.Calculus_metadata.services.business import NoSqlDbBusinessService, SqlDbBusinessService
+from main.apps.Calculus_metadata.services.business import (
+    NoSqlDbBusinessService,
+    SqlDbBusinessService,
+    AsyncNoSqlDbBusinessService,
+)
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
 from main.apps.Calculus_metadata.models import Test
 from main.utils.response import success_response, error_response
+from main.utils.async_views import async_csrf_exempt, async_require_http_methods
+from main.utils.logger import LogPayload
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +59,7 @@ class TestFiledataActor:
             asset_type = request.POST.get('asset_type')
             uploaded_files = request.FILES.getlist('file')
 
-            logger.info(f"Uploading files for test: {test_uuid}, asset_type: {asset_type}")
+            logger.info("Uploading files for test: %s, asset_type: %s", test_uuid, asset_type)
 
             # Step 2: 驗證必要欄位
             if not test_uuid or not asset_type:
@@ -96,7 +103,7 @@ class TestFiledataActor:
             gridfs_id = NoSqlDbBusinessService.upload_file_to_gridfs(
                 gridfs_filename, file_data, content_type
             )
-            logger.info(f"File uploaded to GridFS: {gridfs_id} ({gridfs_filename})")
+            logger.info("File uploaded to GridFS: %s (%s)", gridfs_id, gridfs_filename)
 
             # Step 7: 更新或建立 MongoDB 文檔
             timestamp = TimestampService.get_current_timestamp()
@@ -135,6 +142,13 @@ class TestFiledataActor:
                     document
                 )
 
+            ChangeFeedService.record(
+                ChangeFeedService.ENTITY_TEST_PIC,
+                file_uuid,
+                ChangeFeedService.OPERATION_UPDATE if is_update else ChangeFeedService.OPERATION_CREATE,
+                test.test_semester
+            )
+
             # Step 8: 更新 Test 表的 pt_opt_score_uuid 並自動更新狀態
             update_sql = {}
             if not test.pt_opt_score_uuid:
@@ -143,13 +157,13 @@ class TestFiledataActor:
             if asset_type in ['paper', 'test_pic']:
                 if test.test_states == '尚未出考卷':
                     update_sql['test_states'] = '考卷完成'
-                    update_sql['test_updated_at'] = timestamp
-                    logger.info(f"Auto-updating test status to '考卷完成' for test: {test_uuid}")
+                    update_sql['test_updated_at'] = TimestampService.get_current_datetime()
+                    logger.info("Auto-updating test status to '考卷完成' for test: %s", test_uuid)
             elif asset_type in ['histogram', 'test_pic_histogram']:
                 if test.test_states == '考卷完成':
                     update_sql['test_states'] = '考卷成績結算'
-                    update_sql['test_updated_at'] = timestamp
-                    logger.info(f"Auto-updating test status to '考卷成績結算' for test: {test_uuid}")
+                    update_sql['test_updated_at'] = TimestampService.get_current_datetime()
+                    logger.info("Auto-updating test status to '考卷成績結算' for test: %s", test_uuid)
 
             if update_sql:
                 SqlDbBusinessService.update_entity(test, update_sql)
@@ -163,11 +177,11 @@ class TestFiledataActor:
                 'test_states': test.test_states if 'test_states' not in update_sql else update_sql['test_states'],
             }
 
-            logger.info(f"Files uploaded successfully: {file_uuid}")
+            logger.info("Files uploaded successfully: %s", file_uuid)
             return success_response(output, "Files uploaded successfully", 201)
 
         except Exception as e:
-            logger.error(f"Error uploading files: {str(e)}")
+            logger.error("Error uploading files: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
 
     @staticmethod
@@ -181,7 +195,7 @@ class TestFiledataActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Reading file with data: {data}")
+            logger.info("Reading file with data: %s", LogPayload(data))
 
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
@@ -217,7 +231,85 @@ class TestFiledataActor:
                 file_data, filename, content_type = NoSqlDbBusinessService.download_file_from_gridfs(gridfs_id)
                 response = HttpResponse(file_data, content_type=content_type)
                 response['Content-Disposition'] = f'inline; filename="{filename}"'
-                logger.info(f"File retrieved from GridFS: {file_uuid} ({gridfs_id}), type: {content_type}")
+                logger.info("File retrieved from GridFS: %s (%s), type: %s", file_uuid, gridfs_id, content_type)
+                return response
+
+            # Step 5b: 向下相容 — 從本地磁碟讀取舊格式檔案
+            if legacy_path:
+                if not os.path.exists(legacy_path):
+                    return error_response("File not found on disk", None, 404)
+
+                file_ext = os.path.splitext(legacy_path)[1].lower()
+                content_type_map = {
+                    '.pdf': 'application/pdf',
+                    '.jpg': 'image/jpeg',
+                    '.jpeg': 'image/jpeg',
+                    '.png': 'image/png',
+                    '.gif': 'image/gif',
+                }
+                content_type = content_type_map.get(file_ext, 'application/octet-stream')
+                response = FileResponse(open(legacy_path, 'rb'))
+                response['Content-Type'] = content_type
+                response['Content-Disposition'] = f'inline; filename="{os.path.basename(legacy_path)}"'
+                logger.info("File retrieved from disk (legacy): %s, type: %s", file_uuid, content_type)
+                return response
+
+            return error_response("ClientError: asset_type mismatch with file_uuid", None, 400)
+
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error reading file: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    @async_csrf_exempt
+    @async_require_http_methods(["POST"])
+    async def read_async(request):
+        """
+        讀取考卷檔案（async 版本：PyMongo Async，ASYNC_ACTORS=True 時掛載於 read 路徑）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/test-filedata/read
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading file with data: %s", LogPayload(data))
+
+            # Step 2: 驗證必要欄位
+            is_valid, missing_keys = ValidationService.validate_required_keys(
+                data, ['test_pic_uuid', 'asset_type']
+            )
+            if not is_valid:
+                return error_response(f"Missing required keys: {missing_keys}", None, 400)
+
+            file_uuid = data['test_pic_uuid']
+            asset_type = data['asset_type']
+
+            # Step 3: 驗證 asset_type
+            if asset_type not in TestFiledataActor.ALLOWED_ASSET_TYPES:
+                return error_response("ClientError: asset_type not allowed", None, 400)
+
+            # Step 4: 從 MongoDB 查詢文檔
+            document = await AsyncNoSqlDbBusinessService.get_document(
+                TestFiledataActor.COLLECTION_NAME,
+                {'test_pic_uuid': file_uuid}
+            )
+
+            if not document:
+                return error_response("Source not found", None, 404)
+
+            gridfs_field = TestFiledataActor._GRIDFS_FIELD[asset_type]
+            legacy_field = TestFiledataActor._LEGACY_PATH_FIELD[asset_type]
+
+            gridfs_id = document.get(gridfs_field, '')
+            legacy_path = document.get(legacy_field, '')
+
+            # Step 5a: 從 GridFS 讀取（優先）
+            if gridfs_id:
+                file_data, filename, content_type = await AsyncNoSqlDbBusinessService.download_file_from_gridfs(gridfs_id)
+                response = HttpResponse(file_data, content_type=content_type)
+                response['Content-Disposition'] = f'inline; filename="{filename}"'
+                logger.info("File retrieved from GridFS: %s (%s), type: %s", file_uuid, gridfs_id, content_type)
                 return response
 
             # Step 5b: 向下相容 — 從本地磁碟讀取舊格式檔案
@@ -237,7 +329,7 @@ class TestFiledataActor:
                 response = FileResponse(open(legacy_path, 'rb'))
                 response['Content-Type'] = content_type
                 response['Content-Disposition'] = f'inline; filename="{os.path.basename(legacy_path)}"'
-                logger.info(f"File retrieved from disk (legacy): {file_uuid}, type: {content_type}")
+                logger.info("File retrieved from disk (legacy): %s, type: %s", file_uuid, content_type)
                 return response
 
             return error_response("ClientError: asset_type mismatch with file_uuid", None, 400)
@@ -245,7 +337,7 @@ class TestFiledataActor:
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error reading file: {str(e)}")
+            logger.error("Error reading file: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
 
     @staticmethod
@@ -262,7 +354,7 @@ class TestFiledataActor:
             asset_type = request.POST.get('asset_type')
             uploaded_file = request.FILES.get('file')
 
-            logger.info(f"Updating file: {file_uuid}, asset_type: {asset_type}")
+            logger.info("Updating file: %s, asset_type: %s", file_uuid, asset_type)
 
             # Step 2: 驗證必要欄位
             if not file_uuid or not asset_type or not uploaded_file:
@@ -309,7 +401,14 @@ class TestFiledataActor:
                 }
             )
 
-            logger.info(f"File updated successfully: {file_uuid}, new GridFS ID: {new_gridfs_id}")
+            ChangeFeedService.record(
+                ChangeFeedService.ENTITY_TEST_PIC,
+                file_uuid,
+                ChangeFeedService.OPERATION_UPDATE,
+                document.get('test_semester', '')
+            )
+
+            logger.info("File updated successfully: %s, new GridFS ID: %s", file_uuid, new_gridfs_id)
             return success_response(
                 {'file_uuid': file_uuid, 'gridfs_id': new_gridfs_id},
                 "File updated successfully",
@@ -317,7 +416,7 @@ class TestFiledataActor:
             )
 
         except Exception as e:
-            logger.error(f"Error updating file: {str(e)}")
+            logger.error("Error updating file: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
 
     @staticmethod
@@ -331,7 +430,7 @@ class TestFiledataActor:
         try:
             # Step 1: 解析請求
             data = json.loads(request.body)
-            logger.info(f"Deleting file with data: {data}")
+            logger.info("Deleting file with data: %s", LogPayload(data))
 
             # Step 2: 驗證必要欄位
             is_valid, missing_keys = ValidationService.validate_required_keys(
@@ -363,9 +462,9 @@ class TestFiledataActor:
             if gridfs_id:
                 try:
                     NoSqlDbBusinessService.delete_file_from_gridfs(gridfs_id)
-                    logger.info(f"GridFS file deleted: {gridfs_id}")
+                    logger.info("GridFS file deleted: %s", gridfs_id)
                 except Exception as e:
-                    logger.warning(f"Could not delete GridFS file {gridfs_id}: {e}")
+                    logger.warning("Could not delete GridFS file %s: %s", gridfs_id, e)
 
             # Step 6: 更新 MongoDB（清除該欄位）
             NoSqlDbBusinessService.update_document(
@@ -377,11 +476,61 @@ class TestFiledataActor:
                 }
             )
 
-            logger.info(f"File deleted successfully: {file_uuid}")
+            ChangeFeedService.record(
+                ChangeFeedService.ENTITY_TEST_PIC,
+                file_uuid,
+                ChangeFeedService.OPERATION_UPDATE,
+                document.get('test_semester', '')
+            )
+
+            logger.info("File deleted successfully: %s", file_uuid)
             return success_response(None, "File deleted successfully", 200)
 
         except json.JSONDecodeError:
             return error_response("Invalid JSON format", None, 400)
         except Exception as e:
-            logger.error(f"Error deleting file: {str(e)}")
+            logger.error("Error deleting file: %s", e)
+            return error_response(f"Unknown error: {str(e)}", None, 500)
+
+    @staticmethod
+    @csrf_exempt
+    @require_http_methods(["POST"])
+    def changes(request):
+        """
+        查詢考卷檔案增量異動（change feed，依游標同步）
+        POST /api/v0.1/Calculus_oom/Calculus_metadata/test-filedata/changes
+        """
+        try:
+            # Step 1: 解析請求
+            data = json.loads(request.body)
+            logger.info("Reading file changes: %s", LogPayload(data))
+
+            # Step 2: 驗證游標參數
+            try:
+                cursor, limit, semester = ChangeFeedService.parse_request(data)
+            except ValueError as e:
+                return error_response(str(e), None, 400)
+
+            # Step 3: 讀取游標之後的異動
+            changes, next_cursor, has_more = ChangeFeedService.get_changes(
+                ChangeFeedService.ENTITY_TEST_PIC, cursor, limit, semester
+            )
+
+            # Step 4: 批次查詢目前資料（已刪除者不在結果中）
+            uuids = [change.change_entity_uuid for change in changes]
+            documents = NoSqlDbBusinessService.get_documents(
+                TestFiledataActor.COLLECTION_NAME,
+                {'test_pic_uuid': {'$in': uuids}}
+            ) if uuids else []
+            current = {document['test_pic_uuid']: document for document in documents}
+
+            # Step 5: 格式化輸出
+            output = ChangeFeedService.build_feed(changes, current, next_cursor, has_more)
+            logger.info("File changes retrieved: %s (next_cursor=%s)", len(changes), next_cursor)
+            return success_response(output, "File changes retrieved successfully", 200)
+
+        except json.JSONDecodeError:
+            return error_response("Invalid JSON format", None, 400)
+        except Exception as e:
+            logger.error("Error reading file changes: %s", e)
             return error_response(f"Unknown error: {str(e)}", None, 500)
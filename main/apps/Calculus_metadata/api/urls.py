@@ -1,14 +1,19 @@
 """
 Calculus_metadata API URLs
 """
+from django.conf import settings
 from django.urls import path
 from main.apps.Calculus_metadata.actors import (
     StudentActor,
     ScoreActor,
     TestActor,
     TestFiledataActor,
+    EventActor,
 )
 
+# ASGI 部署時以 async 版本取代熱門端點（同一路徑，回應格式相同）
+ASYNC_ACTORS = getattr(settings, 'ASYNC_ACTORS', False)
+
 urlpatterns = [
     # Student_MetadataWriter APIs
     path('Student_MetadataWriter/create', StudentActor.create, name='student_create'),
@@ -18,15 +23,24 @@ urlpatterns = [
     path('Student_MetadataWriter/status', StudentActor.status, name='student_status'),
     path('Student_MetadataWriter/upload_excel', StudentActor.upload_excel, name='student_upload_excel'),
     path('Student_MetadataWriter/feedback_excel', StudentActor.feedback_excel, name='student_feedback_excel'),
+    path('Student_MetadataWriter/changes', StudentActor.changes, name='student_changes'),
     
     # Score_MetadataWriter APIs
     path('Score_MetadataWriter/create', ScoreActor.create, name='score_create'),
-    path('Score_MetadataWriter/read', ScoreActor.read, name='score_read'),
+    path('Score_MetadataWriter/read', ScoreActor.read_async if ASYNC_ACTORS else ScoreActor.read, name='score_read'),
     path('Score_MetadataWriter/update', ScoreActor.update, name='score_update'),
     path('Score_MetadataWriter/delete', ScoreActor.delete, name='score_delete'),
     path('Score_MetadataWriter/calculation_final', ScoreActor.calculation_final, name='score_calculation_final'),
+    path('Score_MetadataWriter/simulate', ScoreActor.simulate, name='score_simulate'),
     path('Score_MetadataWriter/test_score', ScoreActor.test_score, name='score_test_score'),
-    path('Score_MetadataWriter/step_diagram', ScoreActor.step_diagram, name='score_step_diagram'),
+    path('Score_MetadataWriter/distribution', ScoreActor.distribution, name='score_distribution'),
+    path('Score_MetadataWriter/statistics', ScoreActor.statistics, name='score_statistics'),
+    path(
+        'Score_MetadataWriter/step_diagram',
+        ScoreActor.step_diagram_async if ASYNC_ACTORS else ScoreActor.step_diagram,
+        name='score_step_diagram'
+    ),
+    path('Score_MetadataWriter/changes', ScoreActor.changes, name='score_changes'),
     
     # Test_MetadataWriter APIs
     path('Test_MetadataWriter/create', TestActor.create, name='test_create'),
@@ -35,10 +49,19 @@ urlpatterns = [
     path('Test_MetadataWriter/delete', TestActor.delete, name='test_delete'),
     path('Test_MetadataWriter/status', TestActor.status, name='test_status'),
     path('Test_MetadataWriter/setweight', TestActor.setweight, name='test_setweight'),
+    path('Test_MetadataWriter/changes', TestActor.changes, name='test_changes'),
     
     # test-filedata APIs (NonSQL)
     path('test-filedata/create', TestFiledataActor.create, name='testfiledata_create'),
-    path('test-filedata/read', TestFiledataActor.read, name='testfiledata_read'),
+    path(
+        'test-filedata/read',
+        TestFiledataActor.read_async if ASYNC_ACTORS else TestFiledataActor.read,
+        name='testfiledata_read'
+    ),
     path('test-filedata/update', TestFiledataActor.update, name='testfiledata_update'),
     path('test-filedata/delete', TestFiledataActor.delete, name='testfiledata_delete'),
+    path('test-filedata/changes', TestFiledataActor.changes, name='testfiledata_changes'),
+    
+    # Event_MetadataWriter APIs (SSE, ASGI)
+    path('Event_MetadataWriter/stream', EventActor.stream, name='event_stream'),
 ]
@@ -11,4 +11,6 @@ class CalculusMetadataConfig(AppConfig):
     
     def ready(self):
         """App initialization"""
-        pass
+        import main.apps.Calculus_metadata.services.signals  # noqa: F401
+        from main.utils.request_metrics import install
+        install()
@@ -0,0 +1,96 @@
+"""
+量測 worker 啟動時 `import main.urls` 的耗時
+
+用法:
+    python manage.py benchmark_startup
+    python manage.py benchmark_startup --runs 10
+
+每次量測皆啟動全新的 Python 進程（避免模組快取），比較：
+    - lazy:  目前行為，matplotlib / openpyxl 於首次使用時才載入
+    - eager: 模擬於模組層級匯入 matplotlib.pyplot / openpyxl（延遲載入前的行為）
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+HEAVY_MODULES = ['matplotlib', 'matplotlib.pyplot', 'openpyxl']
+
+PROBE_SCRIPT = """
+import json, os, sys, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
+start = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+if {eager!r}:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot
+    import openpyxl
+    import openpyxl.styles
+import main.urls
+urls_done = time.perf_counter()
+print(json.dumps({{
+    'setup': setup_done - start,
+    'urls': urls_done - setup_done,
+    'total': urls_done - start,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark `import main.urls` startup time with lazy vs eager heavy imports"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Number of fresh processes per mode')
+
+    def probe(self, eager: bool) -> dict:
+        """啟動新進程量測一次"""
+        script = PROBE_SCRIPT.format(eager=eager, heavy=HEAVY_MODULES)
+        result = subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=str(settings.BASE_DIR),
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Probe process failed:\n{result.stderr}")
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        runs = max(options['runs'], 1)
+        summary = {}
+
+        for mode, eager in (('lazy', False), ('eager', True)):
+            try:
+                samples = [self.probe(eager) for _ in range(runs)]
+            except CommandError as e:
+                if eager:
+                    self.stdout.write(self.style.WARNING(f"eager: skipped ({str(e).splitlines()[-1]})"))
+                    continue
+                raise
+            summary[mode] = {
+                key: statistics.median(sample[key] for sample in samples)
+                for key in ('setup', 'urls', 'total')
+            }
+            self.stdout.write(
+                f"{mode:<6} django.setup {summary[mode]['setup'] * 1000:7.1f} ms | "
+                f"import main.urls {summary[mode]['urls'] * 1000:7.1f} ms | "
+                f"total {summary[mode]['total'] * 1000:7.1f} ms | "
+                f"loaded: {', '.join(samples[-1]['loaded']) or '-'}"
+            )
+
+        if 'eager' in summary:
+            saved = summary['eager']['total'] - summary['lazy']['total']
+            ratio = saved / summary['eager']['total'] * 100 if summary['eager']['total'] else 0
+            self.stdout.write(self.style.SUCCESS(
+                f"Lazy imports save {saved * 1000:.1f} ms per worker start ({ratio:.0f}%, median of {runs} runs)"
+            ))
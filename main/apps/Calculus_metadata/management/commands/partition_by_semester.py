@@ -0,0 +1,82 @@
+"""
+將 students / score 轉換為依學期清單分區的 PostgreSQL 分區表
+
+用法:
+    python manage.py partition_by_semester --dry-run
+    python manage.py partition_by_semester
+
+注意:
+    - 僅支援 PostgreSQL 12+，轉換期間會鎖表，請於維護時段執行
+    - 轉換後主鍵與唯一約束會加入學期欄位（PostgreSQL 分區表限制），
+      例如 student_number 變為「同學期內唯一」
+    - 需先執行 migrate；score.student 外鍵會改為 (student_id, score_semester)
+      參照 students (id, student_semester) 的複合外鍵
+    - 轉換完成後需設定 DB_SEMESTER_PARTITIONING=True，
+      新學期首次建立學生 / 成績時才會自動建立分區
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from main.apps.Calculus_metadata.models import Students, Score
+from main.apps.Calculus_metadata.services.optional.partition import SemesterPartitionService
+
+
+class Command(BaseCommand):
+    help = "Convert students / score tables to PostgreSQL LIST partitions by semester"
+
+    # (Model, 分區鍵欄位)
+    TARGETS = [
+        (Students, 'student_semester'),
+        (Score, 'score_semester'),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only print the SQL statements without executing them',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Semester partitioning requires PostgreSQL")
+
+        dry_run = options['dry_run']
+
+        executor = MigrationExecutor(connection)
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            raise CommandError("Unapplied migrations found. Run 'python manage.py migrate' first")
+
+        targets = []
+        for model_class, partition_field in self.TARGETS:
+            if SemesterPartitionService.is_partitioned(model_class):
+                self.stdout.write(f"{model_class._meta.db_table}: already partitioned, skipped")
+            else:
+                targets.append((model_class, partition_field))
+        if not targets:
+            return
+
+        with transaction.atomic():
+            # 外鍵需先移除，轉換後改建為含分區鍵的複合外鍵
+            statements = SemesterPartitionService.build_drop_foreign_keys_sql(Score, Students)
+            for model_class, partition_field in targets:
+                statements += SemesterPartitionService.build_conversion_sql(model_class, partition_field)
+            statements += SemesterPartitionService.build_partitioned_foreign_key_sql(
+                Score, 'student', 'score_semester', 'student_semester'
+            )
+            self.stdout.write(f"{len(statements)} statements")
+
+            with connection.cursor() as cursor:
+                for sql, params in statements:
+                    if dry_run:
+                        self.stdout.write(f"  {sql};  -- {params}" if params else f"  {sql};")
+                    else:
+                        cursor.execute(sql, params or None)
+
+            if dry_run:
+                transaction.set_rollback(True)
+
+        SemesterPartitionService.clear_cache()
+        if not dry_run:
+            self.stdout.write(self.style.SUCCESS("Semester partitioning completed"))
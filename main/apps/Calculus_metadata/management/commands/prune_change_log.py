@@ -0,0 +1,41 @@
+"""
+清除過期的異動紀錄（change_log）
+
+用法:
+    python manage.py prune_change_log
+    python manage.py prune_change_log --days 60 --dry-run
+
+預設保留 CHANGE_LOG_RETENTION_DAYS 天，可由排程（cron）每日執行；
+游標早於保留期間的客戶端需以各 read 端點重新載入資料，再以 changes 回傳的 next_cursor 繼續同步
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+
+
+class Command(BaseCommand):
+    help = "Delete change_log rows older than the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Retention in days (default: CHANGE_LOG_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows that would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.CHANGE_LOG_RETENTION_DAYS
+        if days < 1:
+            raise CommandError("--days must be >= 1")
+        count = ChangeFeedService.prune(days, options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(f"{count} change_log row(s) older than {days} day(s) would be deleted")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {count} change_log row(s) older than {days} day(s)"))
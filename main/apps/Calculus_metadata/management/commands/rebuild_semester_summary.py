@@ -0,0 +1,32 @@
+"""
+自 score / students 重建學期成績彙總表（semester_score_summary）
+
+用法:
+    python manage.py rebuild_semester_summary
+    python manage.py rebuild_semester_summary --semester 1141 --semester 1132
+
+彙總表平時由 signals 隨成績異動增量維護；以下情況可執行本指令恢復：
+    - 以 SQL / bulk 操作直接修改 score / students（不觸發 signals）
+    - 懷疑彙總與實際成績不一致
+"""
+from django.core.management.base import BaseCommand
+
+from main.apps.Calculus_metadata.services.optional.summary import SemesterSummaryService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the semester score summary table from score / students"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--semester',
+            action='append',
+            dest='semesters',
+            help='Semester to rebuild (repeatable, default: all semesters with scores)',
+        )
+
+    def handle(self, *args, **options):
+        result = SemesterSummaryService.rebuild_all(options['semesters'])
+        for semester, total_count in result.items():
+            self.stdout.write(f"{semester}: rebuilt ({total_count} score values)")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(result)} semester(s)"))
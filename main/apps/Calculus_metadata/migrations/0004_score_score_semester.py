@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_score_semester(apps, schema_editor):
+    """以 Students.student_semester 回填 Score.score_semester"""
+    Score = apps.get_model('Calculus_metadata', 'Score')
+    Students = apps.get_model('Calculus_metadata', 'Students')
+    semester = Students.objects.filter(
+        student_uuid=OuterRef('f_student_uuid')
+    ).values('student_semester')[:1]
+    # 找不到對應學生的成績保持空字串（由預設分區承接）
+    Score.objects.filter(
+        score_semester='',
+        f_student_uuid__in=Students.objects.values('student_uuid'),
+    ).update(score_semester=Subquery(semester))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0003_students_student_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='score',
+            name='score_semester',
+            field=models.CharField(blank=True, default='', help_text='學期 (冗餘自 Students.student_semester，作為分區鍵)', max_length=255),
+        ),
+        migrations.RunPython(backfill_score_semester, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['score_semester'], name='score_score_s_78122b_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0004_score_score_semester'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_f_stude_91b962_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_score_s_78122b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='students',
+            name='students_student_ac2f0e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='test',
+            name='test_test_se_75cca4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['f_student_uuid'], include=('score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total'), name='score_student_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['score_semester'], include=('f_student_uuid', 'score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total'), name='score_semester_cover_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='students',
+            index=models.Index(fields=['student_semester', 'student_status'], name='students_student_6e4634_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(fields=['test_semester', 'test_name'], name='test_test_se_f7eeeb_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_score_student(apps, schema_editor):
+    """以 f_student_uuid 回填 Score.student（整數外鍵）"""
+    Score = apps.get_model('Calculus_metadata', 'Score')
+    Students = apps.get_model('Calculus_metadata', 'Students')
+    student_id = Students.objects.filter(
+        student_uuid=OuterRef('f_student_uuid')
+    ).values('id')[:1]
+    # 找不到對應學生的成績保持 NULL
+    Score.objects.filter(student__isnull=True).update(student=Subquery(student_id))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0005_composite_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='score',
+            name='student',
+            field=models.ForeignKey(blank=True, help_text='外鍵，關聯到 Students.id', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='Calculus_metadata.students'),
+        ),
+        migrations.RunPython(backfill_score_student, migrations.RunPython.noop),
+    ]
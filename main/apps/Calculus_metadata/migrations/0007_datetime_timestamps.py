@@ -0,0 +1,122 @@
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# (model_name, 欄位前綴)
+TIMESTAMP_MODELS = [
+    ('students', 'student'),
+    ('score', 'score'),
+    ('test', 'test'),
+]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+BATCH_SIZE = 1000
+
+
+def parse_timestamp(value, default):
+    """將舊字串時間戳（TIME_ZONE 本地時間）轉為 timezone-aware datetime，無法解析時使用 default"""
+    try:
+        return timezone.make_aware(datetime.strptime(value, TIMESTAMP_FORMAT))
+    except (TypeError, ValueError):
+        return default
+
+
+def backfill_datetimes(apps, schema_editor):
+    """回填 *_created_at_dt / *_updated_at_dt"""
+    now = timezone.now()
+    for model_name, prefix in TIMESTAMP_MODELS:
+        Model = apps.get_model('Calculus_metadata', model_name)
+        created, updated = f'{prefix}_created_at', f'{prefix}_updated_at'
+        batch = []
+        for entity in Model.objects.only('id', created, updated).iterator(chunk_size=BATCH_SIZE):
+            created_dt = parse_timestamp(getattr(entity, created), now)
+            setattr(entity, f'{created}_dt', created_dt)
+            setattr(entity, f'{updated}_dt', parse_timestamp(getattr(entity, updated), created_dt))
+            batch.append(entity)
+            if len(batch) >= BATCH_SIZE:
+                Model.objects.bulk_update(batch, [f'{created}_dt', f'{updated}_dt'])
+                batch = []
+        if batch:
+            Model.objects.bulk_update(batch, [f'{created}_dt', f'{updated}_dt'])
+
+
+def restore_strings(apps, schema_editor):
+    """反向遷移：以本地時間字串寫回舊欄位"""
+    for model_name, prefix in TIMESTAMP_MODELS:
+        Model = apps.get_model('Calculus_metadata', model_name)
+        fields = [f'{prefix}_created_at', f'{prefix}_updated_at']
+        batch = []
+        for entity in Model.objects.iterator(chunk_size=BATCH_SIZE):
+            for field in fields:
+                value = getattr(entity, f'{field}_dt')
+                setattr(entity, field, timezone.localtime(value).strftime(TIMESTAMP_FORMAT) if value else '')
+            batch.append(entity)
+            if len(batch) >= BATCH_SIZE:
+                Model.objects.bulk_update(batch, fields)
+                batch = []
+        if batch:
+            Model.objects.bulk_update(batch, fields)
+
+
+def add_temporary_fields():
+    operations = []
+    for model_name, prefix in TIMESTAMP_MODELS:
+        for suffix in ('created_at', 'updated_at'):
+            operations.append(migrations.AddField(
+                model_name=model_name,
+                name=f'{prefix}_{suffix}_dt',
+                field=models.DateTimeField(null=True),
+            ))
+    return operations
+
+
+def swap_fields():
+    operations = []
+    for model_name, prefix in TIMESTAMP_MODELS:
+        for suffix, options in (('created_at', {'auto_now_add': True}), ('updated_at', {'auto_now': True})):
+            name = f'{prefix}_{suffix}'
+            operations += [
+                # 先給舊欄位預設值，反向遷移重新加入欄位時才能填入既有資料列
+                migrations.AlterField(
+                    model_name=model_name,
+                    name=name,
+                    field=models.CharField(max_length=255, blank=True, default=''),
+                ),
+                migrations.RemoveField(model_name=model_name, name=name),
+                migrations.RenameField(model_name=model_name, old_name=f'{name}_dt', new_name=name),
+                migrations.AlterField(
+                    model_name=model_name,
+                    name=name,
+                    field=models.DateTimeField(
+                        help_text='建立時間' if suffix == 'created_at' else '更新時間',
+                        **options
+                    ),
+                ),
+            ]
+    return operations
+
+
+class Migration(migrations.Migration):
+    """字串時間戳欄位改為 timezone-aware DateTimeField，並為 *_updated_at 建立索引"""
+
+    dependencies = [
+        ('Calculus_metadata', '0006_score_student'),
+    ]
+
+    operations = add_temporary_fields() + [
+        migrations.RunPython(backfill_datetimes, restore_strings),
+    ] + swap_fields() + [
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['score_updated_at'], name='score_score_u_210c3b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='students',
+            index=models.Index(fields=['student_updated_at'], name='students_student_d140f6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(fields=['test_updated_at'], name='test_test_up_5c140c_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0007_datetime_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('change_entity', models.CharField(help_text='異動實體: students/score/test/test_pic_information', max_length=255)),
+                ('change_entity_uuid', models.CharField(help_text='異動資料的唯一識別碼', max_length=255)),
+                ('change_operation', models.CharField(help_text='異動類型: create/update/delete', max_length=255)),
+                ('change_semester', models.CharField(blank=True, default='', help_text='異動資料所屬學期', max_length=255)),
+                ('change_created_at', models.DateTimeField(auto_now_add=True, help_text='建立時間')),
+            ],
+            options={
+                'verbose_name': '資料異動紀錄',
+                'verbose_name_plural': '資料異動紀錄列表',
+                'db_table': 'change_log',
+                'indexes': [models.Index(fields=['change_entity', 'id'], name='change_log_change__9e71e4_idx'), models.Index(fields=['change_entity', 'change_semester', 'id'], name='change_log_change__cc1c0a_idx')],
+            },
+        ),
+    ]
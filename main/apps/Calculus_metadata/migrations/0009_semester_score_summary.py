@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0008_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SemesterScoreSummary',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('summary_semester', models.CharField(help_text='學期', max_length=255)),
+                ('summary_field', models.CharField(help_text='分數欄位: score_quiz1/score_midterm/score_quiz2/score_finalexam/score_total', max_length=255)),
+                ('summary_count', models.IntegerField(default=0, help_text='有效分數筆數')),
+                ('summary_sum', models.FloatField(default=0.0, help_text='分數總和')),
+                ('summary_sum_squares', models.FloatField(default=0.0, help_text='分數平方和（計算標準差）')),
+                ('summary_bins', models.JSONField(default=list, help_text='固定寬度級距人數 [0-10), [10-20), ..., [90-100]')),
+                ('summary_pass_count', models.IntegerField(default=0, help_text='及格（>= 60）人數')),
+                ('summary_fail_count', models.IntegerField(default=0, help_text='不及格人數')),
+                ('summary_updated_at', models.DateTimeField(auto_now=True, help_text='更新時間')),
+            ],
+            options={
+                'verbose_name': '學期成績彙總',
+                'verbose_name_plural': '學期成績彙總列表',
+                'db_table': 'semester_score_summary',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='semesterscoresummary',
+            constraint=models.UniqueConstraint(fields=('summary_semester', 'summary_field'), name='semester_score_summary_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+def clear_summaries(apps, schema_editor):
+    """既有彙總列沒有分位數摘要，清除後於下次讀取 / 寫入時自動重建"""
+    SemesterScoreSummary = apps.get_model('Calculus_metadata', 'SemesterScoreSummary')
+    SemesterScoreSummary.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0009_semester_score_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='semesterscoresummary',
+            name='summary_sketch',
+            field=models.JSONField(default=dict, help_text='分位數摘要（QuantileSketch.to_dict，可跨學期合併）'),
+        ),
+        migrations.RunPython(clear_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0010_summary_quantile_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalculationRun',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('run_uuid', models.CharField(help_text='計算紀錄唯一識別碼', max_length=255, unique=True)),
+                ('run_semester', models.CharField(help_text='學期', max_length=255)),
+                ('run_mode', models.CharField(help_text='計算範圍: full/incremental', max_length=255)),
+                ('run_inputs_hash', models.CharField(help_text='權重與及格分數的 SHA-256（不同時下次增量計算改為全量）', max_length=64)),
+                ('run_weights', models.JSONField(default=dict, help_text='計算時的考試權重 {考試名稱: 權重}')),
+                ('run_passing_score', models.FloatField(help_text='及格分數')),
+                ('run_cursor', models.BigIntegerField(help_text='計算開始前的 ChangeLog 游標（score / students）')),
+                ('run_evaluated_count', models.IntegerField(default=0, help_text='重新計算的學生數')),
+                ('run_updated_count', models.IntegerField(default=0, help_text='實際寫入（總分或狀態有變動）的學生數')),
+                ('run_created_at', models.DateTimeField(auto_now_add=True, help_text='建立時間')),
+            ],
+            options={
+                'verbose_name': '總成績計算紀錄',
+                'verbose_name_plural': '總成績計算紀錄列表',
+                'db_table': 'calculation_run',
+                'indexes': [models.Index(fields=['run_semester', 'id'], name='calculation_run_sem_ce0e72_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+
+# 與先前 step_diagram / calculation_final 的名稱比對規則相同
+NAME_KEYWORDS = [
+    ('第一', 'quiz1'),
+    ('期中', 'midterm'),
+    ('第二', 'quiz2'),
+    ('期末', 'finalexam'),
+]
+
+
+def backfill_test_slot(apps, schema_editor):
+    """依 test_name 回填 Test.test_slot（同一學期同一 slot 僅指定最早建立的考試）"""
+    Test = apps.get_model('Calculus_metadata', 'Test')
+    taken = set()
+    for test in Test.objects.filter(test_slot='').order_by('id'):
+        for keyword, slot in NAME_KEYWORDS:
+            if keyword in test.test_name:
+                if (test.test_semester, slot) not in taken:
+                    taken.add((test.test_semester, slot))
+                    Test.objects.filter(id=test.id).update(test_slot=slot)
+                break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0011_calculation_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='test',
+            name='test_slot',
+            field=models.CharField(blank=True, default='', help_text='考試項目: quiz1/midterm/quiz2/finalexam（對應 score_quiz1/score_midterm/score_quiz2/score_finalexam，空白為不計入總成績）', max_length=32),
+        ),
+        migrations.RunPython(backfill_test_slot, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(fields=['test_semester', 'test_slot'], name='test_test_se_de1e14_idx'),
+        ),
+    ]
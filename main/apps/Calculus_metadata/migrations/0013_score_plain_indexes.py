@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0012_test_slot'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_student_cover_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_semester_cover_idx',
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['f_student_uuid'], name='score_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='score',
+            index=models.Index(fields=['score_semester'], name='score_semester_idx'),
+        ),
+    ]
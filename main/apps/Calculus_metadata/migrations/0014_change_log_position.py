@@ -0,0 +1,89 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+import main.apps.Calculus_metadata.models.change_log
+
+
+# 游標位置 = 交易 id + 位移；位移使新位置一定大於既有的 id，
+# 既有紀錄以 id 作為位置，客戶端手上的舊游標（id）仍然有效
+CREATE_FUNCTIONS = """
+UPDATE change_log SET change_position = id;
+DO $$
+DECLARE
+    position_offset bigint;
+BEGIN
+    SELECT GREATEST(COALESCE(MAX(id), 0) + 1 - pg_current_xact_id()::text::bigint, 0)
+      INTO position_offset FROM change_log;
+    EXECUTE format(
+        'CREATE OR REPLACE FUNCTION change_log_position() RETURNS bigint LANGUAGE sql VOLATILE AS %L',
+        format('SELECT pg_current_xact_id()::text::bigint + %s', position_offset)
+    );
+    EXECUTE format(
+        'CREATE OR REPLACE FUNCTION change_log_horizon() RETURNS bigint LANGUAGE sql STABLE AS %L',
+        format('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint + %s', position_offset)
+    );
+END
+$$;
+"""
+
+DROP_FUNCTIONS = """
+DROP FUNCTION IF EXISTS change_log_position();
+DROP FUNCTION IF EXISTS change_log_horizon();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0013_score_plain_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelog',
+            name='change_position',
+            field=main.apps.Calculus_metadata.models.change_log.ChangePositionField(
+                help_text='change feed 游標位置（寫入交易 id）', null=True
+            ),
+        ),
+        migrations.RunSQL(CREATE_FUNCTIONS, DROP_FUNCTIONS),
+        migrations.AlterField(
+            model_name='changelog',
+            name='change_position',
+            field=main.apps.Calculus_metadata.models.change_log.ChangePositionField(
+                help_text='change feed 游標位置（寫入交易 id）'
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name='changelog',
+            name='change_log_change__9e71e4_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='changelog',
+            name='change_log_change__cc1c0a_idx',
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(
+                fields=['change_position', 'id'], name='change_log_position_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(
+                fields=['change_entity', 'change_position'], name='change_log_entity_pos_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(
+                fields=['change_entity', 'change_semester', 'change_position'], name='change_log_semester_pos_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=['change_created_at'], name='change_log_created_brin'
+            ),
+        ),
+    ]
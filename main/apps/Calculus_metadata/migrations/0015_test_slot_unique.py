@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+
+def clear_duplicate_slots(apps, schema_editor):
+    """
+    同一學期同一 test_slot 有多筆時，保留最早建立的考試，其餘改為空白（不計入總成績），
+    並寫入異動紀錄，使學期 slot 快取與 change feed 客戶端看到變更
+    """
+    Test = apps.get_model('Calculus_metadata', 'Test')
+    ChangeLog = apps.get_model('Calculus_metadata', 'ChangeLog')
+    taken = set()
+    duplicates = []
+    for test in Test.objects.exclude(test_slot='').order_by('id'):
+        if (test.test_semester, test.test_slot) in taken:
+            duplicates.append(test)
+        else:
+            taken.add((test.test_semester, test.test_slot))
+    if not duplicates:
+        return
+    Test.objects.filter(id__in=[test.id for test in duplicates]).update(test_slot='')
+    for test in duplicates:
+        ChangeLog.objects.create(
+            change_entity='test',
+            change_entity_uuid=test.test_uuid,
+            change_operation='update',
+            change_semester=test.test_semester,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Calculus_metadata', '0014_change_log_position'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_slots, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='test',
+            name='test_test_se_de1e14_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='test',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('test_slot', ''), _negated=True),
+                fields=('test_semester', 'test_slot'),
+                name='test_semester_slot_uniq',
+            ),
+        ),
+    ]
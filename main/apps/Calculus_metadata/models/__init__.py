@@ -5,10 +5,16 @@ from .students import Students
 from .score import Score
 from .test import Test
 from .test_pic_information import TestPicInformation
+from .change_log import ChangeLog
+from .semester_score_summary import SemesterScoreSummary
+from .calculation_run import CalculationRun
 
 __all__ = [
     'Students',
     'Score',
     'Test',
     'TestPicInformation',
+    'ChangeLog',
+    'SemesterScoreSummary',
+    'CalculationRun',
 ]
@@ -0,0 +1,66 @@
+"""
+CalculationRun Model - SQL Database (PostgreSQL)
+總成績計算紀錄表（calculation_final 每次執行一筆）
+"""
+from django.db import models
+
+
+class CalculationRun(models.Model):
+    """總成績計算紀錄 Model - run_cursor 之後的異動即為下次增量計算的範圍"""
+
+    # Primary Key
+    id = models.BigAutoField(primary_key=True)
+
+    # Business Fields
+    run_uuid = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="計算紀錄唯一識別碼"
+    )
+    run_semester = models.CharField(
+        max_length=255,
+        help_text="學期"
+    )
+    run_mode = models.CharField(
+        max_length=255,
+        help_text="計算範圍: full/incremental"
+    )
+    run_inputs_hash = models.CharField(
+        max_length=64,
+        help_text="權重與及格分數的 SHA-256（不同時下次增量計算改為全量）"
+    )
+    run_weights = models.JSONField(
+        default=dict,
+        help_text="計算時的考試權重 {考試名稱: 權重}"
+    )
+    run_passing_score = models.FloatField(
+        help_text="及格分數"
+    )
+    run_cursor = models.BigIntegerField(
+        help_text="計算開始前的 ChangeLog 游標（score / students）"
+    )
+    run_evaluated_count = models.IntegerField(
+        default=0,
+        help_text="重新計算的學生數"
+    )
+    run_updated_count = models.IntegerField(
+        default=0,
+        help_text="實際寫入（總分或狀態有變動）的學生數"
+    )
+
+    # Lifecycle Fields
+    run_created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="建立時間"
+    )
+
+    class Meta:
+        db_table = 'calculation_run'
+        verbose_name = '總成績計算紀錄'
+        verbose_name_plural = '總成績計算紀錄列表'
+        indexes = [
+            models.Index(fields=['run_semester', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.run_uuid} {self.run_semester} {self.run_mode} ({self.run_updated_count}/{self.run_evaluated_count})"
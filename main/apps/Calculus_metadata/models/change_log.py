@@ -0,0 +1,97 @@
+"""
+ChangeLog Model - SQL Database (PostgreSQL)
+資料異動紀錄表（增量同步 change feed）
+"""
+from django.contrib.postgres.indexes import BrinIndex
+from django.db import models
+
+
+class ChangePosition(models.Func):
+    """寫入交易的游標位置（交易 id + 位移，見 migration 0014 的 change_log_position()）"""
+
+    function = 'change_log_position'
+    template = '%(function)s()'
+    output_field = models.BigIntegerField()
+
+
+class ChangeHorizon(models.Func):
+    """
+    目前仍在進行中的最舊交易的游標位置（change_log_horizon()）；
+    低於此值的位置皆已提交或回滾，之後不會再出現新的異動紀錄
+    """
+
+    function = 'change_log_horizon'
+    template = '%(function)s()'
+    output_field = models.BigIntegerField()
+
+
+class ChangePositionField(models.BigIntegerField):
+    """新增時由資料庫填入 ChangePosition()，並以 INSERT ... RETURNING 取回"""
+
+    db_returning = True
+
+    def pre_save(self, model_instance, add):
+        if add and getattr(model_instance, self.attname) is None:
+            return ChangePosition()
+        return super().pre_save(model_instance, add)
+
+
+class ChangeLog(models.Model):
+    """
+    資料異動紀錄 Model - change_position 即為 change feed 游標
+
+    id 依 INSERT 順序遞增，但交易提交順序不同，較小的 id 可能較晚才可見；
+    change_position 為寫入交易的 id，同一交易內的異動共用同一位置，
+    讀取時只回傳低於 ChangeHorizon() 的位置，游標因此不會越過尚未提交的異動
+    """
+    
+    # Primary Key
+    id = models.BigAutoField(primary_key=True)
+    
+    # 游標位置（同一交易相同，依交易開始順序遞增）
+    change_position = ChangePositionField(
+        help_text="change feed 游標位置（寫入交易 id）"
+    )
+    
+    # Business Fields
+    change_entity = models.CharField(
+        max_length=255,
+        help_text="異動實體: students/score/test/test_pic_information"
+    )
+    change_entity_uuid = models.CharField(
+        max_length=255,
+        help_text="異動資料的唯一識別碼"
+    )
+    change_operation = models.CharField(
+        max_length=255,
+        help_text="異動類型: create/update/delete"
+    )
+    change_semester = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="異動資料所屬學期"
+    )
+    
+    # Lifecycle Fields
+    change_created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="建立時間"
+    )
+    
+    class Meta:
+        db_table = 'change_log'
+        verbose_name = '資料異動紀錄'
+        verbose_name_plural = '資料異動紀錄列表'
+        indexes = [
+            models.Index(fields=['change_position', 'id'], name='change_log_position_idx'),
+            models.Index(fields=['change_entity', 'change_position'], name='change_log_entity_pos_idx'),
+            models.Index(
+                fields=['change_entity', 'change_semester', 'change_position'], name='change_log_semester_pos_idx'
+            ),
+            # 清除過期紀錄（prune_change_log）依建立時間篩選，資料依時間附加寫入，BRIN 索引即足夠
+            BrinIndex(fields=['change_created_at'], name='change_log_created_brin'),
+        ]
+    
+    def __str__(self):
+        return f"@{self.change_position} {self.change_operation} {self.change_entity}:{self.change_entity_uuid}"
@@ -49,20 +49,38 @@ class Score(models.Model):
         help_text="總分"
     )
     
-    # Foreign Key (Cross-database reference using CharField)
+    # Foreign Key (同資料庫關聯，整數 join)
+    student = models.ForeignKey(
+        'Students',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='scores',
+        help_text="外鍵，關聯到 Students.id"
+    )
+    
+    # 保留 UUID 參照供 API 相容
     f_student_uuid = models.CharField(
         max_length=255,
         db_index=True,
         help_text="外鍵，關聯到 Students.student_uuid"
     )
     
-    # Lifecycle Fields (無 status，依據規範)
-    score_created_at = models.CharField(
+    # Denormalised partition key (與 Students.student_semester 同步)
+    score_semester = models.CharField(
         max_length=255,
+        blank=True,
+        default="",
+        help_text="學期 (冗餘自 Students.student_semester，作為分區鍵)"
+    )
+    
+    # Lifecycle Fields (無 status，依據規範)
+    score_created_at = models.DateTimeField(
+        auto_now_add=True,
         help_text="建立時間"
     )
-    score_updated_at = models.CharField(
-        max_length=255,
+    score_updated_at = models.DateTimeField(
+        auto_now=True,
         help_text="更新時間"
     )
     
@@ -72,8 +90,18 @@ class Score(models.Model):
         verbose_name_plural = '分數列表'
         indexes = [
             models.Index(fields=['score_uuid']),
-            models.Index(fields=['f_student_uuid']),
+            # 依學生 / 學期讀取成績（Actor 讀取整列，不使用 INCLUDE 覆蓋欄位）
+            models.Index(fields=['f_student_uuid'], name='score_student_idx'),
+            models.Index(fields=['score_semester'], name='score_semester_idx'),
+            models.Index(fields=['score_updated_at']),
         ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 載入時的欄位值：學期成績彙總於 pre_save 計算增量時使用，不需再查詢一次
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def __str__(self):
         return f"Score {self.score_uuid} (Student: {self.f_student_uuid})"
@@ -0,0 +1,70 @@
+"""
+SemesterScoreSummary Model - SQL Database (PostgreSQL)
+學期成績彙總表（每個學期 × 分數欄位一列，隨成績異動增量維護）
+"""
+from django.db import models
+
+
+class SemesterScoreSummary(models.Model):
+    """學期成績彙總 Model - 統計不含二退學生，與學期成績矩陣一致"""
+
+    # Primary Key
+    id = models.BigAutoField(primary_key=True)
+
+    # Business Fields
+    summary_semester = models.CharField(
+        max_length=255,
+        help_text="學期"
+    )
+    summary_field = models.CharField(
+        max_length=255,
+        help_text="分數欄位: score_quiz1/score_midterm/score_quiz2/score_finalexam/score_total"
+    )
+    summary_count = models.IntegerField(
+        default=0,
+        help_text="有效分數筆數"
+    )
+    summary_sum = models.FloatField(
+        default=0.0,
+        help_text="分數總和"
+    )
+    summary_sum_squares = models.FloatField(
+        default=0.0,
+        help_text="分數平方和（計算標準差）"
+    )
+    summary_bins = models.JSONField(
+        default=list,
+        help_text="固定寬度級距人數 [0-10), [10-20), ..., [90-100]"
+    )
+    summary_pass_count = models.IntegerField(
+        default=0,
+        help_text="及格（>= 60）人數"
+    )
+    summary_fail_count = models.IntegerField(
+        default=0,
+        help_text="不及格人數"
+    )
+    summary_sketch = models.JSONField(
+        default=dict,
+        help_text="分位數摘要（QuantileSketch.to_dict，可跨學期合併）"
+    )
+
+    # Lifecycle Fields
+    summary_updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text="更新時間"
+    )
+
+    class Meta:
+        db_table = 'semester_score_summary'
+        verbose_name = '學期成績彙總'
+        verbose_name_plural = '學期成績彙總列表'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['summary_semester', 'summary_field'],
+                name='semester_score_summary_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.summary_semester} {self.summary_field} (n={self.summary_count})"
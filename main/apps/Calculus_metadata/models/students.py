@@ -44,12 +44,12 @@ class Students(models.Model):
         default="修業中",
         help_text="狀態: 修業中/二退/被當/修業完畢"
     )
-    student_created_at = models.CharField(
-        max_length=255,
+    student_created_at = models.DateTimeField(
+        auto_now_add=True,
         help_text="建立時間"
     )
-    student_updated_at = models.CharField(
-        max_length=255,
+    student_updated_at = models.DateTimeField(
+        auto_now=True,
         help_text="更新時間"
     )
     
@@ -59,8 +59,9 @@ class Students(models.Model):
         verbose_name_plural = '學生列表'
         indexes = [
             models.Index(fields=['student_uuid']),
-            models.Index(fields=['student_semester']),
+            models.Index(fields=['student_semester', 'student_status']),
             models.Index(fields=['student_status']),
+            models.Index(fields=['student_updated_at']),
         ]
     
     def __str__(self):
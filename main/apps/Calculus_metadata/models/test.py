@@ -22,6 +22,12 @@ class Test(models.Model):
         max_length=255,
         help_text="考試名稱"
     )
+    test_slot = models.CharField(
+        max_length=32,
+        blank=True,
+        default="",
+        help_text="考試項目: quiz1/midterm/quiz2/finalexam（對應 score_quiz1/score_midterm/score_quiz2/score_finalexam，空白為不計入總成績）"
+    )
     test_weight = models.CharField(
         max_length=255,
         blank=True,
@@ -55,12 +61,12 @@ class Test(models.Model):
         default="尚未出考卷",
         help_text="狀態: 尚未出考卷/考卷完成/考卷成績結算"
     )
-    test_created_at = models.CharField(
-        max_length=255,
+    test_created_at = models.DateTimeField(
+        auto_now_add=True,
         help_text="建立時間"
     )
-    test_updated_at = models.CharField(
-        max_length=255,
+    test_updated_at = models.DateTimeField(
+        auto_now=True,
         help_text="更新時間"
     )
     
@@ -70,8 +76,17 @@ class Test(models.Model):
         verbose_name_plural = '考卷列表'
         indexes = [
             models.Index(fields=['test_uuid']),
-            models.Index(fields=['test_semester']),
+            models.Index(fields=['test_semester', 'test_name']),
             models.Index(fields=['test_states']),
+            models.Index(fields=['test_updated_at']),
+        ]
+        constraints = [
+            # 同一學期同一考試項目僅能有一筆（空白 = 不計入總成績，不限筆數）
+            models.UniqueConstraint(
+                fields=['test_semester', 'test_slot'],
+                condition=~models.Q(test_slot=''),
+                name='test_semester_slot_uniq',
+            ),
         ]
     
     def __str__(self):
@@ -3,6 +3,7 @@ Score Serializers
 """
 from rest_framework import serializers
 from main.apps.Calculus_metadata.models import Score
+from main.apps.Calculus_metadata.services.common import TimestampService
 
 
 class ScoreWriteSerializer(serializers.Serializer):
@@ -53,6 +54,10 @@ class ScoreWriteSerializer(serializers.Serializer):
 class ScoreReadSerializer(serializers.ModelSerializer):
     """Score Read Serializer - 用於 Read"""
     
+    # DateTimeField 以本地時區輸出，維持既有字串格式
+    score_created_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    score_updated_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    
     class Meta:
         model = Score
         fields = [
@@ -64,6 +69,7 @@ class ScoreReadSerializer(serializers.ModelSerializer):
             'score_finalexam',
             'score_total',
             'f_student_uuid',
+            'score_semester',
             'score_created_at',
             'score_updated_at',
         ]
@@ -3,6 +3,7 @@ Students Serializers
 """
 from rest_framework import serializers
 from main.apps.Calculus_metadata.models import Students
+from main.apps.Calculus_metadata.services.common import TimestampService, ValidationService
 
 
 class StudentsWriteSerializer(serializers.Serializer):
@@ -37,6 +38,13 @@ class StudentsWriteSerializer(serializers.Serializer):
         help_text="狀態"
     )
     
+    def validate_student_semester(self, value):
+        """驗證學期格式（學期亦為分區名稱的一部分）"""
+        is_valid, error_message = ValidationService.validate_semester_format(value)
+        if not is_valid:
+            raise serializers.ValidationError(error_message)
+        return value
+    
     def validate_student_status(self, value):
         """驗證狀態值"""
         allowed_statuses = ["修業中", "二退", "被當", "修業完畢"]
@@ -50,6 +58,10 @@ class StudentsWriteSerializer(serializers.Serializer):
 class StudentsReadSerializer(serializers.ModelSerializer):
     """Students Read Serializer - 用於 Read"""
     
+    # DateTimeField 以本地時區輸出，維持既有字串格式
+    student_created_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    student_updated_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    
     class Meta:
         model = Students
         fields = [
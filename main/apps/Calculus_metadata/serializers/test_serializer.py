@@ -3,6 +3,8 @@ Test Serializers
 """
 from rest_framework import serializers
 from main.apps.Calculus_metadata.models import Test
+from main.apps.Calculus_metadata.services.common import TimestampService
+from main.apps.Calculus_metadata.services.optional.calculation import ExamSlotService
 
 
 class TestWriteSerializer(serializers.Serializer):
@@ -13,6 +15,12 @@ class TestWriteSerializer(serializers.Serializer):
         required=True,
         help_text="考試名稱"
     )
+    test_slot = serializers.CharField(
+        max_length=32,
+        required=False,
+        allow_blank=True,
+        help_text="考試項目: quiz1/midterm/quiz2/finalexam（未提供時依考試名稱推斷）"
+    )
     test_date = serializers.CharField(
         max_length=255,
         required=True,
@@ -57,17 +65,30 @@ class TestWriteSerializer(serializers.Serializer):
                 f"Invalid state. Must be one of: {', '.join(allowed_states)}"
             )
         return value
+    
+    def validate_test_slot(self, value):
+        """驗證考試項目"""
+        if value and value not in ExamSlotService.SLOTS:
+            raise serializers.ValidationError(
+                f"Invalid slot. Must be one of: {', '.join(ExamSlotService.SLOTS)}"
+            )
+        return value
 
 
 class TestReadSerializer(serializers.ModelSerializer):
     """Test Read Serializer - 用於 Read"""
     
+    # DateTimeField 以本地時區輸出，維持既有字串格式
+    test_created_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    test_updated_at = serializers.DateTimeField(format=TimestampService.TIMESTAMP_FORMAT, read_only=True)
+    
     class Meta:
         model = Test
         fields = [
             'id',
             'test_uuid',
             'test_name',
+            'test_slot',
             'test_weight',
             'test_semester',
             'test_date',
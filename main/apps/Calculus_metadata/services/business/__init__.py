@@ -3,8 +3,10 @@ Business Services Package
 """
 from .sqldb_operations import SqlDbBusinessService
 from .nosqldb_operations import NoSqlDbBusinessService
+from .async_nosqldb_operations import AsyncNoSqlDbBusinessService
 
 __all__ = [
     'SqlDbBusinessService',
     'NoSqlDbBusinessService',
+    'AsyncNoSqlDbBusinessService',
 ]
@@ -0,0 +1,173 @@
+"""
+Async NoSQL Database Operations - MongoDB 非同步通用操作服務（PyMongo Async API）
+"""
+import asyncio
+import weakref
+from typing import Dict, Any, Optional, Tuple
+from pymongo.errors import PyMongoError
+from bson import ObjectId
+from main.utils.env_loader import get_env
+from main.utils.request_metrics import record_gridfs_bytes
+from .nosqldb_operations import NoSqlDbBusinessService
+
+try:
+    from pymongo import AsyncMongoClient
+    from gridfs import AsyncGridFS
+except ImportError:  # pymongo < 4.13
+    AsyncMongoClient = None
+    AsyncGridFS = None
+
+
+class AsyncNoSqlDbBusinessService:
+    """MongoDB 非同步通用業務服務（供 ASGI async actor 使用）"""
+
+    # 每個 event loop 共用一個 client（連線池），loop 結束後自動釋放
+    _clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        是否可使用 PyMongo Async API
+
+        Returns:
+            是否可用
+        """
+        return AsyncMongoClient is not None
+
+    @staticmethod
+    def get_database():
+        """
+        獲取目前 event loop 的 MongoDB 資料庫
+
+        Returns:
+            AsyncDatabase 實例
+        """
+        if AsyncMongoClient is None:
+            raise Exception("PyMongo async API not available. Please install: pip install 'pymongo>=4.13'")
+        loop = asyncio.get_running_loop()
+        client = AsyncNoSqlDbBusinessService._clients.get(loop)
+        if client is None:
+            client = AsyncMongoClient(NoSqlDbBusinessService.get_connection_string())
+            AsyncNoSqlDbBusinessService._clients[loop] = client
+        return client[get_env("MONGO_DB", "calculus_nosql_db")]
+
+    @staticmethod
+    async def create_document(collection_name: str, document: Dict[str, Any]) -> str:
+        """
+        創建文檔
+
+        Args:
+            collection_name: 集合名稱
+            document: 文檔數據
+
+        Returns:
+            插入的文檔 ID
+        """
+        try:
+            db = AsyncNoSqlDbBusinessService.get_database()
+            result = await db[collection_name].insert_one(document)
+            return str(result.inserted_id)
+        except PyMongoError as e:
+            raise Exception(f"MongoDB insert error: {str(e)}")
+
+    @staticmethod
+    async def get_document(collection_name: str, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        查詢單個文檔
+
+        Args:
+            collection_name: 集合名稱
+            filters: 查詢條件
+
+        Returns:
+            文檔或 None
+        """
+        try:
+            db = AsyncNoSqlDbBusinessService.get_database()
+            document = await db[collection_name].find_one(filters)
+            if document:
+                document['_id'] = str(document['_id'])
+            return document
+        except PyMongoError as e:
+            raise Exception(f"MongoDB read error: {str(e)}")
+
+    @staticmethod
+    async def update_document(collection_name: str, filters: Dict[str, Any], update_data: Dict[str, Any]) -> int:
+        """
+        更新文檔
+
+        Args:
+            collection_name: 集合名稱
+            filters: 查詢條件
+            update_data: 更新數據
+
+        Returns:
+            更新的文檔數量
+        """
+        try:
+            db = AsyncNoSqlDbBusinessService.get_database()
+            result = await db[collection_name].update_one(filters, {'$set': update_data})
+            return result.modified_count
+        except PyMongoError as e:
+            raise Exception(f"MongoDB update error: {str(e)}")
+
+    # ── GridFS 二進位檔案存取 ──────────────────────────────────────────────────
+
+    @staticmethod
+    async def upload_file_to_gridfs(filename: str, data: bytes, content_type: str) -> str:
+        """
+        將二進位資料上傳至 GridFS
+
+        Args:
+            filename: 檔案名稱（元資料）
+            data: 二進位內容
+            content_type: MIME 類型
+
+        Returns:
+            GridFS ObjectId 字串
+        """
+        try:
+            fs = AsyncGridFS(AsyncNoSqlDbBusinessService.get_database())
+            file_id = await fs.put(data, filename=filename, content_type=content_type)
+            record_gridfs_bytes('upload', len(data))
+            return str(file_id)
+        except PyMongoError as e:
+            raise Exception(f"MongoDB GridFS upload error: {str(e)}")
+
+    @staticmethod
+    async def download_file_from_gridfs(file_id_str: str) -> Tuple[bytes, str, str]:
+        """
+        從 GridFS 下載二進位資料
+
+        Args:
+            file_id_str: GridFS ObjectId 字串
+
+        Returns:
+            (data: bytes, filename: str, content_type: str)
+        """
+        try:
+            fs = AsyncGridFS(AsyncNoSqlDbBusinessService.get_database())
+            grid_out = await fs.get(ObjectId(file_id_str))
+            data = await grid_out.read()
+            record_gridfs_bytes('download', len(data))
+            filename = grid_out.filename or 'file'
+            content_type = (
+                getattr(grid_out, 'content_type', None) or 'application/octet-stream'
+            )
+            return data, filename, content_type
+        except PyMongoError as e:
+            raise Exception(f"MongoDB GridFS download error: {str(e)}")
+
+    @staticmethod
+    async def delete_file_from_gridfs(file_id_str: str) -> None:
+        """
+        從 GridFS 刪除檔案
+
+        Args:
+            file_id_str: GridFS ObjectId 字串
+        """
+        try:
+            fs = AsyncGridFS(AsyncNoSqlDbBusinessService.get_database())
+            await fs.delete(ObjectId(file_id_str))
+        except PyMongoError as e:
+            raise Exception(f"MongoDB GridFS delete error: {str(e)}")
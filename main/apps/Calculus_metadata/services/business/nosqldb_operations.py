@@ -7,6 +7,7 @@ from pymongo.errors import PyMongoError
 from gridfs import GridFS
 from bson import ObjectId
 from main.utils.env_loader import get_env
+from main.utils.request_metrics import record_gridfs_bytes
 
 
 class NoSqlDbBusinessService:
@@ -20,6 +21,16 @@ class NoSqlDbBusinessService:
         Returns:
             MongoClient 實例
         """
+        return MongoClient(NoSqlDbBusinessService.get_connection_string())
+    
+    @staticmethod
+    def get_connection_string() -> str:
+        """
+        組合 MongoDB 連線字串（同步 / 非同步 client 共用）
+        
+        Returns:
+            MongoDB URI
+        """
         mongo_host = get_env("MONGO_HOST", "localhost")
         mongo_port = int(get_env("MONGO_PORT", "27017"))
         mongo_user = get_env("MONGO_USER", "")
@@ -32,7 +43,7 @@ class NoSqlDbBusinessService:
         else:
             connection_string = f"mongodb://{mongo_host}:{mongo_port}/"
         
-        return MongoClient(connection_string)
+        return connection_string
     
     @staticmethod
     def create_document(collection_name: str, document: Dict[str, Any]) -> str:
@@ -196,6 +207,7 @@ class NoSqlDbBusinessService:
             db = client[get_env("MONGO_DB", "calculus_nosql_db")]
             fs = GridFS(db)
             file_id = fs.put(data, filename=filename, content_type=content_type)
+            record_gridfs_bytes('upload', len(data))
             return str(file_id)
         except PyMongoError as e:
             raise Exception(f"MongoDB GridFS upload error: {str(e)}")
@@ -219,6 +231,7 @@ class NoSqlDbBusinessService:
             fs = GridFS(db)
             grid_out = fs.get(ObjectId(file_id_str))
             data = grid_out.read()
+            record_gridfs_bytes('download', len(data))
             filename = grid_out.filename or 'file'
             content_type = (
                 getattr(grid_out, 'content_type', None) or 'application/octet-stream'
@@ -56,7 +56,55 @@ class SqlDbBusinessService:
         if not filters:
             return list(model_class.objects.all())
         return list(model_class.objects.filter(**filters))
-    
+
+    @staticmethod
+    def get_entities_with_related(
+        model_class: Type[models.Model],
+        filters: Dict[str, Any],
+        related_fields: List[str],
+        excludes: Optional[Dict[str, Any]] = None
+    ) -> List[models.Model]:
+        """
+        通用查詢多個實體方法（以 JOIN 一併載入外鍵關聯，避免 N+1 查詢）
+
+        Args:
+            model_class: Model 類別
+            filters: 過濾條件字典（可跨關聯，如 student__student_semester）
+            related_fields: select_related 的外鍵欄位列表
+            excludes: 排除條件字典
+
+        Returns:
+            實體列表
+        """
+        queryset = model_class.objects.select_related(*related_fields).filter(**filters)
+        if excludes:
+            queryset = queryset.exclude(**excludes)
+        return list(queryset)
+
+    @staticmethod
+    def get_entities_ordered(
+        model_class: Type[models.Model],
+        filters: Dict[str, Any],
+        order_by: List[str],
+        limit: Optional[int] = None
+    ) -> List[models.Model]:
+        """
+        通用排序查詢方法（游標分頁用，搭配 id__gt 等條件）
+
+        Args:
+            model_class: Model 類別
+            filters: 過濾條件字典
+            order_by: 排序欄位列表
+            limit: 最多回傳筆數
+
+        Returns:
+            實體列表
+        """
+        queryset = model_class.objects.filter(**filters).order_by(*order_by)
+        if limit is not None:
+            queryset = queryset[:limit]
+        return list(queryset)
+
     @staticmethod
     def update_entity(entity: models.Model, update_data: Dict[str, Any]) -> models.Model:
         """
@@ -74,6 +122,41 @@ class SqlDbBusinessService:
         entity.save()
         return entity
     
+    # ── Async ORM（供 ASGI async actor 使用）──────────────────────────────────
+
+    @staticmethod
+    async def aget_entity(model_class: Type[models.Model], uuid_field: str, uuid_value: str) -> Optional[models.Model]:
+        """
+        通用查詢單個實體方法（async）
+
+        Args:
+            model_class: Model 類別
+            uuid_field: UUID 欄位名稱
+            uuid_value: UUID 值
+
+        Returns:
+            查詢到的實體實例或 None
+        """
+        try:
+            return await model_class.objects.aget(**{uuid_field: uuid_value})
+        except ObjectDoesNotExist:
+            return None
+
+    @staticmethod
+    async def aget_entities(model_class: Type[models.Model], filters: Dict[str, Any]) -> List[models.Model]:
+        """
+        通用查詢多個實體方法（async）
+
+        Args:
+            model_class: Model 類別
+            filters: 過濾條件字典
+
+        Returns:
+            實體列表
+        """
+        queryset = model_class.objects.filter(**filters) if filters else model_class.objects.all()
+        return [entity async for entity in queryset]
+
     @staticmethod
     def delete_entity(entity: models.Model) -> None:
         """
@@ -2,10 +2,14 @@
 Timestamp Service - 生成統一格式的時間戳
 """
 from datetime import datetime
+from django.utils import timezone
 
 
 class TimestampService:
     """時間戳生成服務"""
+
+    # API 輸出與 MongoDB 字串時間戳的統一格式
+    TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
     
     @staticmethod
     def get_current_timestamp() -> str:
@@ -16,7 +20,17 @@ class TimestampService:
         Returns:
             str: 當前時間戳字串
         """
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return datetime.now().strftime(TimestampService.TIMESTAMP_FORMAT)
+
+    @staticmethod
+    def get_current_datetime() -> datetime:
+        """
+        獲取當前時間（timezone-aware），供 SQL DateTimeField 使用
+        
+        Returns:
+            datetime: 當前時間
+        """
+        return timezone.now()
     
     @staticmethod
     def get_current_date() -> str:
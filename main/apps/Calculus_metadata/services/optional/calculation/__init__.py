@@ -2,7 +2,18 @@
 Calculation Services Package
 """
 from .calculation_service import CalculationService
+from .binning_service import BinningService
+from .quantile_sketch import QuantileSketch
+from .score_matrix_service import SemesterScoreMatrix, ScoreMatrixService
+from .calculation_run_service import CalculationRunService
+from .exam_slot_service import ExamSlotService
 
 __all__ = [
     'CalculationService',
+    'BinningService',
+    'QuantileSketch',
+    'SemesterScoreMatrix',
+    'ScoreMatrixService',
+    'CalculationRunService',
+    'ExamSlotService',
 ]
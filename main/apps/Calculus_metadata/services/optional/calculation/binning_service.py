@@ -0,0 +1,163 @@
+"""
+Binning Service - 直方圖級距策略（固定寬度 / 自訂邊界 / 分位數 / Freedman–Diaconis）
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from .calculation_service import CalculationService
+
+
+class BinningService:
+    """級距服務 - 依 bins 設定計算級距邊界與各級距人數"""
+
+    STRATEGY_FIXED_WIDTH = 'fixed_width'
+    STRATEGY_CUSTOM = 'custom'
+    STRATEGY_QUANTILE = 'quantile'
+    STRATEGY_FREEDMAN_DIACONIS = 'freedman_diaconis'
+    STRATEGIES = [STRATEGY_FIXED_WIDTH, STRATEGY_CUSTOM, STRATEGY_QUANTILE, STRATEGY_FREEDMAN_DIACONIS]
+
+    DEFAULT_CONFIG = {'type': STRATEGY_FIXED_WIDTH, 'width': 10}
+    # 分數範圍（固定寬度預設的上下限）
+    SCORE_RANGE = (0.0, 100.0)
+    MAX_BINS = 100
+    DEFAULT_QUANTILE_BINS = 4
+
+    @staticmethod
+    def parse_config(bins_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        驗證並正規化 bins 設定
+
+        Args:
+            bins_config: 請求中的 bins 物件，例如
+                {'type': 'fixed_width', 'width': 10, 'range': [0, 100]}
+                {'type': 'custom', 'edges': [0, 60, 70, 80, 90, 100]}
+                {'type': 'quantile', 'count': 4}
+                {'type': 'freedman_diaconis'}
+
+        Returns:
+            正規化後的設定
+
+        Raises:
+            ValueError: 設定格式錯誤
+        """
+        if bins_config is None:
+            bins_config = BinningService.DEFAULT_CONFIG
+        if not isinstance(bins_config, dict):
+            raise ValueError("bins must be an object")
+        strategy = bins_config.get('type', BinningService.STRATEGY_FIXED_WIDTH)
+        if strategy not in BinningService.STRATEGIES:
+            raise ValueError(f"Invalid bins.type. Must be one of: {', '.join(BinningService.STRATEGIES)}")
+
+        try:
+            if strategy == BinningService.STRATEGY_FIXED_WIDTH:
+                width = float(bins_config.get('width', 10))
+                low, high = (float(v) for v in bins_config.get('range', BinningService.SCORE_RANGE))
+                if width <= 0 or high <= low:
+                    raise ValueError("bins.width must be > 0 and bins.range must be increasing")
+                if math.ceil((high - low) / width) > BinningService.MAX_BINS:
+                    raise ValueError(f"Too many bins (max {BinningService.MAX_BINS})")
+                return {'type': strategy, 'width': width, 'range': [low, high]}
+
+            if strategy == BinningService.STRATEGY_CUSTOM:
+                edges = [float(edge) for edge in bins_config.get('edges') or []]
+                if len(edges) < 2 or any(b <= a for a, b in zip(edges, edges[1:])):
+                    raise ValueError("bins.edges must contain at least two strictly increasing values")
+                if len(edges) - 1 > BinningService.MAX_BINS:
+                    raise ValueError(f"Too many bins (max {BinningService.MAX_BINS})")
+                return {'type': strategy, 'edges': edges}
+
+            if strategy == BinningService.STRATEGY_QUANTILE:
+                count = int(bins_config.get('count', BinningService.DEFAULT_QUANTILE_BINS))
+                if not 1 <= count <= BinningService.MAX_BINS:
+                    raise ValueError(f"bins.count must be between 1 and {BinningService.MAX_BINS}")
+                return {'type': strategy, 'count': count}
+        except (TypeError, ValueError) as e:
+            raise ValueError(str(e) if str(e).startswith(('bins', 'Too many')) else f"Invalid bins config: {e}")
+
+        return {'type': strategy}
+
+    @staticmethod
+    def compute_edges(scores: Sequence[float], config: Dict[str, Any]) -> List[float]:
+        """
+        依策略計算級距邊界（最多排序一次，O(n log n)）
+
+        Args:
+            scores: 分數列表
+            config: parse_config 的結果
+
+        Returns:
+            遞增的級距邊界
+        """
+        strategy = config['type']
+        if strategy == BinningService.STRATEGY_FIXED_WIDTH:
+            low, high = config['range']
+            width = config['width']
+            num_bins = max(math.ceil((high - low) / width - 1e-9), 1)
+            return [low + i * width for i in range(num_bins)] + [high]
+
+        if strategy == BinningService.STRATEGY_CUSTOM:
+            return list(config['edges'])
+
+        if not scores:
+            return list(BinningService.SCORE_RANGE)
+
+        if strategy == BinningService.STRATEGY_QUANTILE:
+            count = config['count']
+            edges = CalculationService.calculate_percentiles(scores, [i * 100 / count for i in range(count + 1)])
+            return BinningService._dedupe_edges(edges)
+
+        # Freedman–Diaconis：寬度 = 2 × IQR × n^(-1/3)，範圍為最低分至最高分
+        q1, q3 = CalculationService.calculate_percentiles(scores, [25, 75])
+        low, high = min(scores), max(scores)
+        if high <= low:
+            return [low, low + 1]
+        width = 2 * (q3 - q1) * len(scores) ** (-1 / 3)
+        if width <= 0:
+            # IQR 為 0（分數高度集中）時改用 Sturges 規則決定級距數
+            num_bins = math.ceil(math.log2(len(scores))) + 1
+        else:
+            num_bins = math.ceil((high - low) / width)
+        num_bins = min(max(num_bins, 1), BinningService.MAX_BINS)
+        step = (high - low) / num_bins
+        return [low + i * step for i in range(num_bins)] + [high]
+
+    @staticmethod
+    def _dedupe_edges(edges: List[float]) -> List[float]:
+        """移除重複的分位數邊界（大量同分時），確保嚴格遞增"""
+        unique = [edges[0]]
+        for edge in edges[1:]:
+            if edge > unique[-1]:
+                unique.append(edge)
+        if len(unique) == 1:
+            unique.append(unique[0] + 1)
+        return unique
+
+    @staticmethod
+    def format_edge(edge: float) -> str:
+        """邊界顯示格式（整數不帶小數）"""
+        return str(int(edge)) if float(edge).is_integer() else f"{edge:.2f}".rstrip('0').rstrip('.')
+
+    @staticmethod
+    def compute_histogram(scores: Sequence[float], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        計算級距邊界與各級距人數（[e0, e1), ..., [e(n-1), en]，範圍外不計）
+
+        Args:
+            scores: 分數列表
+            config: parse_config 的結果
+
+        Returns:
+            {'strategy', 'bin_edges', 'counts', 'labels'}
+        """
+        edges = BinningService.compute_edges(scores, config)
+        counts = CalculationService.histogram(scores, edges)
+        labels = [
+            f"{BinningService.format_edge(start)}-{BinningService.format_edge(end)}"
+            for start, end in zip(edges, edges[1:])
+        ]
+        return {
+            'strategy': config['type'],
+            'bin_edges': edges,
+            'counts': counts,
+            'labels': labels,
+        }
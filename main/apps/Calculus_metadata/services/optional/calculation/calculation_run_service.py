@@ -0,0 +1,135 @@
+"""
+Calculation Run Service - 總成績計算紀錄與增量計算範圍
+"""
+import hashlib
+import json
+import math
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from main.apps.Calculus_metadata.models import CalculationRun, Score
+from main.apps.Calculus_metadata.services.business import SqlDbBusinessService
+from main.apps.Calculus_metadata.services.common import UuidService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+
+from .score_matrix_service import ScoreMatrixService, SemesterScoreMatrix
+
+
+class CalculationRunService:
+    """總成績計算紀錄服務 - 計算輸入雜湊、找出上次計算後異動的成績、寫入計算紀錄"""
+
+    MODE_FULL = 'full'
+    MODE_INCREMENTAL = 'incremental'
+    MODES = [MODE_FULL, MODE_INCREMENTAL]
+    # 上次計算距 change_log 保留期限不足此天數時即視為過期（避免計算期間紀錄被清除）
+    RETENTION_MARGIN_DAYS = 1
+
+    @staticmethod
+    def inputs_hash(weights: Dict[str, float], passing_score: float) -> str:
+        """
+        計算輸入（權重與及格分數）的 SHA-256
+
+        Args:
+            weights: {考試名稱: 權重}
+            passing_score: 及格分數
+
+        Returns:
+            十六進位雜湊字串
+        """
+        payload = json.dumps(
+            {'weights': sorted(weights.items()), 'passing_score': passing_score},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def last_run(semester: str) -> Optional[CalculationRun]:
+        """取得學期最近一次計算紀錄"""
+        runs = SqlDbBusinessService.get_entities_ordered(CalculationRun, {'run_semester': semester}, ['-id'], 1)
+        return runs[0] if runs else None
+
+    @staticmethod
+    def is_expired(run: CalculationRun) -> bool:
+        """
+        上次計算之後的 change_log 是否可能已被 prune_change_log 清除（需改為全量計算）
+
+        Args:
+            run: 計算紀錄
+
+        Returns:
+            是否過期
+        """
+        retention_days = getattr(settings, 'CHANGE_LOG_RETENTION_DAYS', 30) - CalculationRunService.RETENTION_MARGIN_DAYS
+        return run.run_created_at < timezone.now() - timedelta(days=retention_days)
+
+    @staticmethod
+    def dirty_scores(semester: str, after_cursor: int) -> List[Score]:
+        """
+        取得游標之後成績或所屬學生有異動的成績記錄（含學生）
+
+        Args:
+            semester: 學期
+            after_cursor: 上次計算的 ChangeLog 游標（計算開始時已提交的位置，之後才提交的異動皆在其後）
+
+        Returns:
+            Score 列表（已 select_related student）
+        """
+        changed = ChangeFeedService.changed_uuids(ScoreMatrixService.SOURCE_ENTITIES, semester, after_cursor)
+        score_uuids = changed[ChangeFeedService.ENTITY_SCORE]
+        student_uuids = changed[ChangeFeedService.ENTITY_STUDENTS]
+        if not score_uuids and not student_uuids:
+            return []
+        return list(
+            Score.objects.select_related('student')
+            .filter(score_semester=semester)
+            .filter(Q(score_uuid__in=score_uuids) | Q(student__student_uuid__in=student_uuids))
+            .order_by('id')
+        )
+
+    @staticmethod
+    def eligible_values(score: Score, semester: str, fields: Sequence[str]) -> Optional[Dict[str, float]]:
+        """
+        成績是否列入總成績計算（規則與學期成績矩陣的 complete_rows 相同）
+
+        Args:
+            score: Score 實例（含 student）
+            semester: 學期
+            fields: 需皆有分數的欄位
+
+        Returns:
+            {分數欄位: 分數}，不列入時為 None
+        """
+        student = score.student
+        if (student is None or student.student_semester != semester
+                or student.student_status in SemesterScoreMatrix.EXCLUDED_STATUSES):
+            return None
+        values = {field: ScoreMatrixService.parse_score(getattr(score, field)) for field in fields}
+        if any(math.isnan(value) for value in values.values()):
+            return None
+        return values
+
+    @staticmethod
+    def record_run(semester: str, mode: str, inputs_hash: str, weights: Dict[str, float],
+                   passing_score: float, cursor: int, evaluated_count: int, updated_count: int) -> CalculationRun:
+        """
+        寫入計算紀錄（與計算寫入同一交易）
+
+        Returns:
+            CalculationRun 實例
+        """
+        return SqlDbBusinessService.create_entity(CalculationRun, {
+            'run_uuid': UuidService.generate_generic_uuid('run'),
+            'run_semester': semester,
+            'run_mode': mode,
+            'run_inputs_hash': inputs_hash,
+            'run_weights': weights,
+            'run_passing_score': passing_score,
+            'run_cursor': cursor,
+            'run_evaluated_count': evaluated_count,
+            'run_updated_count': updated_count,
+        })
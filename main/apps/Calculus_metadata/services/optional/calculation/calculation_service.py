@@ -1,12 +1,33 @@
 """
 Calculation Service - 成績計算相關邏輯
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
+import bisect
+import importlib
+import math
 import statistics
 
 
 class CalculationService:
     """計算服務 - 用於成績統計與分析"""
+
+    # NumPy 延遲載入快取（未安裝時為 False，改用純 Python 實作）
+    _numpy = None
+
+    @staticmethod
+    def get_numpy():
+        """
+        取得 NumPy 模組（首次呼叫時載入）
+
+        Returns:
+            numpy 模組或 None（未安裝）
+        """
+        if CalculationService._numpy is None:
+            try:
+                CalculationService._numpy = importlib.import_module('numpy')
+            except ImportError:
+                CalculationService._numpy = False
+        return CalculationService._numpy or None
     
     @staticmethod
     def calculate_average(scores: List[float]) -> float:
@@ -70,29 +91,15 @@ class CalculationService:
         """
         if not scores:
             return {}
-        
-        histogram = {}
-        min_score = 0
-        max_score = 100
 
-        # 創建半開區間級距：[0,10), [10,20), ..., [90,100]
+        # 創建半開區間級距：[0,10), [10,20), ..., [90,100]（100分以上歸入最後一個區間）
+        max_score = 100
         num_bins = max_score // bin_width
-        for i in range(num_bins):
-            start = i * bin_width
-            end = start + bin_width
-            bin_key = f"{start}-{end}"
-            histogram[bin_key] = 0
-
-        # 統計每個級距的數量（100分歸入最後一個區間）
-        for score in scores:
-            bin_index = min(int(score // bin_width), num_bins - 1)
-            start = bin_index * bin_width
-            end = start + bin_width
-            bin_key = f"{start}-{end}"
-            if bin_key in histogram:
-                histogram[bin_key] += 1
-        
-        return histogram
+        counts = CalculationService.bin_counts(scores, bin_width, num_bins)
+        return {
+            f"{i * bin_width}-{i * bin_width + bin_width}": counts[i]
+            for i in range(num_bins)
+        }
     
     @staticmethod
     def filter_valid_scores(scores_dict: Dict[str, str]) -> List[float]:
@@ -129,3 +136,221 @@ class CalculationService:
             是否及格
         """
         return total_score >= passing_threshold
+
+    # ── 批次 / 陣列運算（NumPy 可用時向量化，否則使用純 Python，結果相同）────────
+
+    @staticmethod
+    def bin_counts(scores: Sequence[float], bin_width: float, num_bins: int) -> List[int]:
+        """
+        固定寬度級距計數：第 i 格為 [i*bin_width, (i+1)*bin_width)，
+        超過上限者歸入最後一格，負分不計
+
+        Args:
+            scores: 分數列表
+            bin_width: 級距寬度
+            num_bins: 級距數量
+
+        Returns:
+            各級距人數
+        """
+        if num_bins <= 0:
+            return []
+        np = CalculationService.get_numpy()
+        if np is not None:
+            indexes = np.minimum(np.floor_divide(np.asarray(scores, dtype=float), bin_width), num_bins - 1)
+            indexes = indexes[indexes >= 0].astype(np.int64)
+            return np.bincount(indexes, minlength=num_bins).tolist()
+
+        counts = [0] * num_bins
+        for score in scores:
+            index = min(int(score // bin_width), num_bins - 1)
+            if index >= 0:
+                counts[index] += 1
+        return counts
+
+    @staticmethod
+    def histogram(scores: Sequence[float], bin_edges: Sequence[float]) -> List[int]:
+        """
+        以任意級距邊界計數（與 numpy.histogram 相同）：
+        [e0, e1), [e1, e2), ..., [e(n-1), en]，範圍外的分數不計
+
+        Args:
+            scores: 分數列表
+            bin_edges: 遞增的級距邊界（長度 n+1）
+
+        Returns:
+            各級距人數（長度 n）
+        """
+        if len(bin_edges) < 2:
+            raise ValueError("bin_edges must contain at least two values")
+        if any(b <= a for a, b in zip(bin_edges, bin_edges[1:])):
+            raise ValueError("bin_edges must be strictly increasing")
+
+        np = CalculationService.get_numpy()
+        if np is not None:
+            counts, _ = np.histogram(np.asarray(scores, dtype=float), bins=np.asarray(bin_edges, dtype=float))
+            return counts.tolist()
+
+        num_bins = len(bin_edges) - 1
+        counts = [0] * num_bins
+        first, last = bin_edges[0], bin_edges[-1]
+        for score in scores:
+            if score < first or score > last:
+                continue
+            # 最後一格包含右邊界
+            index = min(bisect.bisect_right(bin_edges, score) - 1, num_bins - 1)
+            counts[index] += 1
+        return counts
+
+    @staticmethod
+    def calculate_weighted_totals(score_matrix: Sequence[Sequence[float]], weights: Sequence[float]) -> List[float]:
+        """
+        批次計算加權總分（學生 × 考試矩陣）
+
+        依欄位順序逐欄累加，結果與逐筆呼叫 calculate_weighted_total 完全相同
+
+        Args:
+            score_matrix: 分數矩陣，每列為一位學生，欄位順序與 weights 一致
+            weights: 各考試權重
+
+        Returns:
+            每位學生的加權總分
+        """
+        if not score_matrix:
+            return []
+        np = CalculationService.get_numpy()
+        if np is not None:
+            matrix = np.asarray(score_matrix, dtype=float).reshape(len(score_matrix), len(weights))
+            totals = np.zeros(len(score_matrix))
+            for column, weight in enumerate(weights):
+                totals = totals + matrix[:, column] * weight
+            return totals.tolist()
+
+        totals = []
+        for row in score_matrix:
+            total = 0.0
+            for score, weight in zip(row, weights):
+                total += score * weight
+            totals.append(total)
+        return totals
+
+    @staticmethod
+    def calculate_weighted_totals_batch(score_matrix: Sequence[Sequence[float]],
+                                        weight_vectors: Sequence[Sequence[float]]) -> List[List[float]]:
+        """
+        多組權重一次計算加權總分（試算用；每組結果與 calculate_weighted_totals 完全相同）
+
+        Args:
+            score_matrix: 分數矩陣，每列為一位學生
+            weight_vectors: 權重組列表，每組欄位順序與 score_matrix 一致
+
+        Returns:
+            [權重組][學生] 加權總分
+        """
+        if not score_matrix:
+            return [[] for _ in weight_vectors]
+        np = CalculationService.get_numpy()
+        if np is not None and weight_vectors:
+            num_fields = len(weight_vectors[0])
+            matrix = np.asarray(score_matrix, dtype=float).reshape(len(score_matrix), num_fields)
+            weights = np.asarray(weight_vectors, dtype=float).reshape(len(weight_vectors), num_fields)
+            # (權重組 × 學生)，逐欄累加以維持與單組計算相同的運算順序
+            totals = np.zeros((len(weight_vectors), len(score_matrix)))
+            for column in range(num_fields):
+                totals = totals + matrix[:, column] * weights[:, column, None]
+            return totals.tolist()
+        return [CalculationService.calculate_weighted_totals(score_matrix, weights) for weights in weight_vectors]
+
+    @staticmethod
+    def count_below(scores: Sequence[float], thresholds: Sequence[float]) -> List[int]:
+        """
+        計算低於各門檻（不及格）的人數，排序一次後以二分搜尋查詢每個門檻
+
+        Args:
+            scores: 分數列表
+            thresholds: 門檻列表
+
+        Returns:
+            各門檻對應的人數
+        """
+        np = CalculationService.get_numpy()
+        if np is not None and scores:
+            ordered = np.sort(np.asarray(scores, dtype=float))
+            return np.searchsorted(ordered, np.asarray(thresholds, dtype=float), side='left').tolist()
+        ordered = sorted(scores)
+        return [bisect.bisect_left(ordered, threshold) for threshold in thresholds]
+
+    @staticmethod
+    def calculate_percentiles(scores: Sequence[float], percentiles: Sequence[float]) -> List[float]:
+        """
+        計算百分位數（線性內插，與 numpy.percentile 預設方法相同；50 即中位數）
+
+        Args:
+            scores: 分數列表
+            percentiles: 百分位（0–100）
+
+        Returns:
+            各百分位對應的分數（無分數時皆為 0.0）
+        """
+        if any(p < 0 or p > 100 for p in percentiles):
+            raise ValueError("percentiles must be between 0 and 100")
+        if not scores:
+            return [0.0 for _ in percentiles]
+
+        np = CalculationService.get_numpy()
+        if np is not None:
+            return np.percentile(np.asarray(scores, dtype=float), list(percentiles)).tolist()
+
+        ordered = sorted(float(score) for score in scores)
+        results = []
+        for p in percentiles:
+            position = (len(ordered) - 1) * (p / 100)
+            lower = math.floor(position)
+            upper = min(lower + 1, len(ordered) - 1)
+            fraction = position - lower
+            # 與 NumPy 相同的內插寫法（fraction >= 0.5 時自上界回推），確保結果逐位元一致
+            diff = ordered[upper] - ordered[lower]
+            if fraction >= 0.5:
+                results.append(ordered[upper] - diff * (1 - fraction))
+            else:
+                results.append(ordered[lower] + diff * fraction)
+        return results
+
+    @staticmethod
+    def passing_mask(total_scores: Sequence[float], passing_threshold: float = 60.0) -> List[bool]:
+        """
+        批次檢查是否及格
+
+        Args:
+            total_scores: 總分列表
+            passing_threshold: 及格門檻（預設 60）
+
+        Returns:
+            每筆是否及格
+        """
+        np = CalculationService.get_numpy()
+        if np is not None and total_scores:
+            return (np.asarray(total_scores, dtype=float) >= passing_threshold).tolist()
+        return [score >= passing_threshold for score in total_scores]
+
+    @staticmethod
+    def describe(scores: Sequence[float]) -> Dict[str, Any]:
+        """
+        計算分布摘要（人數、平均、最小 / 最大值與四分位數）
+
+        Args:
+            scores: 分數列表
+
+        Returns:
+            {'count', 'average', 'min', 'max', 'q1', 'median', 'q3'}
+        """
+        q1, median, q3 = CalculationService.calculate_percentiles(scores, [25, 50, 75])
+        return {
+            'count': len(scores),
+            'average': CalculationService.calculate_average(scores),
+            'min': float(min(scores)) if scores else 0.0,
+            'max': float(max(scores)) if scores else 0.0,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+        }
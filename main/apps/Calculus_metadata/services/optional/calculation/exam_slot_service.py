@@ -0,0 +1,142 @@
+"""
+Exam Slot Service - 考試項目（test_slot）與分數欄位對應、學期 slot → 考試快取
+"""
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from main.apps.Calculus_metadata.models import Test
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.utils import prometheus_metrics
+
+
+class ExamSlotService:
+    """考試項目服務 - Test.test_slot 決定考試對應的分數欄位，不再比對 test_name 字串"""
+
+    CACHE_PREFIX = 'exam_slots'
+
+    # (test_slot, 分數欄位)，順序即總成績計算的欄位順序
+    SLOT_FIELDS = [
+        ('quiz1', 'score_quiz1'),
+        ('midterm', 'score_midterm'),
+        ('quiz2', 'score_quiz2'),
+        ('finalexam', 'score_finalexam'),
+    ]
+    SLOTS = [slot for slot, _ in SLOT_FIELDS]
+    # test_slot → 預設考試名稱（與既有權重設定 / 匯出欄位名稱一致）
+    SLOT_NAMES = {
+        'quiz1': '第一次小考',
+        'midterm': '期中考',
+        'quiz2': '第二次小考',
+        'finalexam': '期末考',
+    }
+    # test_slot → UuidService.generate_test_uuid 的 test_type
+    SLOT_UUID_TYPES = {
+        'quiz1': 'q1',
+        'midterm': 'mid',
+        'quiz2': 'q2',
+        'finalexam': 'final',
+    }
+    # 建立考試未指定 test_slot 時依名稱推斷（僅建立時使用一次）
+    NAME_KEYWORDS = [
+        ('第一', 'quiz1'),
+        ('期中', 'midterm'),
+        ('第二', 'quiz2'),
+        ('期末', 'finalexam'),
+    ]
+
+    @staticmethod
+    def field_of(slot: str) -> Optional[str]:
+        """test_slot 對應的分數欄位"""
+        return dict(ExamSlotService.SLOT_FIELDS).get(slot)
+
+    @staticmethod
+    def slot_of(score_field: str) -> Optional[str]:
+        """分數欄位對應的 test_slot"""
+        for slot, field in ExamSlotService.SLOT_FIELDS:
+            if field == score_field:
+                return slot
+        return None
+
+    @staticmethod
+    def infer_slot(test_name: str) -> str:
+        """依考試名稱推斷 test_slot，無法判斷時為空字串"""
+        for keyword, slot in ExamSlotService.NAME_KEYWORDS:
+            if keyword in test_name:
+                return slot
+        return ''
+
+    @staticmethod
+    def cache_key(semester: str) -> str:
+        return f"{ExamSlotService.CACHE_PREFIX}:{semester}"
+
+    @staticmethod
+    def _get_entry(semester: str) -> Dict:
+        """
+        取得學期考試對應表（考試異動游標未前進時使用快取）
+
+        Returns:
+            {'cursor': 游標, 'slots': {test_slot: Test}, 'unassigned': [未指定 test_slot 的 Test]}
+        """
+        # 先讀游標再讀資料，與 ScoreMatrixService.get_matrix 相同
+        cursor = ChangeFeedService.latest_cursor([ChangeFeedService.ENTITY_TEST], semester)
+        key = ExamSlotService.cache_key(semester)
+        entry = cache.get(key)
+        hit = entry is not None and entry['cursor'] >= cursor
+        prometheus_metrics.record_cache(ExamSlotService.CACHE_PREFIX, hit)
+        if hit:
+            return entry
+
+        slots, unassigned = {}, []
+        for test in Test.objects.filter(test_semester=semester).order_by('id'):
+            if test.test_slot:
+                # 同一學期同一 slot 僅一筆（建立 / 更新時檢查），舊資料重複時取最早建立者
+                slots.setdefault(test.test_slot, test)
+            else:
+                unassigned.append(test)
+        entry = {'cursor': cursor, 'slots': slots, 'unassigned': unassigned}
+        cache.set(key, entry, getattr(settings, 'SCORE_MATRIX_CACHE_SECONDS', 300))
+        return entry
+
+    @staticmethod
+    def get_slot_tests(semester: str) -> Dict[str, Test]:
+        """
+        取得學期 test_slot → 考試對應
+
+        Args:
+            semester: 學期
+
+        Returns:
+            {test_slot: Test}
+        """
+        return ExamSlotService._get_entry(semester)['slots']
+
+    @staticmethod
+    def get_unassigned_tests(semester: str) -> List[Test]:
+        """取得學期中未指定 test_slot 的考試"""
+        return ExamSlotService._get_entry(semester)['unassigned']
+
+    @staticmethod
+    def get_test_for_field(semester: str, score_field: str) -> Optional[Test]:
+        """
+        取得分數欄位對應的考試
+
+        Args:
+            semester: 學期
+            score_field: 分數欄位
+
+        Returns:
+            Test 實例，無對應時為 None
+        """
+        slot = ExamSlotService.slot_of(score_field)
+        if slot is None:
+            return None
+        return ExamSlotService.get_slot_tests(semester).get(slot)
+
+    @staticmethod
+    def slot_taken(semester: str, slot: str, exclude_uuid: str = '') -> bool:
+        """同一學期是否已有其他考試使用此 test_slot（寫入檢查直接查詢資料庫）"""
+        if not slot:
+            return False
+        return Test.objects.filter(test_semester=semester, test_slot=slot).exclude(test_uuid=exclude_uuid).exists()
@@ -0,0 +1,185 @@
+"""
+Quantile Sketch - 可合併的分位數摘要（DDSketch：對數級距，相對誤差上限 alpha）
+支援刪除（成績更新 = 移出舊值 + 加入新值），筆數不超過 exact_limit 時保留完整分數、結果與精確計算相同
+筆數一旦超過 exact_limit 即捨棄完整分數，之後即使刪除至上限以下仍為近似值（以 from_scores 重建才恢復精確模式）
+"""
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from .calculation_service import CalculationService
+
+
+class QuantileSketch:
+    """分位數摘要 - 同一 relative_accuracy 的摘要直接合併（級距人數相加），不同者以級距代表值重新分配"""
+
+    # 小於此值的分數視為 0（對數級距無法表示 0）
+    MIN_INDEXABLE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01, exact_limit: int = 1000):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.exact_limit = exact_limit
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.zero_count = 0
+        # {級距 index: 人數}；負分以絕對值存於 negative
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        # {分數: 人數}；筆數超過 exact_limit 後為 None（僅保留級距）
+        self.exact: Optional[Dict[float, int]] = {}
+
+    # ── 更新 ──────────────────────────────────────────────────────────────────
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value_of(self, key: int) -> float:
+        """級距代表值（與級距內任一值的相對誤差 <= relative_accuracy）"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _adjust(self, value: float, delta: int) -> None:
+        if value > QuantileSketch.MIN_INDEXABLE:
+            store, key = self.positive, self._key(value)
+        elif value < -QuantileSketch.MIN_INDEXABLE:
+            store, key = self.negative, self._key(-value)
+        else:
+            self.zero_count += delta
+            return
+        store[key] = store.get(key, 0) + delta
+        if store[key] <= 0:
+            del store[key]
+
+    def add(self, value: float, count: int = 1) -> None:
+        """加入分數"""
+        value = float(value)
+        self._adjust(value, count)
+        self.count += count
+        if self.exact is not None:
+            if self.count > self.exact_limit:
+                self.exact = None
+            else:
+                self.exact[value] = self.exact.get(value, 0) + count
+
+    def remove(self, value: float, count: int = 1) -> None:
+        """移出分數（需為先前加入的值）"""
+        value = float(value)
+        self._adjust(value, -count)
+        self.count = max(self.count - count, 0)
+        if self.exact is not None:
+            remaining = self.exact.get(value, 0) - count
+            if remaining > 0:
+                self.exact[value] = remaining
+            else:
+                self.exact.pop(value, None)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """
+        合併另一份摘要（例如多學期）
+
+        relative_accuracy 不同時，other 若為精確模式則逐一加入原始分數；
+        否則各級距以代表值重新分配至本摘要的級距，誤差上限約為兩者相對誤差之和
+
+        Args:
+            other: 要合併的摘要
+        """
+        if other.relative_accuracy == self.relative_accuracy:
+            for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+                for key, count in other_store.items():
+                    store[key] = store.get(key, 0) + count
+            self.zero_count += other.zero_count
+        elif other.exact is not None:
+            for value, count in other.exact.items():
+                self._adjust(value, count)
+        else:
+            for key, count in other.positive.items():
+                self._adjust(other._value_of(key), count)
+            for key, count in other.negative.items():
+                self._adjust(-other._value_of(key), count)
+            self.zero_count += other.zero_count
+        self.count += other.count
+        if self.exact is None or other.exact is None or self.count > self.exact_limit:
+            self.exact = None
+        else:
+            for value, count in other.exact.items():
+                self.exact[value] = self.exact.get(value, 0) + count
+
+    # ── 查詢 ──────────────────────────────────────────────────────────────────
+
+    @property
+    def is_exact(self) -> bool:
+        return self.exact is not None
+
+    def quantiles(self, percentiles: Sequence[float]) -> List[float]:
+        """
+        計算百分位數（精確模式與 CalculationService.calculate_percentiles 相同；
+        否則回傳第 round(p/100 × (n-1)) 名所在級距的代表值，相對誤差 <= relative_accuracy）
+
+        Args:
+            percentiles: 百分位（0–100）
+
+        Returns:
+            各百分位對應的分數（無分數時皆為 0.0）
+        """
+        if self.count <= 0:
+            return [0.0 for _ in percentiles]
+        if self.exact is not None:
+            scores = [value for value, count in sorted(self.exact.items()) for _ in range(count)]
+            return CalculationService.calculate_percentiles(scores, percentiles)
+
+        # 由小到大：負分（絕對值大者在前）→ 0 → 正分
+        buckets = [(-self._value_of(key), count) for key, count in sorted(self.negative.items(), reverse=True)]
+        if self.zero_count:
+            buckets.append((0.0, self.zero_count))
+        buckets += [(self._value_of(key), count) for key, count in sorted(self.positive.items())]
+
+        results = []
+        for p in percentiles:
+            if p < 0 or p > 100:
+                raise ValueError("percentiles must be between 0 and 100")
+            rank = round(p / 100 * (self.count - 1))
+            seen = 0
+            value = buckets[-1][0]
+            for bucket_value, count in buckets:
+                seen += count
+                if seen > rank:
+                    value = bucket_value
+                    break
+            results.append(value)
+        return results
+
+    def median(self) -> float:
+        return self.quantiles([50])[0]
+
+    # ── 序列化（存於 SemesterScoreSummary.summary_sketch）────────────────────
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'exact_limit': self.exact_limit,
+            'count': self.count,
+            'zero_count': self.zero_count,
+            'positive': [[key, count] for key, count in sorted(self.positive.items())],
+            'negative': [[key, count] for key, count in sorted(self.negative.items())],
+            'exact': None if self.exact is None else [[value, count] for value, count in sorted(self.exact.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        sketch = cls(data['relative_accuracy'], data['exact_limit'])
+        sketch.count = data['count']
+        sketch.zero_count = data['zero_count']
+        sketch.positive = {key: count for key, count in data['positive']}
+        sketch.negative = {key: count for key, count in data['negative']}
+        sketch.exact = None if data['exact'] is None else {value: count for value, count in data['exact']}
+        return sketch
+
+    @classmethod
+    def from_scores(cls, scores: Sequence[float], relative_accuracy: float = 0.01,
+                    exact_limit: int = 1000) -> 'QuantileSketch':
+        """由分數列表建立摘要"""
+        sketch = cls(relative_accuracy, exact_limit)
+        for score in scores:
+            sketch.add(score)
+        return sketch
@@ -0,0 +1,223 @@
+"""
+Score Matrix Service - 學期成績欄式矩陣（一次查詢建立，快取後供統計 / 匯出共用）
+"""
+import math
+from array import array
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+
+from main.apps.Calculus_metadata.models import Score
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.utils import prometheus_metrics
+
+
+class SemesterScoreMatrix:
+    """學期成績矩陣 - 每個考試欄位一個 float64 陣列（空白或無效為 NaN），列順序與 student_ids 一致"""
+
+    SCORE_FIELDS = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam', 'score_total']
+    # 不列入統計的學生狀態
+    EXCLUDED_STATUSES = ('二退',)
+
+    def __init__(self, semester: str, cursor: int, score_ids: List[int], student_ids: List[int],
+                 student_statuses: List[str], columns: Dict[str, array]):
+        self.semester = semester
+        # 建立時的 ChangeLog 游標，之後有更新的異動即視為過期
+        self.cursor = cursor
+        self.score_ids = score_ids
+        self.student_ids = student_ids
+        self.student_statuses = student_statuses
+        self.columns = columns
+        self._rows_by_student = {student_id: row for row, student_id in enumerate(student_ids)}
+        # 排名索引：各欄位有效分數（排除二退）由小到大排序，與矩陣一同快取
+        active_rows = self.active_rows()
+        self.sorted_columns = {
+            field: array('d', sorted(self.values(field, active_rows))) for field in columns
+        }
+
+    def __len__(self) -> int:
+        return len(self.score_ids)
+
+    def row_of(self, student_id: int) -> Optional[int]:
+        """學生 id 對應的列（無成績記錄時為 None）"""
+        return self._rows_by_student.get(student_id)
+
+    def value(self, row: int, field: str) -> Optional[float]:
+        """取得單一分數（空白為 None）"""
+        score = self.columns[field][row]
+        return None if math.isnan(score) else score
+
+    def active_rows(self) -> List[int]:
+        """列入統計的列（排除二退學生）"""
+        return [
+            row for row, status in enumerate(self.student_statuses)
+            if status not in SemesterScoreMatrix.EXCLUDED_STATUSES
+        ]
+
+    def values(self, field: str, rows: Optional[Sequence[int]] = None) -> List[float]:
+        """
+        取得欄位的有效分數
+
+        Args:
+            field: 分數欄位
+            rows: 指定列（預設為 active_rows）
+
+        Returns:
+            非空白的分數列表
+        """
+        column = self.columns[field]
+        rows = self.active_rows() if rows is None else rows
+        return [column[row] for row in rows if not math.isnan(column[row])]
+
+    def rank(self, row: int, field: str) -> Optional[Dict[str, float]]:
+        """
+        查詢單一分數的名次與百分位（二分搜尋排名索引，O(log n)）
+
+        名次為同分同名次（比此分數高的人數 + 1）；百分位為分數小於等於此分數的人數比例（0–100）
+
+        Args:
+            row: 矩陣列
+            field: 分數欄位
+
+        Returns:
+            {'rank', 'percentile', 'count'}，分數空白或學生不列入統計時為 None
+        """
+        score = self.columns[field][row]
+        if math.isnan(score) or self.student_statuses[row] in SemesterScoreMatrix.EXCLUDED_STATUSES:
+            return None
+        ranked = self.sorted_columns[field]
+        at_or_below = bisect_right(ranked, score)
+        return {
+            'rank': len(ranked) - at_or_below + 1,
+            'percentile': round(at_or_below / len(ranked) * 100, 2),
+            'count': len(ranked),
+        }
+
+    def complete_rows(self, fields: Sequence[str], rows: Optional[Sequence[int]] = None) -> List[int]:
+        """指定欄位皆有分數的列"""
+        rows = self.active_rows() if rows is None else rows
+        return [
+            row for row in rows
+            if not any(math.isnan(self.columns[field][row]) for field in fields)
+        ]
+
+    def matrix(self, fields: Sequence[str], rows: Sequence[int]) -> List[List[float]]:
+        """取出 (列 × 欄位) 分數矩陣，供 CalculationService 批次運算"""
+        columns = [self.columns[field] for field in fields]
+        return [[column[row] for column in columns] for row in rows]
+
+
+class ScoreMatrixService:
+    """成績矩陣服務 - 建立 / 快取 / 失效學期成績矩陣"""
+
+    CACHE_PREFIX = 'score_matrix'
+    # 影響矩陣內容的異動實體
+    SOURCE_ENTITIES = [ChangeFeedService.ENTITY_SCORE, ChangeFeedService.ENTITY_STUDENTS]
+
+    @staticmethod
+    def cache_key(semester: str) -> str:
+        return f"{ScoreMatrixService.CACHE_PREFIX}:{semester}"
+
+    @staticmethod
+    def parse_score(value: str) -> float:
+        """分數字串轉 float，空白或無效時為 NaN"""
+        if not value or not value.strip():
+            return math.nan
+        try:
+            return float(value)
+        except ValueError:
+            return math.nan
+
+    @staticmethod
+    def build(semester: str, cursor: int) -> SemesterScoreMatrix:
+        """
+        以單一查詢建立學期成績矩陣（JOIN 學生，含所有學生狀態）
+
+        Args:
+            semester: 學期
+            cursor: 建立前讀取的 ChangeLog 游標
+
+        Returns:
+            SemesterScoreMatrix
+        """
+        fields = SemesterScoreMatrix.SCORE_FIELDS
+        rows = Score.objects.filter(
+            score_semester=semester, student__student_semester=semester
+        ).order_by('id').values_list('id', 'student_id', 'student__student_status', *fields)
+
+        score_ids, student_ids, statuses = [], [], []
+        columns = {field: array('d') for field in fields}
+        for score_id, student_id, status, *values in rows.iterator(chunk_size=2000):
+            score_ids.append(score_id)
+            student_ids.append(student_id)
+            statuses.append(status)
+            for field, value in zip(fields, values):
+                columns[field].append(ScoreMatrixService.parse_score(value))
+        return SemesterScoreMatrix(semester, cursor, score_ids, student_ids, statuses, columns)
+
+    @staticmethod
+    def get_matrix(semester: str, refresh: bool = False) -> SemesterScoreMatrix:
+        """
+        取得學期成績矩陣（快取命中且無更新的異動時直接回傳）
+
+        Args:
+            semester: 學期
+            refresh: 忽略快取重新建立（寫入流程使用，確保以最新資料計算）
+
+        Returns:
+            SemesterScoreMatrix
+        """
+        # 先讀游標再讀資料：建立期間若有新異動，下次讀取時游標較新即會重建
+        cursor = ChangeFeedService.latest_cursor(ScoreMatrixService.SOURCE_ENTITIES, semester)
+        key = ScoreMatrixService.cache_key(semester)
+        matrix = cache.get(key)
+        if not refresh and matrix is not None and matrix.cursor >= cursor:
+            prometheus_metrics.record_cache(ScoreMatrixService.CACHE_PREFIX, True)
+            return matrix
+        if not refresh:
+            prometheus_metrics.record_cache(ScoreMatrixService.CACHE_PREFIX, False)
+
+        matrix = ScoreMatrixService.build(semester, cursor)
+        cache.set(key, matrix, getattr(settings, 'SCORE_MATRIX_CACHE_SECONDS', 300))
+        return matrix
+
+    @staticmethod
+    def get_matrices(semesters: Sequence[str]) -> Dict[str, SemesterScoreMatrix]:
+        """
+        批次取得多個學期的成績矩陣（游標與快取各一次往返，僅重建過期的學期）
+
+        Args:
+            semesters: 學期列表
+
+        Returns:
+            {學期: SemesterScoreMatrix}
+        """
+        semesters = list(dict.fromkeys(semesters))
+        cursors = ChangeFeedService.latest_cursors(ScoreMatrixService.SOURCE_ENTITIES, semesters)
+        keys = {semester: ScoreMatrixService.cache_key(semester) for semester in semesters}
+        cached = cache.get_many(list(keys.values()))
+
+        matrices, rebuilt = {}, {}
+        for semester in semesters:
+            matrix = cached.get(keys[semester])
+            if matrix is None or matrix.cursor < cursors[semester]:
+                matrix = ScoreMatrixService.build(semester, cursors[semester])
+                rebuilt[keys[semester]] = matrix
+            prometheus_metrics.record_cache(ScoreMatrixService.CACHE_PREFIX, keys[semester] not in rebuilt)
+            matrices[semester] = matrix
+        if rebuilt:
+            cache.set_many(rebuilt, getattr(settings, 'SCORE_MATRIX_CACHE_SECONDS', 300))
+        return matrices
+
+    @staticmethod
+    def invalidate(semester: str) -> None:
+        """
+        清除學期成績矩陣快取（Score / Students 寫入後由 signals 呼叫）
+
+        Args:
+            semester: 學期
+        """
+        if semester:
+            cache.delete(ScoreMatrixService.cache_key(semester))
@@ -0,0 +1,8 @@
+"""
+Change Feed Services Package
+"""
+from .change_feed_service import ChangeFeedService
+
+__all__ = [
+    'ChangeFeedService',
+]
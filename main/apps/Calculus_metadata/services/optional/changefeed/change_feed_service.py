@@ -0,0 +1,252 @@
+"""
+Change Feed Service - 增量同步異動紀錄
+游標為 ChangeLog.change_position（寫入交易 id），只讀取低於 ChangeHorizon() 的位置，
+尚未提交的交易之後才提交時，其異動仍位於已發出的游標之後，不會被跳過
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from main.apps.Calculus_metadata.models import ChangeLog
+from main.apps.Calculus_metadata.models.change_log import ChangeHorizon
+from main.apps.Calculus_metadata.services.business import SqlDbBusinessService
+
+
+class ChangeFeedService:
+    """異動紀錄服務 - 寫入 ChangeLog 並依游標讀取增量異動"""
+
+    # 異動實體（與資料表 / collection 名稱一致）
+    ENTITY_STUDENTS = 'students'
+    ENTITY_SCORE = 'score'
+    ENTITY_TEST = 'test'
+    ENTITY_TEST_PIC = 'test_pic_information'
+
+    OPERATION_CREATE = 'create'
+    OPERATION_UPDATE = 'update'
+    OPERATION_DELETE = 'delete'
+
+    DEFAULT_LIMIT = 500
+    MAX_LIMIT = 5000
+    PRUNE_BATCH_SIZE = 5000
+
+    @staticmethod
+    def record(entity: str, entity_uuid: str, operation: str, semester: str = '') -> ChangeLog:
+        """
+        寫入一筆異動紀錄（與業務寫入同交易，回滾時一併取消）
+
+        Args:
+            entity: 異動實體
+            entity_uuid: 資料唯一識別碼
+            operation: create/update/delete
+            semester: 資料所屬學期
+
+        Returns:
+            ChangeLog 實例
+        """
+        return SqlDbBusinessService.create_entity(ChangeLog, {
+            'change_entity': entity,
+            'change_entity_uuid': entity_uuid,
+            'change_operation': operation,
+            'change_semester': semester or '',
+        })
+
+    @staticmethod
+    def committed():
+        """
+        低於 ChangeHorizon() 的異動紀錄（所屬交易皆已結束，之後不會再出現更小的位置）
+
+        Returns:
+            ChangeLog QuerySet
+        """
+        return ChangeLog.objects.filter(change_position__lt=ChangeHorizon())
+
+    @staticmethod
+    def current_cursor() -> int:
+        """
+        目前可安全發出的游標（只接收之後的異動時使用）
+
+        Returns:
+            ChangeHorizon() - 1
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT change_log_horizon()")
+            return cursor.fetchone()[0] - 1
+
+    @staticmethod
+    def latest_cursor(entities: List[str], semester: str) -> int:
+        """
+        取得指定實體於某學期已提交的最新異動位置（供快取判斷是否過期）
+
+        Args:
+            entities: 異動實體列表
+            semester: 學期
+
+        Returns:
+            最新異動位置（無異動時為 0）
+        """
+        return ChangeFeedService.latest_cursors(entities, [semester])[semester]
+
+    @staticmethod
+    def latest_cursors(entities: List[str], semesters: List[str]) -> Dict[str, int]:
+        """
+        以單一 GROUP BY 查詢取得多個學期已提交的最新異動位置
+
+        Args:
+            entities: 異動實體列表
+            semesters: 學期列表
+
+        Returns:
+            {學期: 最新異動位置}（無異動的學期為 0）
+        """
+        rows = ChangeFeedService.committed().filter(
+            change_entity__in=entities, change_semester__in=semesters
+        ).values('change_semester').annotate(latest=Max('change_position'))
+        latest = {semester: 0 for semester in semesters}
+        latest.update({row['change_semester']: row['latest'] for row in rows})
+        return latest
+
+    @staticmethod
+    def changed_uuids(entities: List[str], semester: str, after_cursor: int) -> Dict[str, Set[str]]:
+        """
+        取得游標之後有異動的資料 UUID（供增量計算判斷需重算的範圍；含尚在進行中交易已可見的異動）
+
+        Args:
+            entities: 異動實體列表
+            semester: 學期
+            after_cursor: 起始游標（不含）
+
+        Returns:
+            {異動實體: UUID 集合}
+        """
+        changed = {entity: set() for entity in entities}
+        rows = ChangeLog.objects.filter(
+            change_entity__in=entities, change_semester=semester, change_position__gt=after_cursor
+        ).values_list('change_entity', 'change_entity_uuid')
+        for entity, entity_uuid in rows:
+            changed[entity].add(entity_uuid)
+        return changed
+
+    @staticmethod
+    def prune(retention_days: int, dry_run: bool = False) -> int:
+        """
+        刪除超過保留天數的異動紀錄（分批刪除，每批一個短交易）
+
+        Args:
+            retention_days: 保留天數
+            dry_run: 只計算筆數不刪除
+
+        Returns:
+            刪除（dry_run 時為待刪除）的筆數
+        """
+        cutoff = timezone.now() - timedelta(days=retention_days)
+        expired = ChangeLog.objects.filter(change_created_at__lt=cutoff)
+        if dry_run:
+            return expired.count()
+        deleted = 0
+        while True:
+            ids = list(expired.order_by('id').values_list('id', flat=True)[:ChangeFeedService.PRUNE_BATCH_SIZE])
+            if not ids:
+                return deleted
+            deleted += ChangeLog.objects.filter(id__in=ids).delete()[0]
+
+    @staticmethod
+    def parse_request(data: Dict[str, Any]) -> Tuple[int, int, Optional[str]]:
+        """
+        解析 change feed 請求參數
+
+        Args:
+            data: 請求資料 {cursor, limit, semester}
+
+        Returns:
+            (cursor, limit, semester)
+
+        Raises:
+            ValueError: 參數格式錯誤
+        """
+        try:
+            cursor = int(data.get('cursor', 0) or 0)
+            limit = int(data.get('limit', ChangeFeedService.DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            raise ValueError("cursor and limit must be integers")
+        if cursor < 0:
+            raise ValueError("cursor must be >= 0")
+        if not 1 <= limit <= ChangeFeedService.MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {ChangeFeedService.MAX_LIMIT}")
+        return cursor, limit, data.get('semester') or None
+
+    @staticmethod
+    def get_changes(entity: Optional[str], cursor: int, limit: int, semester: Optional[str] = None) -> Tuple[List[ChangeLog], int, bool]:
+        """
+        讀取游標之後已提交的異動（同一批次內同一筆資料只保留最後一次異動；
+        同一交易的異動不會被拆到兩個批次，批次可能因此超過 limit）
+
+        Args:
+            entity: 異動實體（None 表示所有實體）
+            cursor: 上次同步取得的 next_cursor（首次為 0）
+            limit: 最多讀取的異動紀錄筆數
+            semester: 僅回傳指定學期的異動
+
+        Returns:
+            (異動紀錄列表, next_cursor, has_more)
+        """
+        filters = {'change_position__gt': cursor, 'change_position__lt': ChangeHorizon()}
+        if entity:
+            filters['change_entity'] = entity
+        if semester:
+            filters['change_semester'] = semester
+        rows = SqlDbBusinessService.get_entities_ordered(
+            ChangeLog, filters, ['change_position', 'id'], limit + 1
+        )
+
+        has_more = len(rows) > limit
+        if has_more and rows[limit].change_position == rows[limit - 1].change_position:
+            # 補齊最後一個交易的其餘異動
+            last = rows[limit - 1]
+            rows = rows[:limit] + SqlDbBusinessService.get_entities_ordered(
+                ChangeLog, {**filters, 'change_position': last.change_position, 'id__gt': last.id}, ['id'], None
+            )
+            has_more = ChangeLog.objects.filter(**{**filters, 'change_position__gt': last.change_position}).exists()
+        else:
+            rows = rows[:limit]
+        next_cursor = rows[-1].change_position if rows else cursor
+
+        latest: Dict[Tuple[str, str], ChangeLog] = {}
+        for row in rows:
+            key = (row.change_entity, row.change_entity_uuid)
+            latest.pop(key, None)
+            latest[key] = row
+        return list(latest.values()), next_cursor, has_more
+
+    @staticmethod
+    def build_feed(
+        changes: List[ChangeLog],
+        current: Dict[str, Dict[str, Any]],
+        next_cursor: int,
+        has_more: bool
+    ) -> Dict[str, Any]:
+        """
+        組合 change feed 回應
+
+        Args:
+            changes: get_changes 回傳的異動紀錄
+            current: {uuid: 目前資料}，已刪除的資料不在其中
+            next_cursor: 下次請求使用的游標
+            has_more: 是否還有未讀取的異動
+
+        Returns:
+            {changes: [...], next_cursor, has_more}
+        """
+        items = []
+        for change in changes:
+            data = current.get(change.change_entity_uuid)
+            items.append({
+                'cursor': change.change_position,
+                'uuid': change.change_entity_uuid,
+                # 資料已不存在時一律視為刪除
+                'operation': change.change_operation if data is not None else ChangeFeedService.OPERATION_DELETE,
+                'data': data,
+            })
+        return {'changes': items, 'next_cursor': next_cursor, 'has_more': has_more}
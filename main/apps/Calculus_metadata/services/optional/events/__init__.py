@@ -0,0 +1,11 @@
+"""
+Event Services Package
+"""
+from .event_broker import InProcessEventBroker, PostgresEventBroker
+from .event_service import EventService
+
+__all__ = [
+    'InProcessEventBroker',
+    'PostgresEventBroker',
+    'EventService',
+]
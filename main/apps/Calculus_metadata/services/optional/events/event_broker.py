@@ -0,0 +1,154 @@
+"""
+Event Brokers - 即時事件發佈 / 訂閱
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessEventBroker:
+    """單機事件代理 - 同一進程內以 asyncio.Queue 分送事件（單節點部署）"""
+
+    # 每個訂閱者最多暫存的事件數，溢出時改送 resync 事件
+    QUEUE_SIZE = 1000
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        """
+        發佈事件（可由任意執行緒呼叫）
+
+        Args:
+            channel: 頻道名稱
+            event: 事件內容
+        """
+        self.deliver(channel, event)
+
+    def deliver(self, channel: str, event: Dict[str, Any]) -> None:
+        """
+        將事件分送給本進程內的訂閱者
+
+        Args:
+            channel: 頻道名稱
+            event: 事件內容
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # event loop 已關閉，訂閱者會在串流結束時自行取消
+                pass
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        if queue.full():
+            # 客戶端跟不上時清空佇列，改以 resync 通知其透過 change feed 補齊
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({'type': 'resync'})
+            return
+        queue.put_nowait(event)
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        """
+        訂閱頻道（需在 event loop 中呼叫）
+
+        Args:
+            channel: 頻道名稱
+
+        Returns:
+            接收事件的 asyncio.Queue
+        """
+        queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        """
+        取消訂閱
+
+        Args:
+            channel: 頻道名稱
+            queue: subscribe 回傳的佇列
+        """
+        with self._lock:
+            subscribers = [item for item in self._subscribers.get(channel, []) if item[1] is not queue]
+            if subscribers:
+                self._subscribers[channel] = subscribers
+            else:
+                self._subscribers.pop(channel, None)
+
+
+class PostgresEventBroker(InProcessEventBroker):
+    """多節點事件代理 - 以 PostgreSQL LISTEN/NOTIFY 跨進程轉送，進程內再分送給訂閱者"""
+
+    NOTIFY_CHANNEL = 'calculus_events'
+    POLL_SECONDS = 5
+    RECONNECT_SECONDS = 3
+
+    def __init__(self):
+        super().__init__()
+        self._listener: Optional[threading.Thread] = None
+        self._listener_lock = threading.Lock()
+
+    def publish(self, channel: str, event: Dict[str, Any]) -> None:
+        """
+        以 pg_notify 發佈事件（所有節點的 listener 都會收到）
+
+        Args:
+            channel: 頻道名稱
+            event: 事件內容
+        """
+        payload = json.dumps({'channel': channel, 'event': event}, ensure_ascii=False)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.NOTIFY_CHANNEL, payload])
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        self._ensure_listener()
+        return super().subscribe(channel)
+
+    def _ensure_listener(self) -> None:
+        """每個進程啟動一條 LISTEN 背景執行緒"""
+        with self._listener_lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name='pg-event-listener', daemon=True)
+                self._listener.start()
+
+    def _listen(self) -> None:
+        """LISTEN 迴圈（連線中斷時自動重連）"""
+        import psycopg2
+
+        params = connection.get_connection_params()
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**params)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.NOTIFY_CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], self.POLL_SECONDS) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        message = json.loads(conn.notifies.pop(0).payload)
+                        self.deliver(message['channel'], message['event'])
+            except Exception as e:
+                logger.warning("Event listener disconnected, reconnecting: %s", e)
+                time.sleep(self.RECONNECT_SECONDS)
+            finally:
+                if conn is not None:
+                    conn.close()
@@ -0,0 +1,185 @@
+"""
+Event Service - 學期異動事件推送（Server-Sent Events）
+"""
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from main.apps.Calculus_metadata.models import ChangeLog
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+
+
+class EventService:
+    """事件服務 - 發佈異動事件並產生 SSE 串流"""
+
+    # EVENT_BROKER_BACKEND 別名，亦可直接填入 broker 類別的 dotted path
+    BROKER_BACKENDS = {
+        'memory': 'main.apps.Calculus_metadata.services.optional.events.InProcessEventBroker',
+        'postgres': 'main.apps.Calculus_metadata.services.optional.events.PostgresEventBroker',
+    }
+    # 斷線後瀏覽器重連的等待時間（毫秒）
+    RETRY_MS = 3000
+    # 已收到即時事件、但其交易之前仍有進行中的交易時，重新讀取 change feed 的間隔（秒）
+    PENDING_POLL_SECONDS = 1.0
+
+    _broker = None
+    _broker_lock = threading.Lock()
+
+    @staticmethod
+    def get_broker():
+        """
+        取得事件代理（依 EVENT_BROKER_BACKEND，每個進程一個實例）
+
+        Returns:
+            事件代理實例
+        """
+        if EventService._broker is None:
+            with EventService._broker_lock:
+                if EventService._broker is None:
+                    backend = getattr(settings, 'EVENT_BROKER_BACKEND', 'memory')
+                    EventService._broker = import_string(EventService.BROKER_BACKENDS.get(backend, backend))()
+        return EventService._broker
+
+    @staticmethod
+    def channel(semester: str) -> str:
+        """
+        學期頻道名稱
+
+        Args:
+            semester: 學期
+
+        Returns:
+            頻道名稱
+        """
+        return f"semester:{semester}"
+
+    @staticmethod
+    def build_event(change: ChangeLog) -> Dict[str, Any]:
+        """
+        由異動紀錄產生事件內容（cursor 為異動位置，重連請使用 checkpoint 事件的 cursor）
+
+        Args:
+            change: 異動紀錄
+
+        Returns:
+            事件內容
+        """
+        return {
+            'type': 'change',
+            'cursor': change.change_position,
+            'entity': change.change_entity,
+            'uuid': change.change_entity_uuid,
+            'operation': change.change_operation,
+            'semester': change.change_semester,
+        }
+
+    @staticmethod
+    def publish_change(change: ChangeLog) -> None:
+        """
+        交易提交後發佈異動事件（回滾時不發佈）
+
+        Args:
+            change: 異動紀錄
+        """
+        broker = EventService.get_broker()
+        event = EventService.build_event(change)
+        channel = EventService.channel(change.change_semester)
+        transaction.on_commit(lambda: broker.publish(channel, event))
+
+    @staticmethod
+    def format_sse(event: Dict[str, Any], include_id: bool = True) -> str:
+        """
+        轉為 SSE 訊息格式
+
+        Args:
+            event: 事件內容
+            include_id: 是否以 cursor 作為 SSE id（瀏覽器重連時以 Last-Event-ID 帶回）
+
+        Returns:
+            SSE 文字區塊
+        """
+        lines = []
+        if include_id and 'cursor' in event:
+            lines.append(f"id: {event['cursor']}")
+        lines.append(f"event: {event.get('type', 'change')}")
+        lines.append(f"data: {json.dumps(event, ensure_ascii=False)}")
+        return '\n'.join(lines) + '\n\n'
+
+    @staticmethod
+    async def stream(semester: str, cursor: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        學期事件串流：事件一律由 change feed 讀出（只含已提交且不會再被插隊的異動），
+        即時事件僅用來喚醒讀取；每批異動後送出帶 SSE id 的 checkpoint，
+        超過 EVENT_STREAM_MAX_SECONDS 後結束，由客戶端帶最後的 checkpoint cursor 重連
+
+        Args:
+            semester: 學期
+            cursor: 上次收到的 checkpoint cursor（None 表示只接收之後的異動）
+
+        Yields:
+            SSE 文字區塊
+        """
+        broker = EventService.get_broker()
+        channel = EventService.channel(semester)
+        queue = broker.subscribe(channel)
+        loop = asyncio.get_running_loop()
+        heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT_SECONDS', 15)
+        deadline = loop.time() + getattr(settings, 'EVENT_STREAM_MAX_SECONDS', 300)
+        get_changes = sync_to_async(ChangeFeedService.get_changes)
+        try:
+            yield f"retry: {EventService.RETRY_MS}\n\n"
+            last_output = loop.time()
+
+            # 先訂閱再讀取游標，避免之間的異動遺漏
+            poll = cursor is not None
+            if cursor is None:
+                cursor = await sync_to_async(ChangeFeedService.current_cursor)()
+            latest_seen = cursor
+
+            while True:
+                if poll:
+                    poll = False
+                    changes, next_cursor, has_more = await get_changes(
+                        None, cursor, ChangeFeedService.MAX_LIMIT, semester
+                    )
+                    for change in changes:
+                        yield EventService.format_sse(EventService.build_event(change), include_id=False)
+                    if has_more:
+                        # 落後太多：改由客戶端以 change feed 補齊後重連
+                        yield EventService.format_sse({'type': 'resync', 'cursor': next_cursor})
+                        return
+                    if next_cursor != cursor:
+                        cursor = next_cursor
+                        yield EventService.format_sse({'type': 'checkpoint', 'cursor': cursor})
+                        last_output = loop.time()
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                waiting = latest_seen > cursor
+                timeout = min(EventService.PENDING_POLL_SECONDS if waiting else heartbeat, remaining)
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    poll = waiting
+                    if loop.time() - last_output >= heartbeat:
+                        yield ": keepalive\n\n"
+                        last_output = loop.time()
+                    continue
+
+                # 一次取出佇列中的所有事件，只讀取一次 change feed（佇列溢出時的 resync 亦同）
+                events = [event]
+                while not queue.empty():
+                    events.append(queue.get_nowait())
+                for event in events:
+                    if event.get('type') == 'change':
+                        latest_seen = max(latest_seen, event['cursor'])
+                poll = True
+        finally:
+            broker.unsubscribe(channel, queue)
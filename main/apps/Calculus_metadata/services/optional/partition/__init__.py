@@ -0,0 +1,8 @@
+"""
+Partition Services Package
+"""
+from .semester_partition_service import SemesterPartitionService
+
+__all__ = [
+    'SemesterPartitionService',
+]
@@ -0,0 +1,379 @@
+"""
+Semester Partition Service - PostgreSQL 學期清單分區 (LIST partitioning)
+"""
+import re
+import time
+from typing import Type, List, Dict, Set, Tuple
+from django.conf import settings
+from django.db import connection, models, transaction
+
+
+class SemesterPartitionService:
+    """學期分區服務 - 依學期建立 / 轉換 PostgreSQL 清單分區"""
+
+    # 已確認存在的分區 {(table, semester)}，避免每次寫入都查詢 catalog
+    _known_partitions: Set[Tuple[str, str]] = set()
+    # 已確認為分區表的資料表（轉換後不會還原，不需重新查詢）
+    _partitioned_tables: Set[str] = set()
+    # 確認為一般資料表的時間 {table: time.monotonic()}；逾時後重新查詢，
+    # 其他進程執行 partition_by_semester 後，執行中的 worker 不需重啟即會開始建立學期分區
+    _unpartitioned_checked_at: Dict[str, float] = {}
+    UNPARTITIONED_RECHECK_SECONDS = 30
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        是否啟用學期分區（需設定 DB_SEMESTER_PARTITIONING 且為 PostgreSQL）
+
+        Returns:
+            是否啟用
+        """
+        return (
+            getattr(settings, 'DB_SEMESTER_PARTITIONING', False)
+            and connection.vendor == 'postgresql'
+        )
+
+    @staticmethod
+    def partition_name(table: str, semester: str) -> str:
+        """
+        產生分區資料表名稱
+        格式: {table}_p{semester}
+
+        Args:
+            table: 母表名稱
+            semester: 學期
+
+        Returns:
+            分區資料表名稱
+        """
+        if not re.fullmatch(r'[0-9A-Za-z_]+', semester or ''):
+            raise ValueError(f"Invalid semester for partition name: {semester!r}")
+        return f"{table}_p{semester}"
+
+    @staticmethod
+    def is_partitioned(model_class: Type[models.Model]) -> bool:
+        """
+        檢查 Model 對應的資料表是否已轉換為分區表
+
+        Args:
+            model_class: Model 類別
+
+        Returns:
+            是否為分區表
+        """
+        table = model_class._meta.db_table
+        if table in SemesterPartitionService._partitioned_tables:
+            return True
+        checked_at = SemesterPartitionService._unpartitioned_checked_at.get(table)
+        recheck_seconds = SemesterPartitionService.UNPARTITIONED_RECHECK_SECONDS
+        if checked_at is not None and time.monotonic() - checked_at < recheck_seconds:
+            return False
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+                [table]
+            )
+            partitioned = cursor.fetchone() is not None
+        if partitioned:
+            SemesterPartitionService._partitioned_tables.add(table)
+            SemesterPartitionService._unpartitioned_checked_at.pop(table, None)
+        else:
+            SemesterPartitionService._unpartitioned_checked_at[table] = time.monotonic()
+        return partitioned
+
+    @staticmethod
+    def ensure_partition(model_class: Type[models.Model], semester: str) -> bool:
+        """
+        確保指定學期的分區存在（新學期第一次出現時自動建立）
+        DEFAULT 分區已有該學期的資料時（例如分區功能關閉期間寫入），先移出再建立分區
+
+        Args:
+            model_class: Model 類別
+            semester: 學期
+
+        Returns:
+            是否新建了分區
+        """
+        if not semester or not SemesterPartitionService.is_enabled():
+            return False
+
+        table = model_class._meta.db_table
+        key = (table, semester)
+        if key in SemesterPartitionService._known_partitions:
+            return False
+        if not SemesterPartitionService.is_partitioned(model_class):
+            return False
+
+        name = SemesterPartitionService.partition_name(table, semester)
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s)", [name])
+            exists = cursor.fetchone()[0] is not None
+            if not exists:
+                moves = SemesterPartitionService._detach_default_rows(cursor, table, semester)
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {quote(name)} "
+                    f"PARTITION OF {quote(table)} FOR VALUES IN (%s)",
+                    [semester]
+                )
+                for target, moved in moves:
+                    cursor.execute(f"INSERT INTO {quote(target)} SELECT * FROM {quote(moved)}")
+                    cursor.execute(f"DROP TABLE {quote(moved)}")
+
+        # 交易回滾時分區也會被回滾，因此僅在提交後寫入快取
+        transaction.on_commit(lambda: SemesterPartitionService._known_partitions.add(key))
+        return not exists
+
+    @staticmethod
+    def _detach_default_rows(cursor, table: str, semester: str) -> List[Tuple[str, str]]:
+        """
+        將 DEFAULT 分區中該學期的資料移至暫存表（否則 CREATE TABLE ... PARTITION OF 會失敗）
+        參照這些資料的外鍵資料列（如 score → students）一併暫時移出：
+        PostgreSQL 只在原分區重新檢查被刪除的鍵，檢查時不能留下參照列
+
+        Args:
+            cursor: 資料庫游標
+            table: 母表名稱
+            semester: 學期
+
+        Returns:
+            [(資料表, 暫存表)]，依序寫回；DEFAULT 分區沒有該學期資料時為空列表
+        """
+        quote = connection.ops.quote_name
+        default = f"{table}_default"
+        cursor.execute(
+            "SELECT a.attname FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = pt.partattrs[0] "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table]
+        )
+        row = cursor.fetchone()
+        cursor.execute("SELECT to_regclass(%s)", [default])
+        if row is None or cursor.fetchone()[0] is None:
+            return []
+        column = row[0]
+
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {quote(default)} WHERE {quote(column)} = %s)", [semester])
+        if not cursor.fetchone()[0]:
+            return []
+
+        # 參照本表的外鍵 (參照表, 外鍵欄位, 被參照欄位)，僅取母表上的約束
+        cursor.execute(
+            "SELECT c.conrelid::regclass::text, "
+            "array(SELECT a.attname FROM unnest(c.conkey) WITH ORDINALITY k(attnum, ord) "
+            "      JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum ORDER BY k.ord), "
+            "array(SELECT a.attname FROM unnest(c.confkey) WITH ORDINALITY k(attnum, ord) "
+            "      JOIN pg_attribute a ON a.attrelid = c.confrelid AND a.attnum = k.attnum ORDER BY k.ord) "
+            "FROM pg_constraint c "
+            "WHERE c.contype = 'f' AND c.confrelid = %s::regclass AND c.conparentid = 0",
+            [table]
+        )
+        references = cursor.fetchall()
+
+        moves = []
+        referencing_moves = []
+        for ref_table, fk_columns, pk_columns in references:
+            ref_moved = f"{ref_table}_moving_{table}_p{semester}"
+            fk_sql = ', '.join(quote(c) for c in fk_columns)
+            pk_sql = ', '.join(quote(c) for c in pk_columns)
+            cursor.execute(f"CREATE TEMP TABLE {quote(ref_moved)} (LIKE {quote(ref_table)}) ON COMMIT DROP")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {quote(ref_table)} WHERE ({fk_sql}) IN "
+                f"(SELECT {pk_sql} FROM {quote(default)} WHERE {quote(column)} = %s) RETURNING *) "
+                f"INSERT INTO {quote(ref_moved)} SELECT * FROM moved",
+                [semester]
+            )
+            referencing_moves.append((ref_table, ref_moved))
+
+        moved = f"{table}_moving_p{semester}"
+        cursor.execute(f"CREATE TEMP TABLE {quote(moved)} (LIKE {quote(table)}) ON COMMIT DROP")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {quote(default)} WHERE {quote(column)} = %s RETURNING *) "
+            f"INSERT INTO {quote(moved)} SELECT * FROM moved",
+            [semester]
+        )
+        moves.append((table, moved))
+        if referencing_moves:
+            # 刪除事件的外鍵檢查需在參照列寫回前執行（所有 DEFERRABLE 約束皆為 INITIALLY DEFERRED）
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+        return moves + referencing_moves
+
+    @staticmethod
+    def build_conversion_sql(model_class: Type[models.Model], partition_field: str) -> List[Tuple[str, list]]:
+        """
+        產生將既有資料表轉換為學期清單分區表的 SQL
+
+        轉換後主鍵與唯一約束皆會加入分區鍵（PostgreSQL 限制），
+        並為現有每個學期建立分區，另建 DEFAULT 分區承接空值。
+
+        Args:
+            model_class: Model 類別
+            partition_field: 分區鍵欄位名稱
+
+        Returns:
+            [(sql, params), ...]
+        """
+        quote = connection.ops.quote_name
+        table = model_class._meta.db_table
+        column = model_class._meta.get_field(partition_field).column
+        legacy = f"{table}_unpartitioned"
+        sequence = f"{table}_partitioned_id_seq"
+
+        with connection.cursor() as cursor:
+            # 非約束索引（保留原名重建）
+            cursor.execute(
+                "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "WHERE t.relname = %s AND pg_table_is_visible(t.oid) "
+                "AND NOT x.indisunique "
+                "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)",
+                [table]
+            )
+            plain_indexes = cursor.fetchall()
+
+            # 所有索引名稱（含約束索引），需先改名以釋放名稱
+            cursor.execute(
+                "SELECT i.relname FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "WHERE t.relname = %s AND pg_table_is_visible(t.oid)",
+                [table]
+            )
+            all_indexes = [row[0] for row in cursor.fetchall()]
+
+            # 唯一約束 {name: [columns]}
+            cursor.execute(
+                "SELECT c.conname, array_agg(a.attname ORDER BY k.ord) "
+                "FROM pg_constraint c "
+                "JOIN pg_class t ON t.oid = c.conrelid "
+                "CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord) "
+                "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum "
+                "WHERE t.relname = %s AND pg_table_is_visible(t.oid) AND c.contype = 'u' "
+                "GROUP BY c.conname",
+                [table]
+            )
+            unique_constraints = cursor.fetchall()
+
+            cursor.execute(
+                f"SELECT DISTINCT {quote(column)} FROM {quote(table)} "
+                f"WHERE {quote(column)} <> '' ORDER BY 1"
+            )
+            semesters = [row[0] for row in cursor.fetchall()]
+
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quote(table)}")
+            max_id = cursor.fetchone()[0]
+
+        statements = [
+            (f"ALTER TABLE {quote(table)} RENAME TO {quote(legacy)}", []),
+        ]
+        for index_name in all_indexes:
+            statements.append(
+                (f"ALTER INDEX {quote(index_name)} RENAME TO {quote(index_name + '_old')}", [])
+            )
+        statements += [
+            (f"CREATE SEQUENCE {quote(sequence)}", []),
+            ("SELECT setval(%s, %s, true)", [sequence, max(max_id, 1)]),
+            (
+                f"CREATE TABLE {quote(table)} (LIKE {quote(legacy)} INCLUDING DEFAULTS) "
+                f"PARTITION BY LIST ({quote(column)})",
+                []
+            ),
+            (f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [sequence]),
+            (f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} PRIMARY KEY (id, {quote(column)})", []),
+        ]
+        for constraint_name, columns in unique_constraints:
+            columns = list(columns)
+            if column not in columns:
+                columns.append(column)
+            column_sql = ', '.join(quote(c) for c in columns)
+            statements.append(
+                (f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(constraint_name)} UNIQUE ({column_sql})", [])
+            )
+        for _, index_def in plain_indexes:
+            statements.append((index_def, []))
+        for semester in semesters:
+            name = SemesterPartitionService.partition_name(table, semester)
+            statements.append(
+                (f"CREATE TABLE {quote(name)} PARTITION OF {quote(table)} FOR VALUES IN (%s)", [semester])
+            )
+        statements += [
+            (f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(table)} DEFAULT", []),
+            (f"INSERT INTO {quote(table)} SELECT * FROM {quote(legacy)}", []),
+            (f"DROP TABLE {quote(legacy)}", []),
+            (f"ALTER SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id", []),
+        ]
+        return statements
+
+    @staticmethod
+    def build_drop_foreign_keys_sql(model_class: Type[models.Model], target_model: Type[models.Model]) -> List[Tuple[str, list]]:
+        """
+        產生刪除 model_class → target_model 外鍵約束的 SQL（轉換分區前需先移除）
+
+        Args:
+            model_class: 持有外鍵的 Model 類別
+            target_model: 被參照的 Model 類別
+
+        Returns:
+            [(sql, params), ...]
+        """
+        quote = connection.ops.quote_name
+        table = model_class._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT c.conname FROM pg_constraint c "
+                "JOIN pg_class t ON t.oid = c.conrelid "
+                "JOIN pg_class r ON r.oid = c.confrelid "
+                "WHERE c.contype = 'f' AND t.relname = %s AND r.relname = %s "
+                "AND pg_table_is_visible(t.oid)",
+                [table, target_model._meta.db_table]
+            )
+            names = [row[0] for row in cursor.fetchall()]
+        return [(f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}", []) for name in names]
+
+    @staticmethod
+    def build_partitioned_foreign_key_sql(
+        model_class: Type[models.Model],
+        fk_field: str,
+        partition_field: str,
+        target_partition_field: str
+    ) -> List[Tuple[str, list]]:
+        """
+        產生分區表之間的複合外鍵 SQL: (fk, 分區鍵) → 被參照表 (id, 分區鍵)
+
+        Args:
+            model_class: 持有外鍵的 Model 類別
+            fk_field: 外鍵欄位名稱
+            partition_field: 本表分區鍵欄位名稱
+            target_partition_field: 被參照表分區鍵欄位名稱
+
+        Returns:
+            [(sql, params), ...]
+        """
+        quote = connection.ops.quote_name
+        table = model_class._meta.db_table
+        field = model_class._meta.get_field(fk_field)
+        target_model = field.related_model
+        target_table = target_model._meta.db_table
+        partition_column = model_class._meta.get_field(partition_field).column
+        target_partition_column = target_model._meta.get_field(target_partition_field).column
+        target_pk_column = target_model._meta.pk.column
+        constraint_name = f"{table}_{field.column}_{target_table}_fk"
+        return [(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(constraint_name)} "
+            f"FOREIGN KEY ({quote(field.column)}, {quote(partition_column)}) "
+            f"REFERENCES {quote(target_table)} ({quote(target_pk_column)}, {quote(target_partition_column)}) "
+            f"DEFERRABLE INITIALLY DEFERRED",
+            []
+        )]
+
+    @staticmethod
+    def clear_cache() -> None:
+        """清除分區狀態快取（轉換完成後呼叫）"""
+        SemesterPartitionService._known_partitions.clear()
+        SemesterPartitionService._partitioned_tables.clear()
+        SemesterPartitionService._unpartitioned_checked_at.clear()
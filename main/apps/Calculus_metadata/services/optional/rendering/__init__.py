@@ -0,0 +1,8 @@
+"""
+Rendering Services Package
+"""
+from .chart_render_service import ChartRenderService
+
+__all__ = [
+    'ChartRenderService',
+]
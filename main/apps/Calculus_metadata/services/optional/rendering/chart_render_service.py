@@ -0,0 +1,156 @@
+"""
+Chart Render Service - 圖表繪製進程池
+matplotlib 繪圖為 CPU 密集且持有 GIL，改由預先啟動的子進程執行，
+子進程於初始化時載入 matplotlib 與字體一次，web 進程不需載入 pyplot
+"""
+import importlib.util
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from main.utils.request_metrics import track_render
+
+from . import histogram_renderer, native_histogram_renderer
+
+
+class ChartRenderService:
+    """圖表繪製服務 - 管理 renderer 進程池、並行上限與逾時"""
+
+    _pool: Optional[ProcessPoolExecutor] = None
+    _pool_lock = threading.Lock()
+    _semaphore: Optional[threading.BoundedSemaphore] = None
+
+    # 不需 matplotlib、於目前進程直接繪製的格式
+    NATIVE_FORMATS = ('svg',)
+
+    @staticmethod
+    def has_matplotlib() -> bool:
+        """
+        是否已安裝 matplotlib
+
+        Returns:
+            是否已安裝
+        """
+        return importlib.util.find_spec('matplotlib') is not None
+
+    @staticmethod
+    def is_available(output_format: str = 'png') -> bool:
+        """
+        是否可繪製指定格式（svg 與 png 不需 matplotlib，jpg 需要）
+
+        Args:
+            output_format: 輸出格式
+
+        Returns:
+            是否可繪圖
+        """
+        output_format = output_format.lower()
+        return (
+            output_format in ChartRenderService.NATIVE_FORMATS
+            or output_format == 'png'
+            or ChartRenderService.has_matplotlib()
+        )
+
+    @staticmethod
+    def get_pool() -> Optional[ProcessPoolExecutor]:
+        """
+        取得（或延遲建立）renderer 進程池；CHART_RENDER_WORKERS=0 時回傳 None（同進程繪製）
+
+        Returns:
+            ProcessPoolExecutor 或 None
+        """
+        workers = getattr(settings, 'CHART_RENDER_WORKERS', 2)
+        if workers <= 0:
+            return None
+        if ChartRenderService._pool is None:
+            with ChartRenderService._pool_lock:
+                if ChartRenderService._pool is None:
+                    # spawn：子進程不繼承 web 進程的資料庫連線 / 執行緒狀態
+                    ChartRenderService._pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=histogram_renderer.init_worker,
+                    )
+        return ChartRenderService._pool
+
+    @staticmethod
+    def get_semaphore() -> threading.BoundedSemaphore:
+        """取得並行繪製上限的 semaphore（CHART_RENDER_MAX_CONCURRENCY）"""
+        if ChartRenderService._semaphore is None:
+            with ChartRenderService._pool_lock:
+                if ChartRenderService._semaphore is None:
+                    limit = getattr(settings, 'CHART_RENDER_MAX_CONCURRENCY', 4)
+                    ChartRenderService._semaphore = threading.BoundedSemaphore(max(limit, 1))
+        return ChartRenderService._semaphore
+
+    @staticmethod
+    def warm_up() -> None:
+        """預先啟動 renderer 子進程（可於服務啟動時呼叫，避免首次請求等待）"""
+        pool = ChartRenderService.get_pool()
+        if pool is None:
+            histogram_renderer.init_worker()
+            return
+        workers = getattr(settings, 'CHART_RENDER_WORKERS', 2)
+        for future in [pool.submit(histogram_renderer.init_worker) for _ in range(workers)]:
+            future.result()
+
+    @staticmethod
+    def render_histogram(spec: Dict[str, Any]) -> Tuple[bytes, str, str]:
+        """
+        繪製直方圖
+
+        Args:
+            spec: 直方圖描述（見 histogram_renderer.render_histogram）
+
+        Returns:
+            (image_bytes, content_type, file_ext)
+
+        Raises:
+            TimeoutError: 等待繪製名額或繪製本身超過 CHART_RENDER_TIMEOUT 秒
+        """
+        with track_render():
+            return ChartRenderService._render(spec)
+
+    @staticmethod
+    def _render(spec: Dict[str, Any]) -> Tuple[bytes, str, str]:
+        """依輸出格式選擇 renderer（render_histogram 的實作）"""
+        output_format = spec['output_format'].lower()
+        # SVG 僅為字串組合，數毫秒即可完成，不經過進程池
+        if output_format in ChartRenderService.NATIVE_FORMATS:
+            return native_histogram_renderer.render_svg(spec)
+        # 未安裝 matplotlib 時 PNG 改用內建簡易 renderer
+        if output_format == 'png' and not ChartRenderService.has_matplotlib():
+            return native_histogram_renderer.render_png(spec)
+
+        timeout = getattr(settings, 'CHART_RENDER_TIMEOUT', 30)
+        semaphore = ChartRenderService.get_semaphore()
+        if not semaphore.acquire(timeout=timeout):
+            raise TimeoutError("Chart renderer is busy, please retry later")
+        try:
+            pool = ChartRenderService.get_pool()
+            if pool is None:
+                return histogram_renderer.render_histogram(spec)
+            future = pool.submit(histogram_renderer.render_histogram, spec)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"Chart rendering timed out after {timeout}s")
+            except BrokenProcessPool:
+                # 子進程異常結束，重建進程池供下次使用
+                ChartRenderService.reset()
+                raise
+        finally:
+            semaphore.release()
+
+    @staticmethod
+    def reset() -> None:
+        """關閉並丟棄目前的進程池"""
+        with ChartRenderService._pool_lock:
+            pool, ChartRenderService._pool = ChartRenderService._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,142 @@
+"""
+Histogram Renderer - 直方圖繪製（於 renderer 子進程執行）
+本模組不依賴 Django，僅接收可序列化的 spec dict 並回傳圖片 bytes
+"""
+import bisect
+import io
+import os
+import threading
+from typing import Any, Dict, Sequence, Tuple
+
+# 容器內安裝的 WenQuanYi Zen Hei 字體
+WQY_FONT_PATH = '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc'
+FALLBACK_FONTS = ['WenQuanYi Zen Hei', 'Microsoft YaHei', 'SimHei', 'DejaVu Sans']
+
+_initialized = False
+_init_lock = threading.Lock()
+# 未使用進程池（CHART_RENDER_WORKERS=0）時，同進程內的繪製需序列化
+_render_lock = threading.Lock()
+
+
+def init_worker() -> None:
+    """
+    進程初始化：載入 matplotlib（Agg 後端）並設定中文字體，每個進程僅執行一次
+    """
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        import matplotlib
+        matplotlib.use('Agg')  # 使用非 GUI 後端
+        import matplotlib.font_manager as fm
+
+        try:
+            if os.path.exists(WQY_FONT_PATH):
+                fm.fontManager.addfont(WQY_FONT_PATH)
+                font_name = fm.FontProperties(fname=WQY_FONT_PATH).get_name()
+                matplotlib.rcParams['font.sans-serif'] = [font_name, 'DejaVu Sans']
+            else:
+                matplotlib.rcParams['font.sans-serif'] = FALLBACK_FONTS
+            matplotlib.rcParams['axes.unicode_minus'] = False
+        except Exception:
+            pass
+        _initialized = True
+
+
+def bin_position(bin_edges: Sequence[float], value: float) -> float:
+    """
+    分數在級距座標上的位置：第 i 個級距 [e(i), e(i+1)) 對應 [i, i+1)，級距內線性內插
+
+    Args:
+        bin_edges: 遞增的級距邊界
+        value: 分數
+
+    Returns:
+        0 ~ 級距數 之間的位置（範圍外夾至兩端）
+    """
+    if value <= bin_edges[0]:
+        return 0.0
+    if value >= bin_edges[-1]:
+        return float(len(bin_edges) - 1)
+    i = bisect.bisect_right(bin_edges, value) - 1
+    return i + (value - bin_edges[i]) / (bin_edges[i + 1] - bin_edges[i])
+
+
+def render_histogram(spec: Dict[str, Any]) -> Tuple[bytes, str, str]:
+    """
+    依 spec 繪製直方圖
+
+    Args:
+        spec: {
+            'bin_edges': [0, 10, ...] 級距邊界,
+            'counts': [3, ...] 各級距人數,
+            'labels': ['0-10', ...] 級距標籤,
+            'title': 標題,
+            'output_format': 'png' | 'jpg',
+            'total': 人數, 'average': 平均, 'median': 中位數
+        }
+
+    Returns:
+        (image_bytes, content_type, file_ext)
+    """
+    init_worker()
+    from matplotlib.figure import Figure
+
+    bin_edges = spec['bin_edges']
+    avg = spec['average']
+    median = spec['median']
+
+    with _render_lock:
+        # 使用 Figure 物件而非 pyplot，避免 pyplot 的全域 figure 狀態
+        fig = Figure(figsize=(12, 6))
+        ax = fig.subplots()
+
+        # 準備資料
+        bins = spec['labels']
+        counts = spec['counts']
+
+        # 繪製長條圖
+        x_pos = range(len(bins))
+        bars = ax.bar(x_pos, counts, alpha=0.7, color='steelblue', edgecolor='black')
+
+        # 在長條上顯示數值
+        for bar, count in zip(bars, counts):
+            if count > 0:
+                ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5,
+                       str(count), ha='center', va='bottom', fontsize=10)
+
+        # 設定標籤
+        ax.set_xlabel('Score Range (分數區間)', fontsize=12)
+        ax.set_ylabel('Student Count (學生人數)', fontsize=12)
+        ax.set_title(spec['title'], fontsize=14, fontweight='bold')
+        ax.set_xticks(x_pos)
+        ax.set_xticklabels(bins, rotation=45, ha='right')
+        ax.grid(axis='y', alpha=0.3, linestyle='--')
+
+        # 顯示統計資訊
+        stats_text = f"Total: {spec['total']} | Avg: {avg:.2f} | Median: {median:.2f}"
+        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
+               verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+        # 顯示平均與中位數垂直線
+        # x 座標換算：bar n 以 x=n 為中心，左緣在 x=n-0.5
+        # 因此分數 v 對應 x = bin_position(v) - 0.5（級距寬度可不相等）
+        ax.axvline(x=bin_position(bin_edges, avg) - 0.5, color='red', linestyle='--', linewidth=2, alpha=0.85,
+                   label=f'平均: {avg:.1f}')
+        ax.axvline(x=bin_position(bin_edges, median) - 0.5, color='green', linestyle='-', linewidth=2, alpha=0.85,
+                   label=f'中位數: {median:.1f}')
+        ax.legend(loc='upper right', fontsize=10)
+
+        fig.tight_layout()
+
+        # 儲存圖片到記憶體
+        img_buffer = io.BytesIO()
+        if spec['output_format'].lower() in ('jpg', 'jpeg'):
+            fig.savefig(img_buffer, format='jpeg', dpi=150, bbox_inches='tight')
+            content_type = 'image/jpeg'
+            file_ext = 'jpg'
+        else:
+            fig.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+            content_type = 'image/png'
+            file_ext = 'png'
+    return img_buffer.getvalue(), content_type, file_ext
@@ -0,0 +1,328 @@
+"""
+Native Histogram Renderer - 不依賴 matplotlib 的直方圖繪製
+直接輸出 SVG；未安裝 matplotlib 時可輸出簡易 PNG（僅數字標示，不含中文標題 / 軸標籤）
+spec 格式與 histogram_renderer.render_histogram 相同
+"""
+import math
+import struct
+import zlib
+from typing import Any, Dict, Tuple
+from xml.sax.saxutils import escape
+
+from .histogram_renderer import bin_position
+
+WIDTH = 1200
+HEIGHT = 600
+MARGIN_LEFT = 90
+MARGIN_RIGHT = 30
+MARGIN_TOP = 60
+MARGIN_BOTTOM = 110
+
+FONT_FAMILY = "'WenQuanYi Zen Hei', 'Microsoft YaHei', 'SimHei', 'DejaVu Sans', sans-serif"
+BAR_COLOR = '#4682b4'
+AVERAGE_COLOR = '#ff0000'
+MEDIAN_COLOR = '#008000'
+
+
+def _y_axis(max_count: int) -> Tuple[int, int]:
+    """計算 y 軸上限與刻度間距（1 / 2 / 5 × 10^n）"""
+    raw_step = max(max_count * 1.1 / 5, 1)
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    step = max(int(step), 1)
+    y_max = max(step * math.ceil(max_count * 1.1 / step), step)
+    return y_max, step
+
+
+def _layout(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """計算 SVG / PNG 共用的座標"""
+    bins, counts, bin_edges = spec['labels'], spec['counts'], spec['bin_edges']
+    y_max, y_step = _y_axis(max(counts, default=0))
+    plot_w = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+    plot_h = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+    slot = plot_w / max(len(bins), 1)
+
+    def x_of_score(value: float) -> float:
+        # 第 n 個長條涵蓋分數 [e(n), e(n+1))
+        return MARGIN_LEFT + bin_position(bin_edges, value) * slot
+
+    def y_of_count(count: float) -> float:
+        return MARGIN_TOP + plot_h - count / y_max * plot_h
+
+    return {
+        'bins': bins,
+        'counts': counts,
+        'y_max': y_max,
+        'y_step': y_step,
+        'plot_w': plot_w,
+        'plot_h': plot_h,
+        'slot': slot,
+        'bar_w': slot * 0.8,
+        'x_of_score': x_of_score,
+        'y_of_count': y_of_count,
+    }
+
+
+# ── SVG ──────────────────────────────────────────────────────────────────────
+
+def render_svg(spec: Dict[str, Any]) -> Tuple[bytes, str, str]:
+    """
+    繪製 SVG 直方圖
+
+    Args:
+        spec: 直方圖描述
+
+    Returns:
+        (image_bytes, content_type, file_ext)
+    """
+    layout = _layout(spec)
+    bins, counts = layout['bins'], layout['counts']
+    y_of_count, x_of_score = layout['y_of_count'], layout['x_of_score']
+    plot_bottom = MARGIN_TOP + layout['plot_h']
+    plot_right = MARGIN_LEFT + layout['plot_w']
+    avg, median = spec['average'], spec['median']
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+        f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="{FONT_FAMILY}">',
+        f'<rect width="{WIDTH}" height="{HEIGHT}" fill="#ffffff"/>',
+        f'<text x="{WIDTH / 2:.1f}" y="{MARGIN_TOP - 24}" font-size="20" font-weight="bold" '
+        f'text-anchor="middle">{escape(spec["title"])}</text>',
+    ]
+
+    # 格線與 y 軸刻度
+    for tick in range(0, layout['y_max'] + 1, layout['y_step']):
+        y = y_of_count(tick)
+        parts.append(
+            f'<line x1="{MARGIN_LEFT}" y1="{y:.1f}" x2="{plot_right}" y2="{y:.1f}" '
+            f'stroke="#000000" stroke-opacity="0.3" stroke-dasharray="4,3"/>'
+        )
+        parts.append(
+            f'<text x="{MARGIN_LEFT - 8}" y="{y + 4:.1f}" font-size="12" text-anchor="end">{tick}</text>'
+        )
+
+    # 長條、數值與級距標籤
+    for i, (bin_key, count) in enumerate(zip(bins, counts)):
+        center = MARGIN_LEFT + (i + 0.5) * layout['slot']
+        top = y_of_count(count)
+        parts.append(
+            f'<rect x="{center - layout["bar_w"] / 2:.1f}" y="{top:.1f}" width="{layout["bar_w"]:.1f}" '
+            f'height="{plot_bottom - top:.1f}" fill="{BAR_COLOR}" fill-opacity="0.7" stroke="#000000"/>'
+        )
+        if count > 0:
+            parts.append(
+                f'<text x="{center:.1f}" y="{top - 6:.1f}" font-size="14" text-anchor="middle">{count}</text>'
+            )
+        parts.append(
+            f'<text x="{center:.1f}" y="{plot_bottom + 18}" font-size="13" text-anchor="end" '
+            f'transform="rotate(-45 {center:.1f} {plot_bottom + 18})">{escape(bin_key)}</text>'
+        )
+
+    # 座標軸與軸標籤
+    parts += [
+        f'<rect x="{MARGIN_LEFT}" y="{MARGIN_TOP}" width="{layout["plot_w"]}" height="{layout["plot_h"]}" '
+        f'fill="none" stroke="#000000"/>',
+        f'<text x="{MARGIN_LEFT + layout["plot_w"] / 2:.1f}" y="{HEIGHT - 16}" font-size="16" '
+        f'text-anchor="middle">Score Range (分數區間)</text>',
+        f'<text x="24" y="{MARGIN_TOP + layout["plot_h"] / 2:.1f}" font-size="16" text-anchor="middle" '
+        f'transform="rotate(-90 24 {MARGIN_TOP + layout["plot_h"] / 2:.1f})">Student Count (學生人數)</text>',
+    ]
+
+    # 平均與中位數垂直線
+    for value, color, dash in ((avg, AVERAGE_COLOR, ' stroke-dasharray="10,6"'), (median, MEDIAN_COLOR, '')):
+        x = x_of_score(value)
+        parts.append(
+            f'<line x1="{x:.1f}" y1="{MARGIN_TOP}" x2="{x:.1f}" y2="{plot_bottom}" stroke="{color}" '
+            f'stroke-width="2" stroke-opacity="0.85"{dash}/>'
+        )
+
+    # 統計資訊與圖例
+    stats_text = f"Total: {spec['total']} | Avg: {avg:.2f} | Median: {median:.2f}"
+    parts += [
+        f'<rect x="{MARGIN_LEFT + 8}" y="{MARGIN_TOP + 8}" width="{len(stats_text) * 7.5 + 16:.1f}" height="26" '
+        f'rx="6" fill="#f5deb3" fill-opacity="0.5" stroke="#000000" stroke-opacity="0.5"/>',
+        f'<text x="{MARGIN_LEFT + 16}" y="{MARGIN_TOP + 26}" font-size="14">{escape(stats_text)}</text>',
+        f'<g font-size="14" transform="translate({plot_right - 170} {MARGIN_TOP + 10})">'
+        f'<rect width="160" height="52" fill="#ffffff" fill-opacity="0.8" stroke="#cccccc"/>'
+        f'<line x1="10" y1="17" x2="40" y2="17" stroke="{AVERAGE_COLOR}" stroke-width="2" stroke-dasharray="10,6"/>'
+        f'<text x="48" y="22">平均: {avg:.1f}</text>'
+        f'<line x1="10" y1="39" x2="40" y2="39" stroke="{MEDIAN_COLOR}" stroke-width="2"/>'
+        f'<text x="48" y="44">中位數: {median:.1f}</text>'
+        f'</g>',
+        '</svg>',
+    ]
+    return ''.join(parts).encode('utf-8'), 'image/svg+xml', 'svg'
+
+
+# ── PNG ──────────────────────────────────────────────────────────────────────
+
+# 3x5 點陣字（僅數字與少量符號 / 大寫字母）
+GLYPHS = {
+    '0': ('###', '#.#', '#.#', '#.#', '###'),
+    '1': ('.#.', '##.', '.#.', '.#.', '###'),
+    '2': ('###', '..#', '###', '#..', '###'),
+    '3': ('###', '..#', '###', '..#', '###'),
+    '4': ('#.#', '#.#', '###', '..#', '..#'),
+    '5': ('###', '#..', '###', '..#', '###'),
+    '6': ('###', '#..', '###', '#.#', '###'),
+    '7': ('###', '..#', '..#', '..#', '..#'),
+    '8': ('###', '#.#', '###', '#.#', '###'),
+    '9': ('###', '#.#', '###', '..#', '###'),
+    '.': ('...', '...', '...', '...', '.#.'),
+    '-': ('...', '...', '###', '...', '...'),
+    '=': ('...', '###', '...', '###', '...'),
+    'A': ('.#.', '#.#', '###', '#.#', '#.#'),
+    'D': ('##.', '#.#', '#.#', '#.#', '##.'),
+    'E': ('###', '#..', '###', '#..', '###'),
+    'G': ('###', '#..', '#.#', '#.#', '###'),
+    'M': ('#.#', '###', '#.#', '#.#', '#.#'),
+    'N': ('##.', '#.#', '#.#', '#.#', '#.#'),
+    'V': ('#.#', '#.#', '#.#', '#.#', '.#.'),
+    ' ': ('...', '...', '...', '...', '...'),
+}
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+
+
+def _blend(hex_color: str, alpha: float) -> Tuple[int, int, int]:
+    """顏色與白色背景混合（模擬透明度）"""
+    rgb = tuple(int(hex_color[i:i + 2], 16) for i in (1, 3, 5))
+    return tuple(round(c * alpha + 255 * (1 - alpha)) for c in rgb)
+
+
+class _Canvas:
+    """RGB 點陣畫布（每列前保留 1 byte PNG 濾波類型，編碼時不需再複製）"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.stride = width * 3 + 1
+        self.pixels = bytearray(b'\x00' + b'\xff' * (width * 3)) * height
+
+    def fill_rect(self, x0: float, y0: float, x1: float, y1: float, color: Tuple[int, int, int]) -> None:
+        x0, x1 = max(int(round(x0)), 0), min(int(round(x1)), self.width)
+        y0, y1 = max(int(round(y0)), 0), min(int(round(y1)), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        row = bytes(color) * (x1 - x0)
+        for y in range(y0, y1):
+            start = y * self.stride + 1 + x0 * 3
+            self.pixels[start:start + len(row)] = row
+
+    def vline(self, x: float, y0: float, y1: float, color, width: int = 1, dash: Tuple[int, int] = None) -> None:
+        left = int(round(x)) - width // 2
+        if dash is None:
+            self.fill_rect(left, y0, left + width, y1, color)
+            return
+        y = y0
+        while y < y1:
+            self.fill_rect(left, y, left + width, min(y + dash[0], y1), color)
+            y += dash[0] + dash[1]
+
+    def hline(self, x0: float, x1: float, y: float, color, dash: Tuple[int, int] = None) -> None:
+        if dash is None:
+            self.fill_rect(x0, y, x1, y + 1, color)
+            return
+        x = x0
+        while x < x1:
+            self.fill_rect(x, y, min(x + dash[0], x1), y + 1, color)
+            x += dash[0] + dash[1]
+
+    def text(self, x: float, y: float, text: str, color=BLACK, scale: int = 2, anchor: str = 'start') -> None:
+        """以點陣字繪製文字，(x, y) 為文字上緣"""
+        advance = 4 * scale
+        width = len(text) * advance - scale
+        if anchor == 'middle':
+            x -= width / 2
+        elif anchor == 'end':
+            x -= width
+        for index, char in enumerate(text):
+            glyph = GLYPHS.get(char.upper(), GLYPHS[' '])
+            left = x + index * advance
+            for row, bits in enumerate(glyph):
+                # 同列連續點合併為一個矩形
+                col = 0
+                while col < len(bits):
+                    if bits[col] != '#':
+                        col += 1
+                        continue
+                    end = col
+                    while end < len(bits) and bits[end] == '#':
+                        end += 1
+                    self.fill_rect(
+                        left + col * scale, y + row * scale,
+                        left + end * scale, y + (row + 1) * scale, color
+                    )
+                    col = end
+
+    def to_png(self) -> bytes:
+        """編碼為 PNG（8-bit RGB，無濾波 + zlib）"""
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff)
+
+        return b''.join([
+            b'\x89PNG\r\n\x1a\n',
+            chunk(b'IHDR', struct.pack('>IIBBBBB', self.width, self.height, 8, 2, 0, 0, 0)),
+            chunk(b'IDAT', zlib.compress(self.pixels, 1)),
+            chunk(b'IEND', b''),
+        ])
+
+
+def render_png(spec: Dict[str, Any]) -> Tuple[bytes, str, str]:
+    """
+    繪製簡易 PNG 直方圖（長條、數值、平均 / 中位數線與統計資訊；不含標題與軸標籤）
+
+    Args:
+        spec: 直方圖描述
+
+    Returns:
+        (image_bytes, content_type, file_ext)
+    """
+    layout = _layout(spec)
+    bins, counts = layout['bins'], layout['counts']
+    y_of_count, x_of_score = layout['y_of_count'], layout['x_of_score']
+    plot_bottom = MARGIN_TOP + layout['plot_h']
+    plot_right = MARGIN_LEFT + layout['plot_w']
+    avg, median = spec['average'], spec['median']
+    canvas = _Canvas(WIDTH, HEIGHT)
+
+    # 格線與 y 軸刻度
+    grid_color = _blend('#000000', 0.3)
+    for tick in range(0, layout['y_max'] + 1, layout['y_step']):
+        y = y_of_count(tick)
+        canvas.hline(MARGIN_LEFT, plot_right, y, grid_color, dash=(4, 3))
+        canvas.text(MARGIN_LEFT - 8, y - 5, str(tick), anchor='end')
+
+    # 長條與數值；級距標籤過密時間隔顯示
+    label_width = max((len(bin_key) for bin_key in bins), default=1) * 8
+    label_every = max(math.ceil((label_width + 8) / layout['slot']), 1)
+    bar_color = _blend(BAR_COLOR, 0.7)
+    for i, (bin_key, count) in enumerate(zip(bins, counts)):
+        center = MARGIN_LEFT + (i + 0.5) * layout['slot']
+        left, right = center - layout['bar_w'] / 2, center + layout['bar_w'] / 2
+        top = y_of_count(count)
+        if count > 0:
+            canvas.fill_rect(left, top, right, plot_bottom, BLACK)
+            canvas.fill_rect(left + 1, top + 1, right - 1, plot_bottom, bar_color)
+            canvas.text(center, top - 16, str(count), anchor='middle')
+        if i % label_every == 0:
+            canvas.text(center, plot_bottom + 10, bin_key, anchor='middle')
+
+    # 座標軸外框
+    canvas.hline(MARGIN_LEFT, plot_right, MARGIN_TOP, BLACK)
+    canvas.hline(MARGIN_LEFT, plot_right, plot_bottom, BLACK)
+    canvas.vline(MARGIN_LEFT, MARGIN_TOP, plot_bottom, BLACK)
+    canvas.vline(plot_right, MARGIN_TOP, plot_bottom, BLACK)
+
+    # 平均與中位數垂直線
+    canvas.vline(x_of_score(avg), MARGIN_TOP, plot_bottom, _blend(AVERAGE_COLOR, 0.85), width=2, dash=(10, 6))
+    canvas.vline(x_of_score(median), MARGIN_TOP, plot_bottom, _blend(MEDIAN_COLOR, 0.85), width=2)
+
+    # 統計資訊
+    stats_text = f"N={spec['total']}  AVG={avg:.2f}  MED={median:.2f}"
+    box_width = len(stats_text) * 8 + 16
+    canvas.fill_rect(MARGIN_LEFT + 8, MARGIN_TOP + 8, MARGIN_LEFT + 8 + box_width, MARGIN_TOP + 34,
+                     _blend('#f5deb3', 0.5))
+    canvas.text(MARGIN_LEFT + 16, MARGIN_TOP + 16, stats_text)
+    return canvas.to_png(), 'image/png', 'png'
@@ -0,0 +1,8 @@
+"""
+Summary Services Package
+"""
+from .semester_summary_service import SemesterSummaryService
+
+__all__ = [
+    'SemesterSummaryService',
+]
@@ -0,0 +1,528 @@
+"""
+Semester Summary Service - 學期成績彙總表增量維護
+成績 / 學生異動時由 signals 於同一交易內呼叫，只鎖定並調整受影響的 (學期, 欄位) 列；
+批次寫入可包在 batch() 內，離開時每個彙總列只更新一次；
+學期尚無彙總列時由寫入端在學期 advisory lock 下建立，讀取端只即時計算不寫入；
+中位數 / 百分位數由可合併的 QuantileSketch 提供
+"""
+import math
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from main.apps.Calculus_metadata.models import Score, SemesterScoreSummary
+from main.apps.Calculus_metadata.services.optional.calculation import (
+    CalculationService,
+    QuantileSketch,
+    ScoreMatrixService,
+    SemesterScoreMatrix,
+)
+
+# (學期, {分數欄位: 分數})；不列入統計時為 None
+SummaryState = Optional[Tuple[str, Dict[str, float]]]
+
+
+class SemesterSummaryService:
+    """學期成績彙總服務 - 計算成績異動的增量並更新彙總列"""
+
+    SCORE_FIELDS = SemesterScoreMatrix.SCORE_FIELDS
+    EXCLUDED_STATUSES = SemesterScoreMatrix.EXCLUDED_STATUSES
+    BIN_WIDTH = 10
+    NUM_BINS = 10
+    # 學期 advisory lock 的第一個 key（第二個為 hashtext(學期)）
+    LOCK_NAMESPACE = 'semester_score_summary'
+
+    # batch() 期間累積的增量（每個執行緒一份）
+    _local = threading.local()
+
+    @staticmethod
+    def passing_threshold() -> float:
+        """及格分數（SCORE_PASSING_THRESHOLD；變更後需執行 rebuild_semester_summary 重算及格人數）"""
+        return getattr(settings, 'SCORE_PASSING_THRESHOLD', 60.0)
+
+    # ── 成績狀態 ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def score_state(raw_scores: Dict[str, str], score_semester: str,
+                    student_semester: Optional[str], student_status: Optional[str]) -> SummaryState:
+        """
+        計算一筆成績對彙總的貢獻（規則與 ScoreMatrixService.build 相同）
+
+        Args:
+            raw_scores: {分數欄位: 分數字串}
+            score_semester: 成績學期
+            student_semester: 學生學期（無關聯學生時為 None）
+            student_status: 學生狀態
+
+        Returns:
+            (學期, {分數欄位: 分數})，不列入統計時為 None
+        """
+        if student_semester != score_semester or student_status in SemesterSummaryService.EXCLUDED_STATUSES:
+            return None
+        values = {}
+        for field in SemesterSummaryService.SCORE_FIELDS:
+            value = ScoreMatrixService.parse_score(raw_scores.get(field))
+            if not math.isnan(value):
+                values[field] = value
+        return score_semester, values
+
+    @staticmethod
+    def state_of(score: Score, student_semester: Optional[str] = None,
+                 student_status: Optional[str] = None, use_student: bool = True) -> SummaryState:
+        """
+        由 Score 實例計算彙總貢獻
+
+        Args:
+            score: Score 實例
+            student_semester / student_status: 指定學生狀態（use_student=False 時使用）
+            use_student: 是否讀取 score.student 的目前狀態
+
+        Returns:
+            SummaryState
+        """
+        if use_student:
+            student = score.student if score.student_id else None
+            student_semester = student.student_semester if student else None
+            student_status = student.student_status if student else None
+        raw_scores = {field: getattr(score, field) for field in SemesterSummaryService.SCORE_FIELDS}
+        return SemesterSummaryService.score_state(raw_scores, score.score_semester, student_semester, student_status)
+
+    @staticmethod
+    def snapshot(score_id: int) -> SummaryState:
+        """
+        讀取資料庫中目前的成績狀態（更新前於 pre_save 呼叫）
+
+        Args:
+            score_id: Score id
+
+        Returns:
+            SummaryState（資料不存在時為 None）
+        """
+        fields = SemesterSummaryService.SCORE_FIELDS
+        row = Score.objects.filter(pk=score_id).values_list(
+            'score_semester', 'student__student_semester', 'student__student_status', *fields
+        ).first()
+        if row is None:
+            return None
+        score_semester, student_semester, student_status, *values = row
+        return SemesterSummaryService.score_state(
+            dict(zip(fields, values)), score_semester, student_semester, student_status
+        )
+
+    @staticmethod
+    def before_state(score: Score) -> SummaryState:
+        """
+        更新前的成績狀態：使用載入時保留的欄位值（Score.from_db），無法使用時才查詢資料庫
+
+        Args:
+            score: 即將儲存的 Score 實例（已存在於資料庫）
+
+        Returns:
+            SummaryState
+        """
+        loaded = getattr(score, '_loaded_values', None)
+        fields = ['id', 'student_id', 'score_semester', *SemesterSummaryService.SCORE_FIELDS]
+        if (loaded is None or any(field not in loaded for field in fields)
+                or loaded['id'] != score.pk or loaded['student_id'] != score.student_id):
+            return SemesterSummaryService.snapshot(score.pk)
+        student = score.student if score.student_id else None
+        return SemesterSummaryService.score_state(
+            loaded,
+            loaded['score_semester'],
+            student.student_semester if student else None,
+            student.student_status if student else None,
+        )
+
+    # ── 增量更新 ─────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def bin_index(value: float) -> Optional[int]:
+        """分數所屬級距（與 CalculationService.bin_counts 相同：超過上限歸入最後一格，負分不計）"""
+        index = min(int(value // SemesterSummaryService.BIN_WIDTH), SemesterSummaryService.NUM_BINS - 1)
+        return index if index >= 0 else None
+
+    @staticmethod
+    def new_sketch() -> QuantileSketch:
+        """依設定建立空的分位數摘要"""
+        return QuantileSketch(
+            getattr(settings, 'QUANTILE_SKETCH_RELATIVE_ACCURACY', 0.01),
+            getattr(settings, 'QUANTILE_SKETCH_EXACT_LIMIT', 1000),
+        )
+
+    @staticmethod
+    def load_sketch(row: SemesterScoreSummary) -> QuantileSketch:
+        """
+        讀取彙總列的分位數摘要；以舊的誤差 / 筆數上限設定建立者，轉為目前設定
+        （精確模式逐一重新加入分數，否則以級距代表值重新分配），因此各列的摘要一定可以合併
+
+        Args:
+            row: 彙總列
+
+        Returns:
+            QuantileSketch
+        """
+        sketch = SemesterSummaryService.new_sketch()
+        if not row.summary_sketch:
+            return sketch
+        stored = QuantileSketch.from_dict(row.summary_sketch)
+        if (stored.relative_accuracy, stored.exact_limit) == (sketch.relative_accuracy, sketch.exact_limit):
+            return stored
+        sketch.merge(stored)
+        return sketch
+
+    @staticmethod
+    def empty_row(semester: str, field: str) -> SemesterScoreSummary:
+        """建立空的彙總列（未儲存）"""
+        return SemesterScoreSummary(
+            summary_semester=semester,
+            summary_field=field,
+            summary_bins=[0] * SemesterSummaryService.NUM_BINS,
+            summary_sketch=SemesterSummaryService.new_sketch().to_dict(),
+        )
+
+    @staticmethod
+    def add_value(row: SemesterScoreSummary, sketch: QuantileSketch, value: float, sign: int = 1) -> None:
+        """
+        將單一分數加入（sign=1）或移出（sign=-1）彙總列
+
+        Args:
+            row: 彙總列
+            sketch: 彙總列的分位數摘要（呼叫端負責寫回 row.summary_sketch）
+            value: 分數
+            sign: 1 或 -1
+        """
+        if sign > 0:
+            sketch.add(value)
+        else:
+            sketch.remove(value)
+        row.summary_count += sign
+        row.summary_sum += sign * value
+        row.summary_sum_squares += sign * value * value
+        index = SemesterSummaryService.bin_index(value)
+        if index is not None:
+            row.summary_bins[index] += sign
+        if value >= SemesterSummaryService.passing_threshold():
+            row.summary_pass_count += sign
+        else:
+            row.summary_fail_count += sign
+
+    @staticmethod
+    @contextmanager
+    def batch():
+        """
+        批次寫入：期間的彙總增量先累積，離開時一次鎖定並更新各彙總列（需在同一交易內使用；
+        發生例外時捨棄，交易回滾）
+        """
+        if getattr(SemesterSummaryService._local, 'pending', None) is not None:
+            yield
+            return
+        pending = SemesterSummaryService._local.pending = defaultdict(lambda: defaultdict(list))
+        try:
+            yield
+        finally:
+            SemesterSummaryService._local.pending = None
+        SemesterSummaryService.flush(pending)
+
+    @staticmethod
+    def apply_change(before: SummaryState, after: SummaryState) -> None:
+        """
+        依成績異動前後的狀態更新彙總列（需於交易內呼叫；batch() 期間只累積增量）
+
+        Args:
+            before: 異動前狀態（新增時為 None）
+            after: 異動後狀態（刪除時為 None）
+        """
+        pending = getattr(SemesterSummaryService._local, 'pending', None)
+        # {學期: {欄位: [(sign, 分數)]}}
+        changes = defaultdict(lambda: defaultdict(list)) if pending is None else pending
+        for sign, state in ((-1, before), (1, after)):
+            if state is None:
+                continue
+            semester, values = state
+            for field, value in values.items():
+                changes[semester][field].append((sign, value))
+        if pending is None:
+            SemesterSummaryService.flush(changes)
+
+    @staticmethod
+    def flush(changes: Dict[str, Dict[str, List[Tuple[int, float]]]]) -> None:
+        """
+        寫入累積的增量：依 (學期, 欄位) 順序以 SELECT ... FOR UPDATE 鎖定受影響的彙總列後更新
+
+        Args:
+            changes: {學期: {欄位: [(sign, 分數)]}}
+        """
+        for semester in sorted(changes):
+            fields = {}
+            for field, deltas in changes[semester].items():
+                # 同一分數的移出與加入互相抵銷
+                net = Counter()
+                for sign, value in deltas:
+                    net[value] += sign
+                net_deltas = [
+                    (1 if count > 0 else -1, value) for value, count in net.items() for _ in range(abs(count))
+                ]
+                if net_deltas:
+                    fields[field] = net_deltas
+            if not fields:
+                continue
+
+            rows = SemesterSummaryService._lock_rows(semester, fields)
+            if not rows:
+                if SemesterSummaryService.materialize(semester):
+                    # 以資料庫目前狀態（已含本交易的異動）建立，不需再套用增量
+                    continue
+                rows = SemesterSummaryService._lock_rows(semester, fields)
+            for field, deltas in fields.items():
+                row = rows.get(field) or SemesterSummaryService.empty_row(semester, field)
+                sketch = SemesterSummaryService.load_sketch(row)
+                for sign, value in deltas:
+                    SemesterSummaryService.add_value(row, sketch, value, sign)
+                row.summary_sketch = sketch.to_dict()
+                row.save()
+
+    @staticmethod
+    def _lock_rows(semester: str, fields: Iterable[str]) -> Dict[str, SemesterScoreSummary]:
+        """依欄位順序鎖定學期的指定彙總列（固定順序避免交易間死結）"""
+        return {
+            row.summary_field: row
+            for row in SemesterScoreSummary.objects.select_for_update()
+            .filter(summary_semester=semester, summary_field__in=sorted(fields))
+            .order_by('summary_field')
+        }
+
+    @staticmethod
+    def _lock_semester(semester: str) -> None:
+        """取得學期的交易層級 advisory lock（建立 / 重建彙總列時互斥）"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtext(%s), hashtext(%s))",
+                [SemesterSummaryService.LOCK_NAMESPACE, semester],
+            )
+
+    @staticmethod
+    def materialize(semester: str) -> bool:
+        """
+        學期尚無彙總列時自資料庫建立（寫入端呼叫；advisory lock 下再次確認，
+        並以 INSERT ... ON CONFLICT DO NOTHING 寫入，同時首次寫入的交易不會因唯一約束失敗）
+
+        Args:
+            semester: 學期
+
+        Returns:
+            是否由本交易建立（False 表示其他交易已建立，呼叫端需套用增量）
+        """
+        SemesterSummaryService._lock_semester(semester)
+        if SemesterScoreSummary.objects.filter(summary_semester=semester).exists():
+            return False
+        summaries = SemesterSummaryService.compute(semester, ScoreMatrixService.build(semester, 0))
+        SemesterScoreSummary.objects.bulk_create(summaries, ignore_conflicts=True)
+        return True
+
+    # ── 重建 / 讀取 ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def aggregate(semester: str, field: str, scores: List[float]) -> SemesterScoreSummary:
+        """
+        由完整分數列表計算彙總列（未儲存）
+
+        Args:
+            semester: 學期
+            field: 分數欄位
+            scores: 有效分數列表
+
+        Returns:
+            SemesterScoreSummary
+        """
+        passing = CalculationService.passing_mask(scores, SemesterSummaryService.passing_threshold())
+        pass_count = sum(passing)
+        return SemesterScoreSummary(
+            summary_semester=semester,
+            summary_field=field,
+            summary_count=len(scores),
+            summary_sum=math.fsum(scores),
+            summary_sum_squares=math.fsum(score * score for score in scores),
+            summary_bins=CalculationService.bin_counts(
+                scores, SemesterSummaryService.BIN_WIDTH, SemesterSummaryService.NUM_BINS
+            ),
+            summary_pass_count=pass_count,
+            summary_fail_count=len(scores) - pass_count,
+            summary_sketch=QuantileSketch.from_scores(
+                scores,
+                getattr(settings, 'QUANTILE_SKETCH_RELATIVE_ACCURACY', 0.01),
+                getattr(settings, 'QUANTILE_SKETCH_EXACT_LIMIT', 1000),
+            ).to_dict(),
+        )
+
+    @staticmethod
+    def compute(semester: str, matrix: SemesterScoreMatrix) -> List[SemesterScoreSummary]:
+        """
+        由學期成績矩陣計算各欄位的彙總列（未儲存；無成績的學期回傳空列表）
+
+        Args:
+            semester: 學期
+            matrix: 學期成績矩陣
+
+        Returns:
+            彙總列列表
+        """
+        if not len(matrix):
+            return []
+        rows = matrix.active_rows()
+        return [
+            SemesterSummaryService.aggregate(semester, field, matrix.values(field, rows))
+            for field in SemesterSummaryService.SCORE_FIELDS
+        ]
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(semester: str) -> List[SemesterScoreSummary]:
+        """
+        自 Score / Students 重建單一學期的彙總列（恢復用；等待進行中的增量更新提交後再讀取成績）
+
+        Args:
+            semester: 學期
+
+        Returns:
+            重建後的彙總列
+        """
+        SemesterSummaryService._lock_semester(semester)
+        list(SemesterScoreSummary.objects.select_for_update().filter(summary_semester=semester))
+        summaries = SemesterSummaryService.compute(semester, ScoreMatrixService.build(semester, 0))
+        SemesterScoreSummary.objects.filter(summary_semester=semester).delete()
+        # 無成績的學期不寫入，首次寫入成績時再建立
+        return SemesterScoreSummary.objects.bulk_create(summaries)
+
+    @staticmethod
+    def rebuild_all(semesters: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        重建多個學期的彙總列
+
+        Args:
+            semesters: 學期列表（預設為所有有成績的學期）
+
+        Returns:
+            {學期: 有效總分筆數}
+        """
+        if semesters is None:
+            semesters = Score.objects.exclude(score_semester='').order_by('score_semester').values_list(
+                'score_semester', flat=True
+            ).distinct()
+        result = {}
+        for semester in semesters:
+            summaries = SemesterSummaryService.rebuild(semester)
+            result[semester] = sum(row.summary_count for row in summaries)
+        return result
+
+    @staticmethod
+    def get_summary(semester: str, field: str) -> SemesterScoreSummary:
+        """
+        讀取單一彙總列（單列查詢；學期尚未建立彙總時由學期成績矩陣即時計算，不寫入）
+
+        Args:
+            semester: 學期
+            field: 分數欄位
+
+        Returns:
+            SemesterScoreSummary
+        """
+        row = SemesterScoreSummary.objects.filter(summary_semester=semester, summary_field=field).first()
+        if row is not None:
+            return row
+        if not SemesterScoreSummary.objects.filter(summary_semester=semester).exists():
+            for computed in SemesterSummaryService.compute(semester, ScoreMatrixService.get_matrix(semester)):
+                if computed.summary_field == field:
+                    return computed
+        return SemesterSummaryService.empty_row(semester, field)
+
+    @staticmethod
+    def get_summaries(semesters: Iterable[str], fields: Iterable[str]) -> Dict[Tuple[str, str], SemesterScoreSummary]:
+        """
+        以單一查詢讀取多個學期 × 欄位的彙總列（尚未建立彙總的學期由成績矩陣即時計算，不寫入）
+
+        Args:
+            semesters: 學期列表
+            fields: 分數欄位列表
+
+        Returns:
+            {(學期, 欄位): SemesterScoreSummary}
+        """
+        semesters, fields = list(dict.fromkeys(semesters)), list(fields)
+        rows = {
+            (row.summary_semester, row.summary_field): row
+            for row in SemesterScoreSummary.objects.filter(summary_semester__in=semesters)
+        }
+        materialised = {key[0] for key in rows}
+        missing = [semester for semester in semesters if semester not in materialised]
+        if missing:
+            for semester, matrix in ScoreMatrixService.get_matrices(missing).items():
+                for row in SemesterSummaryService.compute(semester, matrix):
+                    rows[(semester, row.summary_field)] = row
+        return {
+            (semester, field): rows.get((semester, field)) or SemesterSummaryService.empty_row(semester, field)
+            for semester in semesters
+            for field in fields
+        }
+
+    @staticmethod
+    def merge(rows: Iterable[SemesterScoreSummary], semester: str, field: str) -> SemesterScoreSummary:
+        """
+        合併多個彙總列（例如跨學期），分位數摘要直接合併不需原始分數
+
+        Args:
+            rows: 彙總列
+            semester: 合併結果的學期標示
+            field: 分數欄位
+
+        Returns:
+            合併後的 SemesterScoreSummary（未儲存）
+        """
+        merged = SemesterSummaryService.empty_row(semester, field)
+        sketch = SemesterSummaryService.new_sketch()
+        for row in rows:
+            merged.summary_count += row.summary_count
+            merged.summary_sum += row.summary_sum
+            merged.summary_sum_squares += row.summary_sum_squares
+            merged.summary_bins = [a + b for a, b in zip(merged.summary_bins, row.summary_bins)]
+            merged.summary_pass_count += row.summary_pass_count
+            merged.summary_fail_count += row.summary_fail_count
+            sketch.merge(SemesterSummaryService.load_sketch(row))
+        merged.summary_sketch = sketch.to_dict()
+        return merged
+
+    @staticmethod
+    def statistics(row: SemesterScoreSummary) -> Dict[str, Any]:
+        """
+        由彙總列計算統計值
+
+        Args:
+            row: 彙總列
+
+        Returns:
+            {'count', 'average', 'std_dev', 'min', 'q1', 'median', 'q3', 'max',
+             'exact', 'pass_count', 'fail_count', 'bins'}
+            （exact 為 False 時百分位數為近似值，相對誤差 <= QUANTILE_SKETCH_RELATIVE_ACCURACY）
+        """
+        count = row.summary_count
+        average = row.summary_sum / count if count else 0.0
+        variance = max(row.summary_sum_squares / count - average * average, 0.0) if count else 0.0
+        sketch = SemesterSummaryService.load_sketch(row)
+        minimum, q1, median, q3, maximum = sketch.quantiles([0, 25, 50, 75, 100])
+        return {
+            'count': count,
+            'average': average,
+            'std_dev': math.sqrt(variance),
+            'min': minimum,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'max': maximum,
+            'exact': sketch.is_exact,
+            'pass_count': row.summary_pass_count,
+            'fail_count': row.summary_fail_count,
+            'bins': list(row.summary_bins),
+        }
@@ -0,0 +1,8 @@
+"""
+Warmup Services Package
+"""
+from .warmup_service import WarmupService
+
+__all__ = [
+    'WarmupService',
+]
@@ -0,0 +1,49 @@
+"""
+Warmup Service - 啟動後預先載入延遲匯入的重量級套件
+"""
+import importlib
+import logging
+import time
+from typing import Dict
+
+from main.apps.Calculus_metadata.services.optional.rendering import ChartRenderService
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """預熱服務 - 於 WSGI / ASGI application 建立後執行（WARMUP_ON_STARTUP=True）"""
+
+    # 僅少數端點使用、改為延遲匯入的套件
+    LAZY_MODULES = ['openpyxl', 'openpyxl.styles']
+
+    @staticmethod
+    def warm_up() -> Dict[str, float]:
+        """
+        載入延遲匯入的套件並啟動圖表 renderer，避免首次請求承擔載入成本
+
+        Returns:
+            各項目耗時（秒）
+        """
+        timings = {}
+        for module_name in WarmupService.LAZY_MODULES:
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module_name)
+            except ImportError:
+                logger.warning("Warm-up skipped, module not installed: %s", module_name)
+                continue
+            timings[module_name] = time.perf_counter() - start
+
+        if ChartRenderService.has_matplotlib():
+            start = time.perf_counter()
+            try:
+                ChartRenderService.warm_up()
+                timings['chart_renderer'] = time.perf_counter() - start
+            except Exception as e:
+                logger.warning("Chart renderer warm-up failed: %s", e)
+
+        logger.info(
+            "Warm-up completed: %s", ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items())
+        )
+        return timings
@@ -0,0 +1,115 @@
+"""
+Signals - SQL 資料異動時寫入 ChangeLog、推送學期事件、清除成績矩陣快取並更新學期成績彙總
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from main.apps.Calculus_metadata.models import Students, Score, Test
+from main.apps.Calculus_metadata.services.optional.calculation import ScoreMatrixService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.apps.Calculus_metadata.services.optional.events import EventService
+from main.apps.Calculus_metadata.services.optional.summary import SemesterSummaryService
+
+
+# Model → (異動實體, UUID 欄位, 學期欄位)
+CHANGE_FEED_MODELS = {
+    Students: (ChangeFeedService.ENTITY_STUDENTS, 'student_uuid', 'student_semester'),
+    Score: (ChangeFeedService.ENTITY_SCORE, 'score_uuid', 'score_semester'),
+    Test: (ChangeFeedService.ENTITY_TEST, 'test_uuid', 'test_semester'),
+}
+
+
+def _record(instance, operation: str) -> None:
+    entity, uuid_field, semester_field = CHANGE_FEED_MODELS[type(instance)]
+    change = ChangeFeedService.record(
+        entity,
+        getattr(instance, uuid_field),
+        operation,
+        getattr(instance, semester_field),
+    )
+    EventService.publish_change(change)
+    if entity in ScoreMatrixService.SOURCE_ENTITIES:
+        # 提交後才清除，避免其他請求在提交前以舊資料重建快取
+        transaction.on_commit(lambda: ScoreMatrixService.invalidate(change.change_semester))
+
+
+@receiver(post_save, sender=Students)
+@receiver(post_save, sender=Score)
+@receiver(post_save, sender=Test)
+def record_save(sender, instance, created, raw=False, **kwargs):
+    """新增 / 更新後寫入異動紀錄（fixture 載入時略過）"""
+    if raw:
+        return
+    operation = ChangeFeedService.OPERATION_CREATE if created else ChangeFeedService.OPERATION_UPDATE
+    _record(instance, operation)
+
+
+@receiver(post_delete, sender=Students)
+@receiver(post_delete, sender=Score)
+@receiver(post_delete, sender=Test)
+def record_delete(sender, instance, **kwargs):
+    """刪除後寫入異動紀錄"""
+    _record(instance, ChangeFeedService.OPERATION_DELETE)
+
+
+# ── 學期成績彙總（與觸發的寫入同一交易）────────────────────────────────────────
+
+@receiver(pre_save, sender=Score)
+def capture_score_summary(sender, instance, raw=False, **kwargs):
+    """更新前記錄資料庫中的成績狀態，供 post_save 計算增量"""
+    if raw:
+        return
+    instance._summary_before = SemesterSummaryService.before_state(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Score)
+def update_score_summary(sender, instance, raw=False, **kwargs):
+    """新增 / 更新成績後調整學期成績彙總"""
+    if raw:
+        return
+    before = getattr(instance, '_summary_before', None)
+    SemesterSummaryService.apply_change(before, SemesterSummaryService.state_of(instance))
+    # 之後再次儲存同一實例時以此為更新前狀態
+    instance._loaded_values = {field.attname: getattr(instance, field.attname) for field in sender._meta.concrete_fields}
+
+
+@receiver(pre_delete, sender=Score)
+def capture_deleted_score_summary(sender, instance, **kwargs):
+    """刪除前記錄成績狀態（刪除學生時 CASCADE 可能先刪除學生列，post_delete 已讀不到學生）"""
+    instance._summary_before = SemesterSummaryService.state_of(instance)
+
+
+@receiver(post_delete, sender=Score)
+def remove_score_summary(sender, instance, **kwargs):
+    """刪除成績後自學期成績彙總移出"""
+    SemesterSummaryService.apply_change(getattr(instance, '_summary_before', None), None)
+
+
+@receiver(pre_save, sender=Students)
+def capture_student_summary(sender, instance, raw=False, **kwargs):
+    """更新前記錄學生狀態 / 學期（二退或轉學期會改變其成績是否列入統計）"""
+    if raw:
+        return
+    instance._summary_before = Students.objects.filter(pk=instance.pk).values_list(
+        'student_semester', 'student_status'
+    ).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Students)
+def update_student_summary(sender, instance, created, raw=False, **kwargs):
+    """學生是否列入統計改變時，將其成績移出 / 加入學期成績彙總"""
+    before = getattr(instance, '_summary_before', None)
+    if raw or created or before is None:
+        return
+    old_semester, old_status = before
+    excluded = SemesterSummaryService.EXCLUDED_STATUSES
+    if old_semester == instance.student_semester and (old_status in excluded) == (instance.student_status in excluded):
+        return
+    for score in instance.scores.all():
+        SemesterSummaryService.apply_change(
+            SemesterSummaryService.state_of(score, old_semester, old_status, use_student=False),
+            SemesterSummaryService.state_of(
+                score, instance.student_semester, instance.student_status, use_student=False
+            ),
+        )
@@ -0,0 +1,24 @@
+"""
+共用 fixtures
+"""
+import json
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """測試交易不會提交，signals 的提交後快取清除不會執行；每個測試前後清空快取"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def post_json(client):
+    """以 JSON body POST 至 URL name：post_json('student_create', {...})"""
+    def post(name, data):
+        return client.post(reverse(name), data=json.dumps(data), content_type='application/json')
+    return post
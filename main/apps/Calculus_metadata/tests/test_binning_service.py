@@ -0,0 +1,69 @@
+"""
+Binning Service Tests - bins 設定驗證與各級距策略的邊界 / 人數
+"""
+import pytest
+
+from main.apps.Calculus_metadata.services.optional.calculation import BinningService
+
+SCORES = [12, 35, 48, 55, 58, 61, 64, 67, 72, 75, 78, 81, 85, 88, 93, 100]
+
+
+def _histogram(bins_config, scores=SCORES):
+    return BinningService.compute_histogram(scores, BinningService.parse_config(bins_config))
+
+
+def test_default_is_fixed_width_of_ten():
+    result = _histogram(None)
+    assert result['strategy'] == 'fixed_width'
+    assert result['bin_edges'] == [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+    assert result['labels'][0] == '0-10'
+    assert result['counts'] == [0, 1, 0, 1, 1, 2, 3, 3, 3, 2]
+
+
+def test_custom_edges():
+    result = _histogram({'type': 'custom', 'edges': [0, 60, 70, 80, 90, 100]})
+    assert result['counts'] == [5, 3, 3, 3, 2]
+    assert sum(result['counts']) == len(SCORES)
+
+
+def test_quantile_bins_split_scores_evenly():
+    result = _histogram({'type': 'quantile', 'count': 4})
+    assert len(result['bin_edges']) == 5
+    assert (result['bin_edges'][0], result['bin_edges'][-1]) == (12, 100)
+    assert result['counts'] == [4, 4, 4, 4]
+
+
+def test_quantile_edges_are_deduplicated():
+    result = _histogram({'type': 'quantile', 'count': 4}, [70] * 10 + [90])
+    assert result['bin_edges'] == [70, 90]
+    assert result['counts'] == [11]
+
+
+def test_freedman_diaconis_covers_score_range():
+    result = _histogram({'type': 'freedman_diaconis'})
+    edges = result['bin_edges']
+    assert (edges[0], edges[-1]) == (12, 100)
+    assert all(b > a for a, b in zip(edges, edges[1:]))
+    assert sum(result['counts']) == len(SCORES)
+
+    # IQR 為 0 時改用 Sturges 規則
+    assert len(_histogram({'type': 'freedman_diaconis'}, [60] * 7 + [0, 100])['counts']) == 5
+
+
+def test_empty_scores_fall_back_to_score_range():
+    assert _histogram({'type': 'quantile'}, [])['bin_edges'] == [0.0, 100.0]
+
+
+@pytest.mark.parametrize('bins_config', [
+    'fixed_width',
+    {'type': 'unknown'},
+    {'type': 'fixed_width', 'width': 0},
+    {'type': 'fixed_width', 'width': 0.5},
+    {'type': 'fixed_width', 'range': [100, 0]},
+    {'type': 'custom', 'edges': [0, 50, 50]},
+    {'type': 'custom', 'edges': ['a', 'b']},
+    {'type': 'quantile', 'count': 0},
+])
+def test_invalid_config(bins_config):
+    with pytest.raises(ValueError):
+        BinningService.parse_config(bins_config)
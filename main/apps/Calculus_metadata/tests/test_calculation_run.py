@@ -0,0 +1,63 @@
+"""
+Calculation Run Tests - 增量計算範圍（計算期間才提交的修正不被略過、過期紀錄改為全量）
+"""
+import threading
+from datetime import timedelta
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.apps.Calculus_metadata.models import CalculationRun, Score, Students
+from main.apps.Calculus_metadata.services.optional.calculation import CalculationRunService, ScoreMatrixService
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+
+
+def _score(semester='1141'):
+    student = Students.objects.create(
+        student_uuid='stu_1141_a', student_name='A', student_number='B1', student_semester=semester,
+    )
+    return Score.objects.create(
+        score_uuid='scr_1141_a', student=student, f_student_uuid='stu_1141_a', score_semester=semester,
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_correction_committed_after_run_cursor_is_dirty():
+    """修正的交易早於計算開始、晚於計算提交：下次增量計算仍需重算該成績"""
+    score = _score()
+    recorded, release = threading.Event(), threading.Event()
+
+    def slow_correction():
+        try:
+            with transaction.atomic():
+                correction = Score.objects.get(pk=score.pk)
+                correction.score_quiz1 = '90'
+                correction.save()
+                recorded.set()
+                release.wait(10)
+        finally:
+            connection.close()
+
+    writer = threading.Thread(target=slow_correction)
+    writer.start()
+    try:
+        assert recorded.wait(10)
+        run_cursor = ChangeFeedService.latest_cursor(ScoreMatrixService.SOURCE_ENTITIES, '1141')
+    finally:
+        release.set()
+        writer.join()
+
+    dirty = CalculationRunService.dirty_scores('1141', run_cursor)
+    assert [dirty_score.pk for dirty_score in dirty] == [score.pk]
+
+
+@pytest.mark.django_db
+def test_run_older_than_change_log_retention_is_expired(settings):
+    settings.CHANGE_LOG_RETENTION_DAYS = 30
+    run = CalculationRunService.record_run('1141', 'full', 'hash', {}, 60.0, 0, 0, 0)
+    assert not CalculationRunService.is_expired(run)
+
+    CalculationRun.objects.filter(pk=run.pk).update(run_created_at=timezone.now() - timedelta(days=29, hours=1))
+    run.refresh_from_db()
+    assert CalculationRunService.is_expired(run)
@@ -0,0 +1,89 @@
+"""
+Calculation Service Tests - 批次 / 陣列運算：NumPy 與純 Python 實作結果相同，並與逐筆計算一致
+"""
+import random
+
+import pytest
+
+from main.apps.Calculus_metadata.services.optional.calculation import CalculationService
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def implementation(request, monkeypatch):
+    """分別以 NumPy 與純 Python 實作執行（未安裝 NumPy 時略過 numpy）"""
+    if request.param == 'numpy':
+        if CalculationService.get_numpy() is None:
+            pytest.skip('numpy is not installed')
+    else:
+        monkeypatch.setattr(CalculationService, '_numpy', False)
+    return request.param
+
+
+def _scores(count, seed=0):
+    rng = random.Random(seed)
+    return [round(rng.uniform(-5, 105), 2) for _ in range(count)]
+
+
+def test_weighted_totals_match_single_calculation(implementation):
+    rng = random.Random(1)
+    fields = [f'score_quiz{i}' for i in range(1, 6)]
+    weights = [rng.uniform(0, 0.3) for _ in fields]
+    matrix = [[rng.uniform(0, 100) for _ in fields] for _ in range(50)]
+
+    totals = CalculationService.calculate_weighted_totals(matrix, weights)
+    assert totals == [
+        CalculationService.calculate_weighted_total(dict(zip(fields, row)), dict(zip(fields, weights)))
+        for row in matrix
+    ]
+    batch = CalculationService.calculate_weighted_totals_batch(matrix, [weights, weights[::-1]])
+    assert batch == [totals, CalculationService.calculate_weighted_totals(matrix, weights[::-1])]
+    assert CalculationService.calculate_weighted_totals([], weights) == []
+
+
+def test_bin_counts_match_histogram_data(implementation):
+    scores = _scores(500) + [100.0, 0.0, 10.0]
+    counts = CalculationService.bin_counts(scores, 10, 10)
+    assert sum(counts) == len([s for s in scores if s >= 0])
+    assert counts[0] == len([s for s in scores if 0 <= s < 10])
+    assert counts[-1] == len([s for s in scores if s >= 90])
+    assert list(CalculationService.generate_histogram_data(scores).values()) == counts
+
+
+def test_histogram_edges(implementation):
+    scores = [-1, 0, 59.9, 60, 75, 100, 101]
+    assert CalculationService.histogram(scores, [0, 60, 80, 100]) == [2, 2, 1]
+    with pytest.raises(ValueError):
+        CalculationService.histogram(scores, [0, 60, 60])
+
+
+def test_percentiles_and_passing(implementation):
+    scores = [40, 55, 60, 70, 90]
+    assert CalculationService.calculate_percentiles(scores, [0, 25, 50, 100]) == [40.0, 55.0, 60.0, 90.0]
+    assert CalculationService.calculate_percentiles(scores, [10]) == pytest.approx([46.0])
+    assert CalculationService.calculate_percentiles([], [50]) == [0.0]
+    with pytest.raises(ValueError):
+        CalculationService.calculate_percentiles(scores, [101])
+    assert CalculationService.passing_mask(scores) == [False, False, True, True, True]
+    assert CalculationService.count_below(scores, [60, 100]) == [2, 5]
+
+
+def test_numpy_and_python_results_are_identical(monkeypatch):
+    if CalculationService.get_numpy() is None:
+        pytest.skip('numpy is not installed')
+    scores = _scores(1001, seed=3)
+    percentiles = [0, 12.5, 25, 33.3, 50, 66.7, 75, 99, 100]
+    edges = [0, 37.5, 60, 72.25, 100]
+    matrix = [scores[i:i + 4] for i in range(0, 1000, 4)]
+    weights = [0.1, 0.2, 0.3, 0.4]
+
+    def run():
+        return (
+            CalculationService.calculate_percentiles(scores, percentiles),
+            CalculationService.histogram(scores, edges),
+            CalculationService.bin_counts(scores, 10, 10),
+            CalculationService.calculate_weighted_totals(matrix, weights),
+        )
+
+    with_numpy = run()
+    monkeypatch.setattr(CalculationService, '_numpy', False)
+    assert run() == with_numpy
@@ -0,0 +1,112 @@
+"""
+Change Feed Tests - 游標分頁、進行中交易不被跳過、過期紀錄清除
+（需 transaction=True：每筆寫入各自提交，才有不同的交易位置）
+"""
+import asyncio
+import threading
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.apps.Calculus_metadata.models import ChangeLog
+from main.apps.Calculus_metadata.services.optional.changefeed import ChangeFeedService
+from main.apps.Calculus_metadata.services.optional.events import EventService
+
+SCORE = ChangeFeedService.ENTITY_SCORE
+
+
+def _record(uuid, semester='1141'):
+    return ChangeFeedService.record(SCORE, uuid, ChangeFeedService.OPERATION_UPDATE, semester)
+
+
+def _uuids(changes):
+    return [change.change_entity_uuid for change in changes]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_paging_never_splits_a_transaction():
+    _record('a')
+    with transaction.atomic():
+        for uuid in ('b1', 'b2', 'b3'):
+            _record(uuid)
+    _record('c')
+
+    changes, cursor, has_more = ChangeFeedService.get_changes(SCORE, 0, 2)
+    assert _uuids(changes) == ['a', 'b1', 'b2', 'b3']
+    assert has_more
+
+    changes, cursor, has_more = ChangeFeedService.get_changes(SCORE, cursor, 2)
+    assert _uuids(changes) == ['c']
+    assert not has_more
+
+    changes, next_cursor, has_more = ChangeFeedService.get_changes(SCORE, cursor, 2)
+    assert changes == [] and next_cursor == cursor
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cursor_does_not_skip_a_transaction_that_commits_later():
+    """較早開始、較晚提交的交易：提交前游標停在其之前，提交後仍會被讀到"""
+    recorded, release = threading.Event(), threading.Event()
+
+    def slow_writer():
+        try:
+            with transaction.atomic():
+                _record('slow')
+                recorded.set()
+                release.wait(10)
+        finally:
+            connection.close()
+
+    writer = threading.Thread(target=slow_writer)
+    writer.start()
+    try:
+        assert recorded.wait(10)
+        fast = _record('fast')
+        assert fast.change_position > 0
+
+        changes, cursor, _ = ChangeFeedService.get_changes(SCORE, 0, 100)
+        assert changes == [] and cursor == 0
+        assert ChangeFeedService.latest_cursor([SCORE], '1141') == 0
+    finally:
+        release.set()
+        writer.join()
+
+    changes, cursor, _ = ChangeFeedService.get_changes(SCORE, 0, 100)
+    assert _uuids(changes) == ['slow', 'fast']
+    assert ChangeFeedService.latest_cursor([SCORE], '1141') == cursor
+
+
+@pytest.mark.django_db(transaction=True)
+def test_prune_change_log_deletes_expired_rows():
+    old, recent = _record('old'), _record('recent')
+    ChangeLog.objects.filter(pk=old.pk).update(change_created_at=timezone.now() - timedelta(days=40))
+
+    call_command('prune_change_log', '--days', '30', '--dry-run', stdout=open('/dev/null', 'w'))
+    assert ChangeLog.objects.filter(pk=old.pk).exists()
+
+    call_command('prune_change_log', '--days', '30', stdout=open('/dev/null', 'w'))
+    assert list(ChangeLog.objects.values_list('pk', flat=True)) == [recent.pk]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_event_stream_replays_from_feed_and_sends_checkpoint_id(settings):
+    """補送的異動事件不帶 SSE id，批次結束的 checkpoint 才帶可安全重連的游標"""
+    settings.EVENT_BROKER_BACKEND = 'memory'
+    settings.EVENT_STREAM_MAX_SECONDS = 0
+    change = _record('a')
+
+    async def collect():
+        try:
+            return [block async for block in EventService.stream('1141', 0)]
+        finally:
+            # 關閉 sync_to_async 執行緒的資料庫連線
+            await sync_to_async(lambda: connection.close())()
+
+    blocks = asyncio.run(collect())
+    change_blocks = [block for block in blocks if block.startswith('event: change')]
+    assert len(change_blocks) == 1 and 'id:' not in change_blocks[0]
+    assert any(block.startswith(f"id: {change.change_position}\nevent: checkpoint\n") for block in blocks)
@@ -0,0 +1,132 @@
+"""
+Event Broker Tests - 佇列溢出改送 resync、取消訂閱、異動事件僅於交易提交後發佈（回滾不發佈）
+"""
+import asyncio
+import json
+import select
+
+import psycopg2
+import pytest
+from django.db import connection, transaction
+
+from main.apps.Calculus_metadata.models import Students
+from main.apps.Calculus_metadata.services.optional.events import (
+    EventService, InProcessEventBroker, PostgresEventBroker,
+)
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_queue_overflow_is_replaced_by_resync():
+    broker = InProcessEventBroker()
+    broker.QUEUE_SIZE = 3
+
+    async def run():
+        queue = broker.subscribe('semester:1141')
+        for index in range(4):
+            broker.publish('semester:1141', {'type': 'change', 'cursor': index})
+        await asyncio.sleep(0)
+        overflowed = _drain(queue)
+
+        broker.publish('semester:1141', {'type': 'change', 'cursor': 4})
+        await asyncio.sleep(0)
+        return overflowed, _drain(queue)
+
+    overflowed, after = asyncio.run(run())
+    assert overflowed == [{'type': 'resync'}]
+    assert after == [{'type': 'change', 'cursor': 4}]
+
+
+def test_unsubscribe_stops_delivery_and_removes_empty_channel():
+    broker = InProcessEventBroker()
+
+    async def run():
+        first, second = broker.subscribe('semester:1141'), broker.subscribe('semester:1141')
+        other = broker.subscribe('semester:1132')
+        broker.unsubscribe('semester:1141', first)
+        broker.publish('semester:1141', {'type': 'change', 'cursor': 1})
+        await asyncio.sleep(0)
+        received = (_drain(first), _drain(second))
+
+        broker.unsubscribe('semester:1141', second)
+        channels = set(broker._subscribers)
+        broker.publish('semester:1141', {'type': 'change', 'cursor': 2})
+        await asyncio.sleep(0)
+        return received, channels, _drain(second), _drain(other)
+
+    (first, second), channels, late, other = asyncio.run(run())
+    assert first == [] and second == [{'type': 'change', 'cursor': 1}]
+    assert channels == {'semester:1132'}
+    assert late == [] and other == []
+
+
+class _RecordingBroker(InProcessEventBroker):
+    """記錄 publish 呼叫（確認發佈時機）"""
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, channel, event):
+        self.published.append((channel, event))
+        super().publish(channel, event)
+
+
+def _create_student(number):
+    return Students.objects.create(
+        student_uuid=f'stu_1141_{number}', student_name=number, student_number=number, student_semester='1141',
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_change_events_are_published_only_after_commit(monkeypatch):
+    broker = _RecordingBroker()
+    monkeypatch.setattr(EventService, '_broker', broker)
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            _create_student('B1')
+            assert broker.published == []
+            raise RuntimeError('rollback')
+    assert broker.published == []
+
+    with transaction.atomic():
+        student = _create_student('B2')
+        assert broker.published == []
+    [(channel, event)] = broker.published
+    assert channel == 'semester:1141'
+    assert (event['entity'], event['uuid'], event['operation']) == ('students', student.student_uuid, 'create')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_postgres_broker_notifies_only_committed_publishes():
+    listener = psycopg2.connect(**connection.get_connection_params())
+    try:
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f"LISTEN {PostgresEventBroker.NOTIFY_CHANNEL}")
+
+        def received():
+            select.select([listener], [], [], 1)
+            listener.poll()
+            payloads = [json.loads(notify.payload) for notify in listener.notifies]
+            listener.notifies.clear()
+            return payloads
+
+        broker = PostgresEventBroker()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                broker.publish('semester:1141', {'type': 'change', 'cursor': 1})
+                raise RuntimeError('rollback')
+        assert received() == []
+
+        with transaction.atomic():
+            broker.publish('semester:1141', {'type': 'change', 'cursor': 2})
+        assert received() == [{'channel': 'semester:1141', 'event': {'type': 'change', 'cursor': 2}}]
+    finally:
+        listener.close()
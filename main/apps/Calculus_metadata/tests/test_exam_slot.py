@@ -0,0 +1,53 @@
+"""
+Exam Slot Tests - 同一學期同一考試項目僅能有一筆（唯一約束），並行寫入時回傳 400
+"""
+import pytest
+from django.db import IntegrityError, transaction
+
+from main.apps.Calculus_metadata.models import Test as ExamModel
+from main.apps.Calculus_metadata.services.optional.calculation import ExamSlotService
+
+
+def _create(post_json, test_name, **extra):
+    return post_json('test_create', {
+        'test_name': test_name, 'test_semester': '1141', 'test_date': '2025-01-01', 'test_range': '1', **extra,
+    })
+
+
+@pytest.mark.django_db
+def test_slot_is_unique_per_semester_except_blank():
+    def exam(uuid, slot, semester='1141'):
+        return ExamModel(test_uuid=uuid, test_name=uuid, test_slot=slot, test_semester=semester,
+                         test_date='2025-01-01', test_range='1')
+
+    ExamModel.objects.bulk_create([exam('a', 'midterm'), exam('b', ''), exam('c', ''), exam('d', 'midterm', '1132')])
+    with pytest.raises(IntegrityError), transaction.atomic():
+        exam('e', 'midterm').save()
+
+
+@pytest.mark.django_db
+def test_create_and_update_reject_duplicate_slot(post_json):
+    assert _create(post_json, '期中考').status_code == 201
+    assert _create(post_json, '期中考補考', test_slot='midterm').status_code == 400
+
+    response = _create(post_json, '隨堂測驗')
+    assert response.status_code == 201, response.content
+    test_uuid = response.json()['data']['test_uuid']
+    assert post_json('test_update', {'test_uuid': test_uuid, 'test_slot': 'midterm'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_concurrent_duplicate_slot_returns_400(post_json, monkeypatch):
+    """另一個交易在檢查後才寫入同一項目：由唯一約束擋下，回傳 400 而非 500"""
+    assert _create(post_json, '期中考').status_code == 201
+    response = _create(post_json, '隨堂測驗')
+    test_uuid = response.json()['data']['test_uuid']
+    monkeypatch.setattr(ExamSlotService, 'slot_taken', staticmethod(lambda *args, **kwargs: False))
+
+    response = _create(post_json, '期中考補考', test_slot='midterm')
+    assert response.status_code == 400
+    assert 'test_semester_slot_uniq' in response.json()['detail']
+
+    response = post_json('test_update', {'test_uuid': test_uuid, 'test_slot': 'midterm'})
+    assert response.status_code == 400
+    assert ExamModel.objects.filter(test_semester='1141', test_slot='midterm').count() == 1
@@ -0,0 +1,103 @@
+"""
+Native Histogram Renderer Tests - 解碼 PNG（簽章、IHDR、CRC、像素）與解析 SVG
+"""
+import struct
+import zlib
+import xml.etree.ElementTree as ET
+
+from main.apps.Calculus_metadata.services.optional.rendering import native_histogram_renderer as renderer
+
+SVG_NS = '{http://www.w3.org/2000/svg}'
+SPEC = {
+    'title': '1141 <score_quiz1> & 分布',
+    'labels': ['0-20', '20-40', '40-60', '60-80', '80-100'],
+    'bin_edges': [0, 20, 40, 60, 80, 100],
+    'counts': [0, 3, 7, 12, 5],
+    'average': 62.5,
+    'median': 65.0,
+    'total': 27,
+    'output_format': 'png',
+}
+
+
+def _decode_png(data):
+    """逐一檢查 chunk 的 CRC，回傳 (width, height, 各列 RGB bytes)"""
+    assert data[:8] == b'\x89PNG\r\n\x1a\n'
+    offset, chunks = 8, []
+    while offset < len(data):
+        length, = struct.unpack('>I', data[offset:offset + 4])
+        tag = data[offset + 4:offset + 8]
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack('>I', data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(tag + body) & 0xffffffff, tag
+        chunks.append((tag, body))
+        offset += 12 + length
+    assert [tag for tag, _ in chunks] == [b'IHDR', b'IDAT', b'IEND']
+
+    width, height, bit_depth, color_type, compression, filter_method, interlace = struct.unpack(
+        '>IIBBBBB', chunks[0][1]
+    )
+    assert (bit_depth, color_type, compression, filter_method, interlace) == (8, 2, 0, 0, 0)
+    raw = zlib.decompress(chunks[1][1])
+    stride = width * 3 + 1
+    assert len(raw) == stride * height
+    rows = [raw[y * stride:(y + 1) * stride] for y in range(height)]
+    assert all(row[0] == 0 for row in rows)
+    return width, height, [row[1:] for row in rows]
+
+
+def _pixel(rows, x, y):
+    return tuple(rows[int(y)][int(x) * 3:int(x) * 3 + 3])
+
+
+def test_png_decodes_with_bars_and_lines():
+    data, content_type, ext = renderer.render_png(SPEC)
+    assert (content_type, ext) == ('image/png', 'png')
+    width, height, rows = _decode_png(data)
+    assert (width, height) == (renderer.WIDTH, renderer.HEIGHT)
+
+    layout = renderer._layout(SPEC)
+    plot_bottom = renderer.MARGIN_TOP + layout['plot_h']
+    assert _pixel(rows, 2, 2) == renderer.WHITE
+
+    # 長條內部為半透明長條色；人數為 0 的級距不畫長條
+    bar_x = renderer.MARGIN_LEFT + 3.5 * layout['slot']
+    bar_y = (layout['y_of_count'](12) + plot_bottom) / 2
+    assert _pixel(rows, bar_x, bar_y) == renderer._blend(renderer.BAR_COLOR, 0.7)
+    empty_x = renderer.MARGIN_LEFT + 0.5 * layout['slot']
+    assert _pixel(rows, empty_x, plot_bottom - 5) == renderer.WHITE
+
+    # 中位數為實線
+    median_x = round(layout['x_of_score'](SPEC['median']))
+    assert _pixel(rows, median_x, renderer.MARGIN_TOP + 5) == renderer._blend(renderer.MEDIAN_COLOR, 0.85)
+
+
+def test_glyph_rasteriser_draws_the_bitmap():
+    canvas = renderer._Canvas(8, 6)
+    canvas.text(1, 0, '1', scale=1)
+    _, _, rows = _decode_png(canvas.to_png())
+    drawn = [
+        ''.join('#' if _pixel(rows, x, y) == renderer.BLACK else '.' for x in range(1, 4))
+        for y in range(5)
+    ]
+    assert tuple(drawn) == renderer.GLYPHS['1']
+    assert all(_pixel(rows, x, 5) == renderer.WHITE for x in range(8))
+
+
+def test_svg_parses_with_one_bar_per_bin():
+    data, content_type, ext = renderer.render_svg({**SPEC, 'output_format': 'svg'})
+    assert (content_type, ext) == ('image/svg+xml', 'svg')
+    root = ET.fromstring(data)
+    assert root.tag == f'{SVG_NS}svg'
+    assert (root.get('width'), root.get('height')) == (str(renderer.WIDTH), str(renderer.HEIGHT))
+
+    bars = [rect for rect in root.iter(f'{SVG_NS}rect') if rect.get('fill') == renderer.BAR_COLOR]
+    assert len(bars) == len(SPEC['labels'])
+    heights = [float(bar.get('height')) for bar in bars]
+    assert heights[0] == 0 and heights.index(max(heights)) == 3
+
+    texts = [text.text for text in root.iter(f'{SVG_NS}text')]
+    assert SPEC['title'] in texts
+    assert all(label in texts for label in SPEC['labels'])
+    assert [count for count in ('3', '7', '12', '5') if count in texts] == ['3', '7', '12', '5']
+    assert 'Total: 27 | Avg: 62.50 | Median: 65.00' in texts
@@ -0,0 +1,130 @@
+"""
+Quantile Sketch Tests - 新增 / 移出 / 合併、精確與近似模式的百分位數誤差、舊設定摘要的轉換
+"""
+import random
+
+import pytest
+
+from main.apps.Calculus_metadata.models import Score, Students
+from main.apps.Calculus_metadata.services.optional.calculation import CalculationService, QuantileSketch
+from main.apps.Calculus_metadata.services.optional.summary import SemesterSummaryService
+
+PERCENTILES = [0, 10, 25, 50, 75, 90, 100]
+
+
+def _scores(count, seed=0):
+    rng = random.Random(seed)
+    return [round(rng.uniform(0, 100), 1) for _ in range(count)]
+
+
+def _nearest_rank(scores, percentiles):
+    """近似模式回傳第 round(p/100 × (n-1)) 名的分數"""
+    ordered = sorted(scores)
+    return [ordered[round(p / 100 * (len(ordered) - 1))] for p in percentiles]
+
+
+def _assert_within(actual, expected, accuracy):
+    for a, e in zip(actual, expected):
+        assert abs(a - e) <= accuracy * abs(e) + 1e-9, (actual, expected)
+
+
+def test_exact_mode_matches_calculate_percentiles():
+    scores = _scores(200) + [0.0, 0.0]
+    sketch = QuantileSketch.from_scores(scores, exact_limit=1000)
+    assert sketch.is_exact
+    assert sketch.quantiles(PERCENTILES) == CalculationService.calculate_percentiles(scores, PERCENTILES)
+
+
+def test_approximate_mode_stays_within_relative_accuracy():
+    scores = _scores(5000)
+    sketch = QuantileSketch.from_scores(scores, relative_accuracy=0.01, exact_limit=100)
+    assert not sketch.is_exact
+    _assert_within(sketch.quantiles(PERCENTILES), _nearest_rank(scores, PERCENTILES), 0.01)
+
+
+def test_remove_undoes_add():
+    scores = _scores(3000)
+    sketch = QuantileSketch.from_scores(scores, exact_limit=100)
+    for value in scores[1000:]:
+        sketch.remove(value)
+    expected = QuantileSketch.from_scores(scores[:1000], exact_limit=100)
+    assert (sketch.count, sketch.positive, sketch.zero_count) == (1000, expected.positive, expected.zero_count)
+
+
+def test_exact_mode_is_not_regained_by_removal():
+    sketch = QuantileSketch.from_scores(_scores(20), exact_limit=10)
+    for value in _scores(20)[:15]:
+        sketch.remove(value)
+    assert sketch.count == 5 and not sketch.is_exact
+
+
+def test_merge_equals_sketch_of_combined_scores():
+    first, second = _scores(800, seed=1), _scores(700, seed=2)
+    merged = QuantileSketch.from_scores(first, exact_limit=1000)
+    merged.merge(QuantileSketch.from_scores(second, exact_limit=1000))
+    combined = QuantileSketch.from_scores(first + second, exact_limit=1000)
+    assert not merged.is_exact
+    assert merged.to_dict() == combined.to_dict()
+
+
+def test_merge_with_different_relative_accuracy():
+    scores = _scores(3000)
+    exact = QuantileSketch.from_scores(scores[:50], relative_accuracy=0.05)
+    coarse = QuantileSketch.from_scores(scores[50:], relative_accuracy=0.05, exact_limit=100)
+    merged = QuantileSketch(relative_accuracy=0.01, exact_limit=100)
+    merged.merge(exact)
+    merged.merge(coarse)
+    assert merged.count == len(scores)
+    _assert_within(merged.quantiles(PERCENTILES), _nearest_rank(scores, PERCENTILES), 0.01 + 0.05 + 1e-3)
+
+
+def test_dict_round_trip():
+    sketch = QuantileSketch.from_scores(_scores(50) + [-5.0, 0.0], exact_limit=10)
+    assert QuantileSketch.from_dict(sketch.to_dict()).to_dict() == sketch.to_dict()
+
+
+def _row(semester, scores, relative_accuracy):
+    row = SemesterSummaryService.empty_row(semester, 'score_quiz1')
+    row.summary_count = len(scores)
+    row.summary_sketch = QuantileSketch.from_scores(scores, relative_accuracy, exact_limit=10).to_dict()
+    return row
+
+
+def test_summary_merge_accepts_sketches_built_with_old_settings(settings):
+    settings.QUANTILE_SKETCH_RELATIVE_ACCURACY = 0.05
+    settings.QUANTILE_SKETCH_EXACT_LIMIT = 10
+    old = _row('1132', _scores(100, seed=1), 0.05)
+
+    settings.QUANTILE_SKETCH_RELATIVE_ACCURACY = 0.01
+    new = _row('1141', _scores(100, seed=2), 0.01)
+    assert SemesterSummaryService.load_sketch(old).relative_accuracy == 0.01
+
+    merged = SemesterSummaryService.merge([old, new], 'all', 'score_quiz1')
+    statistics = SemesterSummaryService.statistics(merged)
+    scores = _scores(100, seed=1) + _scores(100, seed=2)
+    assert merged.summary_sketch['relative_accuracy'] == 0.01
+    _assert_within([statistics['median']], _nearest_rank(scores, [50]), 0.06 + 1e-3)
+
+
+@pytest.mark.django_db
+def test_rebuild_restores_exact_mode(settings):
+    """增量移出後仍為近似值，rebuild 以原始分數重建後恢復精確模式"""
+    settings.QUANTILE_SKETCH_EXACT_LIMIT = 10
+    scores = []
+    for index in range(20):
+        student = Students.objects.create(
+            student_uuid=f'stu_{index}', student_name='S', student_number=f'1141{index}', student_semester='1141',
+        )
+        scores.append(Score.objects.create(
+            score_uuid=f'scr_{index}', student=student, f_student_uuid=student.student_uuid,
+            score_semester='1141', score_quiz1=str(50 + index),
+        ))
+    for score in scores[:15]:
+        score.delete()
+
+    def statistics():
+        return SemesterSummaryService.statistics(SemesterSummaryService.get_summary('1141', 'score_quiz1'))
+
+    assert (statistics()['count'], statistics()['exact']) == (5, False)
+    SemesterSummaryService.rebuild('1141')
+    assert (statistics()['exact'], statistics()['median']) == (True, 67.0)
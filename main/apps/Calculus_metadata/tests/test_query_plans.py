@@ -0,0 +1,97 @@
+"""
+Query Plan Tests - 以 Actor 實際執行的 SQL 做 EXPLAIN，確認熱門查詢使用預期的索引
+"""
+import json
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from main.apps.Calculus_metadata.models import Test as ExamModel
+
+
+@pytest.fixture
+def seeded_tests(db):
+    """同學期多筆考卷（名稱各異、多數未指定項目），ANALYZE 後 planner 才能區分兩個學期索引"""
+    ExamModel.objects.bulk_create([
+        ExamModel(test_uuid=f'test_1141_{i}', test_name=f'小考{i}', test_semester='1141',
+                  test_date='2025-01-01', test_range='1')
+        for i in range(300)
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE test")
+
+
+def _collect_nodes(plan):
+    nodes = [plan]
+    for child in plan.get('Plans', []):
+        nodes.extend(_collect_nodes(child))
+    return nodes
+
+
+def _index_names(sql):
+    """EXPLAIN 查詢（停用 seq scan，資料量小時仍可看出可用的索引），回傳使用的索引名稱"""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return {node['Index Name'] for node in _collect_nodes(plan[0]['Plan']) if 'Index Name' in node}
+
+
+def _select_from(queries, table, column):
+    """取出 Actor 執行過、以 column 為條件查詢 table 的 SELECT"""
+    pattern = re.compile(rf'FROM "{table}".*WHERE.*"{table}"\."{column}"', re.S)
+    matched = [q['sql'] for q in queries.captured_queries
+               if q['sql'].startswith('SELECT') and pattern.search(q['sql'])]
+    assert matched, f"actor issued no SELECT on {table}.{column}"
+    return matched
+
+
+def _assert_index(post_json, name, data, table, column, index_name):
+    with CaptureQueriesContext(connection) as queries:
+        response = post_json(name, data)
+    assert response.status_code < 500, response.content
+    for sql in _select_from(queries, table, column):
+        assert index_name in _index_names(sql), sql
+
+
+@pytest.mark.django_db
+def test_student_read_by_semester_and_status(post_json):
+    _assert_index(
+        post_json, 'student_read', {'student_semester': '1141', 'student_status': '修業中'},
+        'students', 'student_semester', 'students_student_6e4634_idx',
+    )
+
+
+@pytest.mark.django_db
+def test_score_read_by_semester(post_json):
+    _assert_index(
+        post_json, 'score_read', {'score_semester': '1141'},
+        'score', 'score_semester', 'score_semester_idx',
+    )
+
+
+@pytest.mark.django_db
+def test_score_read_by_student(post_json):
+    _assert_index(
+        post_json, 'score_read', {'f_student_uuid': 'stu_1141_a'},
+        'score', 'f_student_uuid', 'score_student_idx',
+    )
+
+
+def test_setweight_by_semester_and_name(post_json, seeded_tests):
+    _assert_index(
+        post_json, 'test_setweight', {'test_semester': '1141', 'weights': {'期中考': 1.0}},
+        'test', 'test_name', 'test_test_se_f7eeeb_idx',
+    )
+
+
+def test_create_checks_slot_by_semester_and_slot(post_json, seeded_tests):
+    _assert_index(
+        post_json, 'test_create',
+        {'test_name': '期中考', 'test_semester': '1141', 'test_date': '2025-01-01', 'test_range': '1'},
+        'test', 'test_slot', 'test_semester_slot_uniq',
+    )
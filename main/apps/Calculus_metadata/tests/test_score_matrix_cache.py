@@ -0,0 +1,46 @@
+"""
+Score Matrix Cache Tests - 以共用的資料庫快取儲存學期成績矩陣、寫入提交後清除
+"""
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from main.apps.Calculus_metadata.models import Score, Students
+from main.apps.Calculus_metadata.services.optional.calculation import ScoreMatrixService
+
+
+@pytest.fixture
+def database_cache(settings, db):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': settings.CACHE_BACKENDS['database'][0],
+            'LOCATION': settings.CACHE_BACKENDS['database'][1],
+        },
+    }
+    call_command('createcachetable')
+    yield cache
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_matrix_shared_through_database_cache(database_cache, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        student = Students.objects.create(
+            student_uuid='stu_1141_a', student_name='A', student_number='B1', student_semester='1141',
+        )
+        score = Score.objects.create(
+            score_uuid='scr_1141_a', student=student, f_student_uuid='stu_1141_a',
+            score_semester='1141', score_quiz1='80',
+        )
+
+    matrix = ScoreMatrixService.get_matrix('1141')
+    cached = database_cache.get(ScoreMatrixService.cache_key('1141'))
+    assert cached is not None
+    assert cached.score_ids == matrix.score_ids == [score.id]
+    assert list(cached.values('score_quiz1')) == [80.0]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        score.score_quiz1 = '90'
+        score.save()
+    assert database_cache.get(ScoreMatrixService.cache_key('1141')) is None
+    assert list(ScoreMatrixService.get_matrix('1141').values('score_quiz1')) == [90.0]
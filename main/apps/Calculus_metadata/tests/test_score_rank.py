@@ -0,0 +1,69 @@
+"""
+Score Rank Tests - read 的 include_rank：同分同名次、空白與二退為 None、百分位、成績更新後名次隨之更新
+"""
+import pytest
+
+from main.apps.Calculus_metadata.models import Score, Students
+
+# 學號: (第一次小考, 學生狀態)
+STUDENTS = {
+    'A': ('90', '修業中'),
+    'B': ('80', '修業中'),
+    'C': ('80', '修業中'),
+    'D': ('70', '修業中'),
+    'E': ('', '修業中'),
+    'F': ('95', '二退'),
+}
+
+
+@pytest.fixture
+def semester(db):
+    for number, (quiz1, status) in STUDENTS.items():
+        student = Students.objects.create(
+            student_uuid=f'stu_{number}', student_name=number, student_number=number,
+            student_semester='1141', student_status=status,
+        )
+        Score.objects.create(
+            score_uuid=f'scr_{number}', student=student, f_student_uuid=student.student_uuid,
+            score_semester='1141', score_quiz1=quiz1, score_midterm='60' if number == 'A' else '',
+        )
+    return '1141'
+
+
+def _ranks(post_json, field='score_quiz1'):
+    response = post_json('score_read', {'score_semester': '1141', 'include_rank': True})
+    assert response.status_code == 200, response.content
+    return {item['f_student_uuid'][len('stu_'):]: item['score_rank'][field] for item in response.json()['data']}
+
+
+def test_rank_and_percentile(post_json, semester):
+    ranks = _ranks(post_json)
+    assert ranks['A'] == {'rank': 1, 'percentile': 100.0, 'count': 4}
+    # 同分同名次，百分位為分數小於等於此分數的比例
+    assert ranks['B'] == ranks['C'] == {'rank': 2, 'percentile': 75.0, 'count': 4}
+    assert ranks['D'] == {'rank': 4, 'percentile': 25.0, 'count': 4}
+    assert ranks['E'] is None
+    assert ranks['F'] is None
+
+    midterm = _ranks(post_json, 'score_midterm')
+    assert midterm['A'] == {'rank': 1, 'percentile': 100.0, 'count': 1}
+    assert midterm['B'] is None
+
+
+def test_rank_fields_only_when_requested(post_json, semester):
+    response = post_json('score_read', {'score_semester': '1141'})
+    assert all('score_rank' not in item for item in response.json()['data'])
+
+
+def test_rank_follows_score_update(post_json, semester, django_capture_on_commit_callbacks):
+    assert _ranks(post_json)['D']['rank'] == 4
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = post_json('score_update', {
+            'score_uuid': 'scr_D', 'update_field': 'score_quiz1', 'score_value': '99',
+        })
+    assert response.status_code == 200, response.content
+
+    ranks = _ranks(post_json)
+    assert ranks['D'] == {'rank': 1, 'percentile': 100.0, 'count': 4}
+    assert ranks['A'] == {'rank': 2, 'percentile': 75.0, 'count': 4}
@@ -0,0 +1,80 @@
+"""
+Semester Partition Tests - 學期格式驗證與 DEFAULT 分區資料搬移
+"""
+import time
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from main.apps.Calculus_metadata.models import Score, Students
+from main.apps.Calculus_metadata.serializers import StudentsWriteSerializer
+from main.apps.Calculus_metadata.services.optional.partition import SemesterPartitionService
+
+
+@pytest.fixture
+def partition_cache():
+    SemesterPartitionService.clear_cache()
+    yield
+    SemesterPartitionService.clear_cache()
+
+
+def _student_data(semester):
+    return {'student_name': 'A', 'student_number': 'B1', 'student_semester': semester}
+
+
+@pytest.mark.parametrize('semester', ['114-1', '1141; DROP', '11411', ''])
+def test_invalid_semester_rejected_by_serializer(semester):
+    serializer = StudentsWriteSerializer(data=_student_data(semester))
+    assert not serializer.is_valid()
+    assert 'student_semester' in serializer.errors
+
+
+def test_valid_semester_accepted_by_serializer():
+    assert StudentsWriteSerializer(data=_student_data('1141')).is_valid()
+
+
+def _partition_of(table, row_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT tableoid::regclass::text FROM {table} WHERE id = %s", [row_id])
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_ensure_partition_moves_rows_out_of_default(settings, partition_cache):
+    """分區功能關閉期間寫入 DEFAULT 分區的學期，建立分區時先搬移資料"""
+    call_command('partition_by_semester', stdout=open('/dev/null', 'w'))
+    SemesterPartitionService.clear_cache()
+
+    settings.DB_SEMESTER_PARTITIONING = False
+    student = Students.objects.create(
+        student_uuid='stu_1151_a', student_name='A', student_number='B1', student_semester='1151',
+    )
+    score = Score.objects.create(
+        score_uuid='scr_1151_a', student=student, f_student_uuid='stu_1151_a', score_semester='1151',
+    )
+    assert _partition_of('students', student.id) == 'students_default'
+
+    settings.DB_SEMESTER_PARTITIONING = True
+    assert SemesterPartitionService.ensure_partition(Students, '1151')
+    assert SemesterPartitionService.ensure_partition(Score, '1151')
+
+    assert _partition_of('students', student.id) == 'students_p1151'
+    assert _partition_of('score', score.id) == 'score_p1151'
+    assert Score.objects.get(score_uuid='scr_1151_a').student_id == student.id
+
+
+@pytest.mark.django_db
+def test_running_worker_notices_conversion(monkeypatch, partition_cache):
+    """其他進程轉換為分區表後，未分區的快取逾時即重新查詢（worker 不需重啟）"""
+    assert not SemesterPartitionService.is_partitioned(Students)
+    call_command('partition_by_semester', stdout=open('/dev/null', 'w'))
+    # 模擬其他 worker：轉換前查詢過的結果仍在快取中
+    SemesterPartitionService.clear_cache()
+    SemesterPartitionService._unpartitioned_checked_at['students'] = time.monotonic()
+    assert not SemesterPartitionService.is_partitioned(Students)
+
+    monkeypatch.setattr(SemesterPartitionService, 'UNPARTITIONED_RECHECK_SECONDS', 0)
+    assert SemesterPartitionService.is_partitioned(Students)
+    monkeypatch.undo()
+    assert SemesterPartitionService.is_partitioned(Students)
@@ -0,0 +1,152 @@
+"""
+Semester Summary Tests - 增量維護與重建結果一致、批次寫入、首次寫入的並行建立、讀取不寫入
+"""
+import threading
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from main.apps.Calculus_metadata.models import Score, SemesterScoreSummary, Students
+from main.apps.Calculus_metadata.services.optional.calculation import ScoreMatrixService
+from main.apps.Calculus_metadata.services.optional.summary import SemesterSummaryService
+
+SUMMARY_COLUMNS = [
+    'summary_count', 'summary_sum', 'summary_sum_squares', 'summary_bins',
+    'summary_pass_count', 'summary_fail_count',
+]
+
+
+def _create(index, semester='1141', quiz1='', status='修業中'):
+    student = Students.objects.create(
+        student_uuid=f'stu_{semester}_{index}', student_name=f'S{index}', student_number=f'{semester}{index}',
+        student_semester=semester, student_status=status,
+    )
+    return Score.objects.create(
+        score_uuid=f'scr_{semester}_{index}', student=student, f_student_uuid=student.student_uuid,
+        score_semester=semester, score_quiz1=quiz1,
+    )
+
+
+def _stored(semester):
+    return {
+        row.summary_field: [getattr(row, column) for column in SUMMARY_COLUMNS]
+        for row in SemesterScoreSummary.objects.filter(summary_semester=semester)
+    }
+
+
+def _rebuilt(semester):
+    return {
+        row.summary_field: [getattr(row, column) for column in SUMMARY_COLUMNS]
+        for row in SemesterSummaryService.compute(semester, ScoreMatrixService.build(semester, 0))
+    }
+
+
+@pytest.mark.django_db
+def test_incremental_updates_match_rebuild():
+    scores = [_create(index, quiz1=str(50 + index * 7)) for index in range(5)]
+
+    scores[0].score_quiz1 = '95'
+    scores[0].save()
+    scores[1].score_quiz1 = ''
+    scores[1].save()
+    scores[2].delete()
+    student = scores[3].student
+    student.student_status = '二退'
+    student.save()
+
+    assert _stored('1141') == _rebuilt('1141')
+    assert _stored('1141')['score_quiz1'][0] == 2
+
+
+@pytest.mark.django_db
+def test_save_uses_loaded_values_instead_of_snapshot_query():
+    _create(0, quiz1='70')
+    score = Score.objects.select_related('student').get(score_uuid='scr_1141_0')
+    score.score_quiz1 = '80'
+    with CaptureQueriesContext(connection) as queries:
+        score.save()
+    assert not [q for q in queries.captured_queries if q['sql'].startswith('SELECT') and 'FROM "score"' in q['sql']]
+    assert _stored('1141') == _rebuilt('1141')
+
+
+@pytest.mark.django_db
+def test_batch_updates_each_summary_row_once():
+    scores = [_create(index, quiz1='60') for index in range(4)]
+    with CaptureQueriesContext(connection) as queries:
+        with SemesterSummaryService.batch():
+            for index, score in enumerate(scores):
+                score.score_quiz1 = str(70 + index)
+                score.save()
+    summary_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "semester_score_summary"')]
+    assert len(summary_updates) == 1
+    assert _stored('1141') == _rebuilt('1141')
+
+
+@pytest.mark.django_db
+def test_reads_do_not_create_summary_rows():
+    _create(0, quiz1='70')
+    SemesterScoreSummary.objects.all().delete()
+
+    summary = SemesterSummaryService.get_summary('1141', 'score_quiz1')
+    assert summary.summary_count == 1
+    SemesterSummaryService.get_summaries(['1141', '1132'], ['score_quiz1'])
+    assert not SemesterScoreSummary.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_first_writes_in_a_semester():
+    """兩個交易同時寫入尚無彙總列的學期：一個建立彙總列，另一個等待後套用增量，皆不失敗"""
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def first_write(index):
+        try:
+            with transaction.atomic():
+                student = Students.objects.create(
+                    student_uuid=f'stu_1151_{index}', student_name='S', student_number=f'1151{index}',
+                    student_semester='1151',
+                )
+                barrier.wait(10)
+                Score.objects.create(
+                    score_uuid=f'scr_1151_{index}', student=student, f_student_uuid=student.student_uuid,
+                    score_semester='1151', score_quiz1='80',
+                )
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    writers = [threading.Thread(target=first_write, args=(index,)) for index in range(2)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    assert errors == []
+    assert _stored('1151')['score_quiz1'][0] == 2
+    assert _stored('1151') == _rebuilt('1151')
+
+
+def _test_score(post_json, **extra):
+    response = post_json('score_test_score', {'score_semester': '1141', 'score_field': 'score_quiz1', **extra})
+    assert response.status_code == 200, response.content
+    return response.json()['data']
+
+
+@pytest.mark.django_db
+def test_test_score_exclude_empty_and_passing_threshold(post_json, settings):
+    _create(0, quiz1='80')
+    _create(1, quiz1='55')
+    _create(2)
+
+    result = _test_score(post_json)
+    assert (result['total_count'], result['pass_count'], result['fail_count']) == (2, 1, 1)
+
+    result = _test_score(post_json, exclude_empty=False)
+    assert (result['total_count'], result['average']) == (3, 45.0)
+
+    settings.SCORE_PASSING_THRESHOLD = 50.0
+    SemesterSummaryService.rebuild('1141')
+    result = _test_score(post_json)
+    assert (result['pass_count'], result['passing_threshold']) == (2, 50.0)
@@ -0,0 +1,134 @@
+"""
+Simulate Tests - 多組權重試算與 calculation_final 結果一致、current 情境、各門檻不及格人數、唯讀、參數驗證
+"""
+import pytest
+
+from main.apps.Calculus_metadata.models import Score, Students, Test as ExamModel
+
+# 目前設定的權重（二進位可精確表示，總和恰為 1.0）
+CURRENT_WEIGHTS = {'quiz1': 0.125, 'midterm': 0.375, 'quiz2': 0.25, 'finalexam': 0.25}
+SCENARIO_WEIGHTS = {'期中考': 0.5, 'finalexam': 0.5}
+# 學號: (第一次小考, 期中考, 第二次小考, 期末考, 學生狀態)
+STUDENTS = {
+    'B01': ('90', '85', '80', '95', '修業中'),
+    'B02': ('40', '55', '60', '50', '修業中'),
+    'B03': ('70', '62', '58', '66', '修業中'),
+    'B04': ('100', '30', '90', '20', '修業中'),
+    'B05': ('60', '60', '60', '60', '修業中'),
+    'B06': ('80', '', '70', '90', '修業中'),   # 未全部填寫，不計算
+    'B07': ('10', '10', '10', '10', '二退'),   # 二退，不計算
+}
+FIELDS = ['score_quiz1', 'score_midterm', 'score_quiz2', 'score_finalexam']
+
+
+@pytest.fixture
+def semester(db):
+    for slot, weight in CURRENT_WEIGHTS.items():
+        ExamModel.objects.create(
+            test_uuid=f'test_{slot}', test_name=slot, test_slot=slot, test_weight=str(weight),
+            test_semester='1141', test_date='2025-01-01', test_range='1',
+        )
+    for number, (*values, status) in STUDENTS.items():
+        student = Students.objects.create(
+            student_uuid=f'stu_{number}', student_name=number, student_number=number,
+            student_semester='1141', student_status=status,
+        )
+        Score.objects.create(
+            score_uuid=f'scr_{number}', student=student, f_student_uuid=student.student_uuid,
+            score_semester='1141', **dict(zip(FIELDS, values)),
+        )
+    return '1141'
+
+
+def _snapshot():
+    return sorted(Score.objects.values_list('f_student_uuid', 'score_total', 'student__student_status'))
+
+
+def _expected_totals(weights):
+    vector = [weights.get(slot, 0.0) for slot in CURRENT_WEIGHTS]
+    return [
+        sum(float(value) * weight for value, weight in zip(values, vector))
+        for *values, status in STUDENTS.values()
+        if status != '二退' and all(values)
+    ]
+
+
+def _simulate(post_json, **data):
+    return post_json('score_simulate', {'test_semester': '1141', **data})
+
+
+def test_simulate_matches_calculation_final_and_writes_nothing(post_json, semester):
+    before = _snapshot()
+    response = _simulate(
+        post_json, scenarios=[{'name': 'exam_heavy', 'weights': SCENARIO_WEIGHTS}], passing_scores=[60, 70],
+    )
+    assert response.status_code == 200, response.content
+    result = response.json()['data']
+    assert _snapshot() == before
+
+    assert result['student_count'] == 5
+    current, exam_heavy = result['scenarios']
+    assert current['name'] == 'current' and exam_heavy['name'] == 'exam_heavy'
+    assert current['weights'] == {'第一次小考': 0.125, '期中考': 0.375, '第二次小考': 0.25, '期末考': 0.25}
+
+    # 自訂情境：與逐筆計算的總分一致（二退 / 未填完者不計）
+    totals = _expected_totals({'midterm': 0.5, 'finalexam': 0.5})
+    assert exam_heavy['average'] == round(sum(totals) / len(totals), 2)
+    assert (exam_heavy['min'], exam_heavy['max']) == (round(min(totals), 2), round(max(totals), 2))
+    assert [(p['passing_score'], p['fail_count']) for p in exam_heavy['passing']] == [
+        (60.0, len([t for t in totals if t < 60])), (70.0, len([t for t in totals if t < 70])),
+    ]
+    assert sum(exam_heavy['distribution']['counts']) == 5
+
+    # current 情境：與 calculation_final 以相同權重、門檻寫入的結果一致
+    response = post_json('score_calculation_final', {'test_semester': '1141', 'passing_score': 60})
+    assert response.status_code == 200, response.content
+    final_totals = [
+        float(total) for total in Score.objects.exclude(score_total='').values_list('score_total', flat=True)
+    ]
+    failed = Students.objects.filter(student_semester='1141', student_status='被當').count()
+    assert len(final_totals) == 5
+    assert current['average'] == round(sum(final_totals) / len(final_totals), 2)
+    assert (current['min'], current['max']) == (min(final_totals), max(final_totals))
+    assert current['passing'][0] == {
+        'passing_score': 60.0, 'pass_count': 5 - failed, 'fail_count': failed, 'fail_rate': round(failed / 5, 4),
+    }
+
+
+def test_current_scenario_is_optional(post_json, semester):
+    response = _simulate(post_json, scenarios=[{'weights': SCENARIO_WEIGHTS}], include_current=False)
+    assert response.status_code == 200, response.content
+    assert [scenario['name'] for scenario in response.json()['data']['scenarios']] == ['scenario_1']
+
+    ExamModel.objects.filter(test_slot='quiz1').update(test_weight='')
+    response = _simulate(post_json, scenarios=[{'weights': SCENARIO_WEIGHTS}])
+    assert [scenario['name'] for scenario in response.json()['data']['scenarios']] == ['scenario_1']
+
+
+def test_weights_within_tolerance_are_accepted(post_json, semester):
+    weights = {'midterm': 0.4995, 'finalexam': 0.5}
+    response = _simulate(post_json, scenarios=[{'weights': weights}], include_current=False)
+    assert response.status_code == 200, response.content
+
+
+@pytest.mark.parametrize('scenarios', [
+    [{'weights': {'小考三': 1.0}}],
+    [{'weights': {'midterm': 0.5, '期中考': 0.5}}],
+    [{'weights': {'midterm': 1.5, 'finalexam': -0.5}}],
+    [{'weights': {'midterm': 0.5, 'finalexam': 0.498}}],
+    [{'weights': {'midterm': 'half', 'finalexam': 0.5}}],
+    [{'weights': {}}],
+    ['midterm'],
+    [{'weights': {'midterm': 1.0}}] * 201,
+])
+def test_invalid_scenarios_return_400(post_json, semester, scenarios):
+    before = _snapshot()
+    response = _simulate(post_json, scenarios=scenarios)
+    assert response.status_code == 400, response.content
+    assert _snapshot() == before
+
+
+@pytest.mark.parametrize('passing_scores', [[], ['sixty'], [60] * 51])
+def test_invalid_passing_scores_return_400(post_json, semester, passing_scores):
+    response = _simulate(post_json, scenarios=[{'weights': SCENARIO_WEIGHTS}], passing_scores=passing_scores)
+    assert response.status_code == 400, response.content
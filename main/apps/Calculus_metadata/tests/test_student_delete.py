@@ -0,0 +1,28 @@
+"""
+Student Delete Tests - 刪除學生時成績由外鍵 CASCADE 刪除（每筆成績僅刪除一次）
+"""
+import pytest
+
+from main.apps.Calculus_metadata.models import ChangeLog, Score, SemesterScoreSummary, Students
+
+
+@pytest.mark.django_db
+def test_delete_student_cascades_scores_once(post_json):
+    response = post_json('student_create', {
+        'student_name': 'A', 'student_number': 'B1', 'student_semester': '1141',
+    })
+    assert response.status_code == 201, response.content
+    student = Students.objects.get(student_number='B1')
+    score = Score.objects.get(student=student)
+    score.score_quiz1 = '80'
+    score.save()
+
+    response = post_json('student_delete', {'student_uuid': student.student_uuid})
+    assert response.status_code == 200, response.content
+
+    assert not Score.objects.filter(pk=score.pk).exists()
+    assert ChangeLog.objects.filter(
+        change_entity_uuid=score.score_uuid, change_operation='delete'
+    ).count() == 1
+    summary = SemesterScoreSummary.objects.get(summary_semester='1141', summary_field='score_quiz1')
+    assert summary.summary_count == 0
@@ -7,3 +7,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'main.settings')
 
 application = get_asgi_application()
+
+# 預先載入延遲匯入的套件（openpyxl、matplotlib renderer），避免首次請求變慢
+from django.conf import settings  # noqa: E402
+
+if settings.WARMUP_ON_STARTUP:
+    from main.apps.Calculus_metadata.services.optional.warmup import WarmupService  # noqa: E402
+    WarmupService.warm_up()
@@ -2,7 +2,7 @@
 Django Base Settings
 """
 from pathlib import Path
-from main.utils.env_loader import get_env, get_env_bool, get_env_list
+from main.utils.env_loader import get_env, get_env_bool, get_env_int, get_env_float, get_env_list
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'main.utils.request_metrics.RequestMetricsMiddleware',  # 最外層，量測整個請求
     'corsheaders.middleware.CorsMiddleware',  # Must be before CommonMiddleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -161,6 +162,34 @@ CORS_ALLOW_ALL_ORIGINS = True
 #     },
 # }
 
+# Logging: LOG_FORMAT = text / json（每行一筆 JSON）；LOG_ROTATION = size（LOG_MAX_BYTES）/ time（LOG_ROTATE_WHEN）
+LOG_FORMAT = get_env('LOG_FORMAT', 'text')
+LOG_ROTATION = get_env('LOG_ROTATION', 'size')
+LOG_MAX_BYTES = get_env_int('LOG_MAX_BYTES', 1024 * 1024 * 10)
+LOG_BACKUP_COUNT = get_env_int('LOG_BACKUP_COUNT', 5)
+LOG_ROTATE_WHEN = get_env('LOG_ROTATE_WHEN', 'midnight')
+# True: handlers 經 QueueHandler / QueueListener 於背景執行緒輸出，請求執行緒不等待寫檔
+LOG_ASYNC = get_env_bool('LOG_ASYNC', True)
+# LogPayload（日誌中的請求內容）長度上限與每層 list / dict 最多列出的項目數
+LOG_PAYLOAD_MAX_CHARS = get_env_int('LOG_PAYLOAD_MAX_CHARS', 1000)
+LOG_PAYLOAD_MAX_ITEMS = get_env_int('LOG_PAYLOAD_MAX_ITEMS', 20)
+
+LOGGING_CONFIG = 'main.utils.logger.configure_logging'
+
+if LOG_ROTATION == 'time':
+    _LOG_FILE_ROTATION = {
+        'class': 'logging.handlers.TimedRotatingFileHandler',
+        'when': LOG_ROTATE_WHEN,
+        'backupCount': LOG_BACKUP_COUNT,
+    }
+else:
+    _LOG_FILE_ROTATION = {
+        'class': 'logging.handlers.RotatingFileHandler',
+        'maxBytes': LOG_MAX_BYTES,
+        'backupCount': LOG_BACKUP_COUNT,
+    }
+_LOG_FORMATTER = 'json' if LOG_FORMAT == 'json' else 'verbose'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -171,20 +200,22 @@ LOGGING = {
             'style': '{',
             'datefmt': '%Y-%m-%d %H:%M:%S',
         },
+        'json': {
+            '()': 'main.utils.logger.JsonLineFormatter',
+        },
     },
 
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            'formatter': _LOG_FORMATTER,
             'level': 'INFO',   # 改回 INFO 以顯示 API 日誌
         },
         'file': {
-            'class': 'logging.handlers.RotatingFileHandler',
+            **_LOG_FILE_ROTATION,
             'filename': BASE_DIR / 'logs' / 'django.log',
-            'maxBytes': 1024 * 1024 * 10,
-            'backupCount': 5,
-            'formatter': 'verbose',
+            'encoding': 'utf-8',
+            'formatter': _LOG_FORMATTER,
             'level': 'INFO',
         },
     },
@@ -210,5 +241,68 @@ MONGO_USER = get_env('MONGO_USER', 'calculus_user')
 MONGO_PASSWORD = get_env('MONGO_PASSWORD', 'calculus_password123')
 MONGO_DB = get_env('MONGO_DB', 'calculus_nosql_db')
 
+# Semester partitioning (需先執行 manage.py partition_by_semester)
+DB_SEMESTER_PARTITIONING = get_env_bool('DB_SEMESTER_PARTITIONING', False)
+
+# ASGI 部署時改用 async 版本的熱門端點（Score read / step_diagram / test-filedata read）
+ASYNC_ACTORS = get_env_bool('ASYNC_ACTORS', False)
+
+# 回應後背景工作（GridFS 上傳等）執行緒數，0 = 同步執行
+BACKGROUND_TASK_WORKERS = get_env_int('BACKGROUND_TASK_WORKERS', 4)
+
+# 圖表 renderer 進程池: 進程數（0 = 同進程繪製）、同時繪製上限、逾時秒數
+CHART_RENDER_WORKERS = get_env_int('CHART_RENDER_WORKERS', 2)
+CHART_RENDER_MAX_CONCURRENCY = get_env_int('CHART_RENDER_MAX_CONCURRENCY', 4)
+CHART_RENDER_TIMEOUT = get_env_int('CHART_RENDER_TIMEOUT', 30)
+
+# WSGI / ASGI 啟動後預先載入 openpyxl 並啟動圖表 renderer（manage.py 指令不受影響）
+WARMUP_ON_STARTUP = get_env_bool('WARMUP_ON_STARTUP', False)
+
+# 快取（學期成績矩陣 / 考試項目對應表）：locmem = 各進程獨立，寫入後的失效只作用於寫入的進程；
+# 多個 worker / 節點請用 database（需執行 createcachetable）或 redis（需安裝 redis 套件）
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHE_BACKEND = get_env('CACHE_BACKEND', 'locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': get_env('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+    },
+}
+
+# 學期成績矩陣快取秒數（Score / Students 寫入時立即失效）
+SCORE_MATRIX_CACHE_SECONDS = get_env_int('SCORE_MATRIX_CACHE_SECONDS', 300)
+
+# 學期成績彙總 / test_score 的及格分數（變更後請執行 rebuild_semester_summary 重算及格人數）
+SCORE_PASSING_THRESHOLD = get_env_float('SCORE_PASSING_THRESHOLD', 60.0)
+
+# 學期成績彙總的分位數摘要：相對誤差上限、保留完整分數（精確計算）的筆數上限
+QUANTILE_SKETCH_RELATIVE_ACCURACY = get_env_float('QUANTILE_SKETCH_RELATIVE_ACCURACY', 0.01)
+QUANTILE_SKETCH_EXACT_LIMIT = get_env_int('QUANTILE_SKETCH_EXACT_LIMIT', 1000)
+
+# 請求量測（SQL / MongoDB / GridFS / 圖表繪製）：Server-Timing header 與結構化日誌
+REQUEST_METRICS_ENABLED = get_env_bool('REQUEST_METRICS_ENABLED', True)
+REQUEST_METRICS_SERVER_TIMING = get_env_bool('REQUEST_METRICS_SERVER_TIMING', True)
+# 超過任一門檻時以 WARNING 記錄（慢查詢另列出 SQL）
+SLOW_REQUEST_MS = get_env_int('SLOW_REQUEST_MS', 1000)
+SLOW_REQUEST_SQL_COUNT = get_env_int('SLOW_REQUEST_SQL_COUNT', 50)
+SLOW_REQUEST_MONGO_COUNT = get_env_int('SLOW_REQUEST_MONGO_COUNT', 20)
+SLOW_SQL_QUERY_MS = get_env_int('SLOW_SQL_QUERY_MS', 200)
+
+# Prometheus /metrics（需安裝 prometheus_client 且 REQUEST_METRICS_ENABLED；
+# 多個 gunicorn worker 時設定環境變數 PROMETHEUS_MULTIPROC_DIR 啟用 multiprocess 模式）
+PROMETHEUS_METRICS_ENABLED = get_env_bool('PROMETHEUS_METRICS_ENABLED', True)
+
+# change_log 保留天數（prune_change_log 預設值；增量計算的上次結算早於此期間時改為完整重算）
+CHANGE_LOG_RETENTION_DAYS = get_env_int('CHANGE_LOG_RETENTION_DAYS', 30)
+
+# Event stream (SSE): memory = 單節點, postgres = LISTEN/NOTIFY 多節點, 或 broker 類別 dotted path
+EVENT_BROKER_BACKEND = get_env('EVENT_BROKER_BACKEND', 'memory')
+EVENT_STREAM_MAX_SECONDS = get_env_int('EVENT_STREAM_MAX_SECONDS', 300)
+EVENT_STREAM_HEARTBEAT_SECONDS = get_env_int('EVENT_STREAM_HEARTBEAT_SECONDS', 15)
+
 # Upload directory
 UPLOAD_DIR = get_env('UPLOAD_DIR', str(BASE_DIR / 'uploads'))
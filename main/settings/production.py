@@ -28,6 +28,16 @@ DATABASES = {
     },
 }
 
+# 多個 worker 共用快取（寫入後的失效對所有 worker 生效）
+CACHE_BACKEND = get_env('CACHE_BACKEND', 'database')
+CACHES['default'] = {
+    'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+    'LOCATION': get_env('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+}
+
+# 啟動後預熱延遲匯入的套件與圖表 renderer
+WARMUP_ON_STARTUP = get_env_bool('WARMUP_ON_STARTUP', True)
+
 # Production logging
 LOGGING['root']['level'] = 'WARNING'
 LOGGING['loggers']['django']['level'] = 'WARNING'
@@ -0,0 +1,9 @@
+"""
+Pytest Settings - 由 pytest.ini 指定；日誌只輸出至 console（由 pytest 擷取），不寫入 logs/django.log
+"""
+from .local import *
+
+LOGGING['root']['handlers'] = ['console']
+for _logger in LOGGING['loggers'].values():
+    _logger['handlers'] = [handler for handler in _logger['handlers'] if handler != 'file']
+del LOGGING['handlers']['file']
@@ -3,8 +3,10 @@ Main URLs Configuration
 """
 from django.contrib import admin
 from django.urls import path, include
+from main.utils.prometheus_metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/v0.1/Calculus_oom/Calculus_metadata/', include('main.apps.Calculus_metadata.api.urls')),
 ]
@@ -1,19 +1,27 @@
 """
 Utils Package
 """
-from .env_loader import get_env, get_env_bool, get_env_int, get_env_list, load_env_from_file
-from .logger import setup_logger, get_logger
+from .env_loader import get_env, get_env_bool, get_env_int, get_env_float, get_env_list, load_env_from_file
+from .logger import setup_logger, get_logger, LogPayload
 from .response import success_response, error_response, paginated_response
+from .async_views import async_csrf_exempt, async_require_http_methods
+from .background import submit_background_task, create_background_task
 
 __all__ = [
     'get_env',
     'get_env_bool',
     'get_env_int',
+    'get_env_float',
     'get_env_list',
     'load_env_from_file',
     'setup_logger',
     'get_logger',
+    'LogPayload',
     'success_response',
     'error_response',
     'paginated_response',
+    'async_csrf_exempt',
+    'async_require_http_methods',
+    'submit_background_task',
+    'create_background_task',
 ]
@@ -0,0 +1,52 @@
+"""
+Async View Utilities - async view 專用裝飾器
+Django 4.2 的 csrf_exempt / require_http_methods 會把 async view 包成 sync view，
+async view（例如 SSE 串流）需改用以下版本
+"""
+from functools import wraps
+from typing import List
+
+from django.http import HttpResponseNotAllowed
+from django.utils.log import log_response
+
+
+def async_csrf_exempt(view_func):
+    """
+    csrf_exempt 的 async 版本
+    
+    Args:
+        view_func: async view
+        
+    Returns:
+        標記為免 CSRF 檢查的 async view
+    """
+    @wraps(view_func)
+    async def wrapper(*args, **kwargs):
+        return await view_func(*args, **kwargs)
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+def async_require_http_methods(methods: List[str]):
+    """
+    require_http_methods 的 async 版本
+    
+    Args:
+        methods: 允許的 HTTP 方法列表
+        
+    Returns:
+        裝飾器
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def inner(request, *args, **kwargs):
+            if request.method not in methods:
+                response = HttpResponseNotAllowed(methods)
+                log_response(
+                    "Method Not Allowed (%s): %s", request.method, request.path,
+                    response=response, request=request,
+                )
+                return response
+            return await view_func(request, *args, **kwargs)
+        return inner
+    return decorator
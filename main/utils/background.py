@@ -0,0 +1,89 @@
+"""
+Background Tasks - 回應後執行的背景工作
+用於不影響回應內容的持久化工作（例如 GridFS 上傳），讓請求不必等待 I/O 完成
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Optional, Set
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from main.utils import prometheus_metrics
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# 保留 asyncio task 的強參照，避免執行中被 GC 回收
+_async_tasks: Set[asyncio.Task] = set()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """取得（或延遲建立）共用執行緒池"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 4),
+                    thread_name_prefix='background-task',
+                )
+    return _executor
+
+
+def _run_task(func: Callable[..., Any], *args, **kwargs) -> None:
+    """執行背景工作；例外僅記錄，結束後關閉此執行緒的資料庫連線"""
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, '__qualname__', func))
+    finally:
+        connections.close_all()
+        prometheus_metrics.adjust_background_tasks('thread', -1)
+
+
+def submit_background_task(func: Callable[..., Any], *args, **kwargs) -> None:
+    """
+    將工作交給背景執行緒池執行（BACKGROUND_TASK_WORKERS=0 時直接同步執行）
+
+    Args:
+        func: 要執行的函式
+        *args: 位置參數
+        **kwargs: 關鍵字參數
+    """
+    if getattr(settings, 'BACKGROUND_TASK_WORKERS', 4) <= 0:
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            logger.exception("Background task %s failed", getattr(func, '__qualname__', func))
+        return
+    prometheus_metrics.adjust_background_tasks('thread', 1)
+    _get_executor().submit(_run_task, func, *args, **kwargs)
+
+
+def create_background_task(coro: Coroutine) -> asyncio.Task:
+    """
+    在目前 event loop 建立背景 task（async view 使用），例外僅記錄
+
+    Args:
+        coro: 要執行的 coroutine
+
+    Returns:
+        asyncio.Task
+    """
+    task = asyncio.get_running_loop().create_task(coro)
+    _async_tasks.add(task)
+    prometheus_metrics.adjust_background_tasks('async', 1)
+
+    def _done(finished: asyncio.Task) -> None:
+        _async_tasks.discard(finished)
+        prometheus_metrics.adjust_background_tasks('async', -1)
+        if not finished.cancelled() and finished.exception() is not None:
+            logger.error("Background task failed", exc_info=finished.exception())
+
+    task.add_done_callback(_done)
+    return task
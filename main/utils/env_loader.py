@@ -56,6 +56,23 @@ def get_env_int(key: str, default: int = 0) -> int:
         return default
 
 
+def get_env_float(key: str, default: float = 0.0) -> float:
+    """
+    獲取浮點數類型環境變數
+    
+    Args:
+        key: 環境變數名稱
+        default: 預設值
+        
+    Returns:
+        浮點數值
+    """
+    try:
+        return float(get_env(key, str(default)))
+    except ValueError:
+        return default
+
+
 def get_env_list(key: str, default: list = None, separator: str = ',') -> list:
     """
     獲取列表類型環境變數
@@ -1,71 +1,258 @@
 """
 Logger Configuration - 日誌配置
+QueueHandler / QueueListener 非同步輸出（寫檔與 console 在背景執行緒）、JSON lines 格式、請求內容截斷
 """
+import atexit
+import copy
+import json
 import logging
+import logging.config
 import os
-from datetime import datetime
+import queue
+import reprlib
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from pathlib import Path
+from typing import Any, Iterable, List, Optional
 
+from django.conf import settings
 
-def setup_logger(name: str = 'calculus_oom', log_dir: str = 'logs', level=logging.INFO):
+_listeners: List[QueueListener] = []
+_listeners_lock = threading.Lock()
+# configure_logging 建立的 listener（重新設定時先停止）
+_settings_listener: Optional[QueueListener] = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """每筆日誌輸出一行 JSON（附帶 request_metrics extra 欄位）"""
+
+    def __init__(self, datefmt: Optional[str] = '%Y-%m-%d %H:%M:%S', **kwargs):
+        super().__init__(datefmt=datefmt, **kwargs)
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, self.datefmt),
+            'level': record.levelname,
+            'logger': record.name,
+            'func': record.funcName,
+            'line': record.lineno,
+            'message': record.getMessage(),
+        }
+        request_metrics = getattr(record, 'request_metrics', None)
+        if request_metrics:
+            entry['request_metrics'] = request_metrics
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogPayload:
+    """
+    日誌中的請求內容（用法：logger.info("... %s", LogPayload(data))）
+    僅在記錄實際輸出時才轉為字串，級別被過濾時不做任何格式化；
+    每層最多列出 LOG_PAYLOAD_MAX_ITEMS 項，總長度超過 LOG_PAYLOAD_MAX_CHARS 時截斷
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: Any):
+        self.data = data
+
+    def __str__(self) -> str:
+        return format_payload(
+            self.data,
+            getattr(settings, 'LOG_PAYLOAD_MAX_CHARS', 1000),
+            getattr(settings, 'LOG_PAYLOAD_MAX_ITEMS', 20),
+        )
+
+
+def format_payload(data: Any, max_chars: int = 1000, max_items: int = 20) -> str:
     """
-    配置日誌記錄器
-    
+    將請求內容轉為長度有上限的字串（大型 list / dict 只取前 max_items 項）
+
+    Args:
+        data: 請求內容
+        max_chars: 輸出長度上限（0 為不限）
+        max_items: 每層 list / dict 最多列出的項目數
+
+    Returns:
+        字串
+    """
+    if isinstance(data, str):
+        text = data
+    else:
+        limiter = reprlib.Repr()
+        limiter.maxlevel = 4
+        limiter.maxdict = limiter.maxlist = limiter.maxtuple = limiter.maxset = limiter.maxfrozenset = max_items
+        limiter.maxstring = limiter.maxother = max(max_chars, 40) if max_chars else 100_000
+        text = limiter.repr(data)
+        if isinstance(data, (list, tuple, dict)) and len(data) > max_items:
+            text += f' ({len(data)} items)'
+    if max_chars and len(text) > max_chars:
+        text = f'{text[:max_chars]}...(truncated {len(text) - max_chars} chars)'
+    return text
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """
+    同一進程內使用的 QueueHandler：呼叫端只合併訊息參數（避免之後被修改），
+    保留 exc_info，traceback 與 formatter 皆在 QueueListener 執行緒處理
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def attach_queue(loggers: Iterable[logging.Logger]) -> Optional[QueueListener]:
+    """
+    將 loggers 的 handlers 移至 QueueListener 背景執行緒，各 logger 改為只有一個 QueueHandler
+
+    Args:
+        loggers: 要改為非同步輸出的 logger（沒有 handler 的 logger 維持向上傳遞）
+
+    Returns:
+        QueueListener，沒有任何 handler 時為 None
+    """
+    loggers = [lg for lg in loggers if lg.handlers]
+    handlers = []
+    for lg in loggers:
+        for handler in lg.handlers:
+            if handler not in handlers:
+                handlers.append(handler)
+    if not handlers:
+        return None
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _ThreadQueueHandler(log_queue)
+    for lg in loggers:
+        lg.handlers = [queue_handler]
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    with _listeners_lock:
+        _listeners.append(listener)
+    return listener
+
+
+def _stop_listener(listener: QueueListener) -> None:
+    """停止 QueueListener（先輸出佇列中剩餘的日誌）"""
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+    if listener._thread is not None:
+        listener.stop()
+
+
+def stop_listeners() -> None:
+    """停止所有 QueueListener（程序結束時呼叫）"""
+    for listener in list(_listeners):
+        _stop_listener(listener)
+
+
+def _restart_listeners_after_fork() -> None:
+    """fork 後子進程沒有 listener 執行緒（如 gunicorn --preload），重新啟動以消化繼承的佇列"""
+    for listener in _listeners:
+        listener.start()
+
+
+atexit.register(stop_listeners)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+
+
+def configure_logging(logging_settings: dict) -> None:
+    """
+    Django LOGGING_CONFIG：dictConfig 後，LOG_ASYNC=True 時將 root 與 LOGGING['loggers'] 的 handlers 移至背景執行緒
+
+    Args:
+        logging_settings: settings.LOGGING
+    """
+    global _settings_listener
+    if _settings_listener is not None:
+        _stop_listener(_settings_listener)
+        _settings_listener = None
+    logging.config.dictConfig(logging_settings)
+    if not getattr(settings, 'LOG_ASYNC', True):
+        return
+    names = list(logging_settings.get('loggers', {}))
+    _settings_listener = attach_queue([logging.getLogger()] + [logging.getLogger(name) for name in names])
+
+
+def setup_logger(name: str = 'calculus_oom', log_dir: str = 'logs', level=logging.INFO,
+                 json_format: bool = False, rotation: str = 'time', max_bytes: int = 10 * 1024 * 1024,
+                 backup_count: int = 5):
+    """
+    配置日誌記錄器（檔案 + 控制台，經 QueueListener 背景輸出）
+
     Args:
         name: Logger 名稱
         log_dir: 日誌目錄
         level: 日誌級別
-        
+        json_format: 是否輸出 JSON lines
+        rotation: time（每日午夜分檔）或 size（超過 max_bytes 分檔）
+        max_bytes: size 分檔大小
+        backup_count: 保留的舊檔數
+
     Returns:
         Logger 實例
     """
     # 創建日誌目錄
     log_path = Path(log_dir)
     log_path.mkdir(parents=True, exist_ok=True)
-    
-    # 生成日誌檔案名稱（按日期分檔）
-    today = datetime.now().strftime('%Y-%m-%d')
-    log_file = log_path / f'{name}_{today}.log'
-    
+    log_file = log_path / f'{name}.log'
+
     # 創建 logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # 避免重複添加 handler
     if logger.handlers:
         return logger
-    
+
     # 創建檔案 handler
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    if rotation == 'size':
+        file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    else:
+        file_handler = TimedRotatingFileHandler(log_file, when='midnight', backupCount=backup_count, encoding='utf-8')
     file_handler.setLevel(level)
-    
+
     # 創建控制台 handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
-    
+
     # 創建格式化器
-    formatter = logging.Formatter(
-        '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
+    if json_format:
+        formatter = JsonLineFormatter()
+    else:
+        formatter = logging.Formatter(
+            '[%(asctime)s] %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
-    
-    # 添加 handler
+
+    # 添加 handler，再移至背景執行緒輸出
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
-    
+    attach_queue([logger])
+
     return logger
 
 
 def get_logger(name: str = 'calculus_oom'):
     """
     獲取 Logger 實例
-    
+
     Args:
         name: Logger 名稱
-        
+
     Returns:
         Logger 實例
     """
@@ -0,0 +1,226 @@
+"""
+Prometheus Metrics - /metrics 端點與程序內計數器（需安裝 prometheus_client，未安裝時所有記錄皆為 no-op）
+設定 PROMETHEUS_MULTIPROC_DIR 環境變數時使用 multiprocess 模式，/metrics 彙總所有 gunicorn worker 的數值
+"""
+import functools
+import importlib.util
+import os
+import threading
+from typing import Any, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.http import require_http_methods
+
+from main.utils.response import error_response
+
+# 依延遲分布調整的 bucket（秒）：多數 API 於 50ms 內，圖表 / Excel 可達數秒
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: Optional['_Metrics'] = None
+_metrics_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def is_available() -> bool:
+    """是否已安裝 prometheus_client"""
+    return importlib.util.find_spec('prometheus_client') is not None
+
+
+def is_enabled() -> bool:
+    """PROMETHEUS_METRICS_ENABLED 且已安裝 prometheus_client"""
+    return getattr(settings, 'PROMETHEUS_METRICS_ENABLED', True) and is_available()
+
+
+class _Metrics:
+    """所有 metric 物件（每個進程建立一次）"""
+
+    def __init__(self):
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.request_duration = Histogram(
+            'calculus_http_request_duration_seconds', 'Request latency by URL name',
+            ['endpoint', 'method'], buckets=LATENCY_BUCKETS,
+        )
+        self.requests = Counter(
+            'calculus_http_requests', 'Requests by URL name and status class (2xx/4xx/5xx)',
+            ['endpoint', 'method', 'status'],
+        )
+        self.db_queries = Counter('calculus_db_queries', 'SQL queries by URL name', ['endpoint'])
+        self.db_query_seconds = Counter('calculus_db_query_seconds', 'SQL time by URL name', ['endpoint'])
+        self.db_connections_opened = Counter('calculus_db_connections_opened', 'Database connections opened')
+        self.mongo_commands = Counter('calculus_mongo_commands', 'MongoDB commands by URL name', ['endpoint'])
+        self.mongo_command_seconds = Counter(
+            'calculus_mongo_command_seconds', 'MongoDB command time by URL name', ['endpoint'],
+        )
+        self.mongo_pool_connections = Gauge(
+            'calculus_mongo_pool_connections', 'MongoDB pool connections (open / checked_out)',
+            ['state'], multiprocess_mode='livesum',
+        )
+        self.cache_requests = Counter(
+            'calculus_cache_requests', 'Cache lookups by cache name and result (hit/miss)', ['cache', 'result'],
+        )
+        self.background_tasks = Gauge(
+            'calculus_background_tasks', 'Queued or running background tasks (thread pool / asyncio)',
+            ['kind'], multiprocess_mode='livesum',
+        )
+        self.gridfs_bytes = Counter(
+            'calculus_gridfs_bytes', 'GridFS bytes transferred (upload/download)', ['direction'],
+        )
+        self.chart_render_seconds = Histogram(
+            'calculus_chart_render_seconds', 'Chart rendering time', buckets=LATENCY_BUCKETS,
+        )
+
+
+def _get() -> Optional[_Metrics]:
+    """取得 metric 物件（未啟用時為 None）"""
+    global _metrics
+    if _metrics is None:
+        if not is_enabled():
+            return None
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = _Metrics()
+    return _metrics
+
+
+# ── 記錄（各模組呼叫，未啟用時直接返回）─────────────────────────────────────────
+
+def observe_request(endpoint: str, method: str, status_code: int, request_metrics: Any) -> None:
+    """
+    記錄一個請求（由 RequestMetricsMiddleware 呼叫）
+
+    Args:
+        endpoint: URL name（api/urls.py 的 name），未對應路由時為 'unmatched'
+        method: HTTP 方法
+        status_code: 回應狀態碼
+        request_metrics: request_metrics.RequestMetrics
+    """
+    metrics = _get()
+    if metrics is None:
+        return
+    metrics.request_duration.labels(endpoint, method).observe(request_metrics.elapsed())
+    metrics.requests.labels(endpoint, method, f'{status_code // 100}xx').inc()
+    if request_metrics.sql_count:
+        metrics.db_queries.labels(endpoint).inc(request_metrics.sql_count)
+        metrics.db_query_seconds.labels(endpoint).inc(request_metrics.sql_time)
+    if request_metrics.mongo_count:
+        metrics.mongo_commands.labels(endpoint).inc(request_metrics.mongo_count)
+        metrics.mongo_command_seconds.labels(endpoint).inc(request_metrics.mongo_time)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """記錄快取命中 / 未命中"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.cache_requests.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def record_gridfs_bytes(direction: str, size: int) -> None:
+    """記錄 GridFS 傳輸量（upload / download）"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.gridfs_bytes.labels(direction).inc(size)
+
+
+def record_render(seconds: float) -> None:
+    """記錄圖表繪製時間"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.chart_render_seconds.observe(seconds)
+
+
+def record_db_connection() -> None:
+    """記錄新建立的資料庫連線"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.db_connections_opened.inc()
+
+
+def adjust_mongo_pool(state: str, delta: int) -> None:
+    """調整 MongoDB 連線池連線數（open / checked_out）"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.mongo_pool_connections.labels(state).inc(delta)
+
+
+def adjust_background_tasks(kind: str, delta: int) -> None:
+    """調整排隊 / 執行中的背景工作數（thread / async）"""
+    metrics = _get()
+    if metrics is not None:
+        metrics.background_tasks.labels(kind).inc(delta)
+
+
+def mongo_pool_listener():
+    """PyMongo ConnectionPoolListener：維護 MongoDB 連線池 gauge（需於建立 MongoClient 前註冊）"""
+    from pymongo import monitoring
+
+    class MongoPoolListener(monitoring.ConnectionPoolListener):
+        def pool_created(self, event):
+            pass
+
+        def pool_ready(self, event):
+            pass
+
+        def pool_cleared(self, event):
+            pass
+
+        def pool_closed(self, event):
+            pass
+
+        def connection_created(self, event):
+            adjust_mongo_pool('open', 1)
+
+        def connection_ready(self, event):
+            pass
+
+        def connection_closed(self, event):
+            adjust_mongo_pool('open', -1)
+
+        def connection_check_out_started(self, event):
+            pass
+
+        def connection_check_out_failed(self, event):
+            pass
+
+        def connection_checked_out(self, event):
+            adjust_mongo_pool('checked_out', 1)
+
+        def connection_checked_in(self, event):
+            adjust_mongo_pool('checked_out', -1)
+
+    return MongoPoolListener()
+
+
+def child_exit(server, worker) -> None:
+    """gunicorn child_exit hook：multiprocess 模式下移除已結束 worker 的 live gauge"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR') and is_available():
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+# ── /metrics 端點 ─────────────────────────────────────────────────────────────
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Prometheus 文字格式輸出
+    GET /metrics
+    """
+    if not getattr(settings, 'PROMETHEUS_METRICS_ENABLED', True):
+        return error_response("Metrics disabled", None, 404)
+    if not is_available():
+        return error_response(
+            "prometheus_client not available. Please install: pip install prometheus_client",
+            None,
+            503
+        )
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
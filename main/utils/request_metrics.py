@@ -0,0 +1,248 @@
+"""
+Request Metrics - 每個請求的 SQL / MongoDB / GridFS / 圖表繪製量測
+以 contextvars 記錄目前請求的量測值（sync / async view 皆適用），由 RequestMetricsMiddleware
+輸出結構化日誌欄位與 Server-Timing header，超過門檻時以 WARNING 標記
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from main.utils import prometheus_metrics
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+_installed = False
+
+
+class RequestMetrics:
+    """單一請求的量測值（時間單位：秒）"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.mongo_count = 0
+        self.mongo_time = 0.0
+        self.gridfs_bytes = 0
+        self.render_count = 0
+        self.render_time = 0.0
+        # 超過 SLOW_SQL_QUERY_MS 的查詢（僅保留前幾筆）
+        self.slow_queries: List[Dict[str, Any]] = []
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def as_fields(self) -> Dict[str, Any]:
+        """日誌結構化欄位（毫秒）"""
+        return {
+            'duration_ms': round(self.elapsed() * 1000, 2),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'mongo_count': self.mongo_count,
+            'mongo_ms': round(self.mongo_time * 1000, 2),
+            'gridfs_bytes': self.gridfs_bytes,
+            'render_count': self.render_count,
+            'render_ms': round(self.render_time * 1000, 2),
+        }
+
+    def server_timing(self) -> str:
+        """Server-Timing header 值"""
+        return ', '.join([
+            f'sql;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries"',
+            f'mongo;dur={self.mongo_time * 1000:.2f};desc="{self.mongo_count} ops"',
+            f'gridfs;desc="{self.gridfs_bytes} bytes"',
+            f'render;dur={self.render_time * 1000:.2f}',
+            f'total;dur={self.elapsed() * 1000:.2f}',
+        ])
+
+
+def current() -> Optional[RequestMetrics]:
+    """目前請求的量測值（不在請求中時為 None）"""
+    return _current.get()
+
+
+def record_gridfs_bytes(direction: str, size: int) -> None:
+    """記錄 GridFS 上傳 / 下載（direction: upload / download）的位元組數"""
+    prometheus_metrics.record_gridfs_bytes(direction, size)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.gridfs_bytes += size
+
+
+@contextmanager
+def track_render():
+    """量測圖表繪製時間"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - started
+        prometheus_metrics.record_render(duration)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.render_count += 1
+            metrics.render_time += duration
+
+
+def _sql_execute_wrapper(execute, sql, params, many, context):
+    """Django execute_wrapper：累計 SQL 次數與時間，記錄慢查詢"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        metrics.sql_count += 1
+        metrics.sql_time += duration
+        if (duration * 1000 >= getattr(settings, 'SLOW_SQL_QUERY_MS', 200)
+                and len(metrics.slow_queries) < 5):
+            metrics.slow_queries.append({'sql': sql[:500], 'ms': round(duration * 1000, 2)})
+
+
+def _attach_sql_wrapper(sender, connection, **kwargs):
+    """每條新建立的資料庫連線加入 execute_wrapper（連線物件為各執行緒獨立）"""
+    prometheus_metrics.record_db_connection()
+    if _sql_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_sql_execute_wrapper)
+
+
+def _mongo_listener():
+    """PyMongo CommandListener：累計 MongoDB 指令次數與時間（sync / async client 皆適用）"""
+    from pymongo import monitoring
+
+    class MongoCommandListener(monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            self._record(event)
+
+        def failed(self, event):
+            self._record(event)
+
+        @staticmethod
+        def _record(event):
+            metrics = _current.get()
+            if metrics is not None:
+                metrics.mongo_count += 1
+                metrics.mongo_time += event.duration_micros / 1_000_000
+
+    return MongoCommandListener()
+
+
+def install() -> None:
+    """
+    註冊 SQL execute_wrapper 與 MongoDB 指令 / 連線池監聽（AppConfig.ready 呼叫，需早於建立 MongoClient）
+    REQUEST_METRICS_ENABLED=False 時不註冊
+    """
+    global _installed
+    if _installed or not getattr(settings, 'REQUEST_METRICS_ENABLED', True):
+        return
+    _installed = True
+    connection_created.connect(_attach_sql_wrapper, dispatch_uid='request_metrics_sql')
+    try:
+        from pymongo import monitoring
+    except ImportError:
+        return
+    monitoring.register(_mongo_listener())
+    if prometheus_metrics.is_enabled():
+        monitoring.register(prometheus_metrics.mongo_pool_listener())
+
+
+class RequestMetricsMiddleware:
+    """
+    請求量測 Middleware（sync / async 皆可）
+    回應加上 Server-Timing header，並記錄一筆含量測欄位的日誌；超過門檻時以 WARNING 記錄並列出原因；
+    同時依 URL name 更新 Prometheus 延遲 / 錯誤率計數
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        token = _current.set(RequestMetrics())
+        try:
+            response = self.get_response(request)
+            self._finish(request, response, _current.get())
+            return response
+        finally:
+            _current.reset(token)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        token = _current.set(RequestMetrics())
+        try:
+            response = await self.get_response(request)
+            self._finish(request, response, _current.get())
+            return response
+        finally:
+            _current.reset(token)
+
+    @staticmethod
+    def slow_reasons(metrics: RequestMetrics) -> List[str]:
+        """超過門檻的項目"""
+        reasons = []
+        if metrics.elapsed() * 1000 >= getattr(settings, 'SLOW_REQUEST_MS', 1000):
+            reasons.append('duration')
+        if metrics.sql_count >= getattr(settings, 'SLOW_REQUEST_SQL_COUNT', 50):
+            reasons.append('sql_count')
+        if metrics.mongo_count >= getattr(settings, 'SLOW_REQUEST_MONGO_COUNT', 20):
+            reasons.append('mongo_count')
+        if metrics.slow_queries:
+            reasons.append('slow_query')
+        return reasons
+
+    @staticmethod
+    def _finish(request, response, metrics: RequestMetrics) -> None:
+        match = getattr(request, 'resolver_match', None)
+        endpoint = (match.url_name if match is not None else None) or 'unmatched'
+        prometheus_metrics.observe_request(endpoint, request.method, response.status_code, metrics)
+
+        if getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True):
+            response['Server-Timing'] = metrics.server_timing()
+
+        reasons = RequestMetricsMiddleware.slow_reasons(metrics)
+        if not reasons and not logger.isEnabledFor(logging.INFO):
+            return
+        fields = metrics.as_fields()
+        extra = {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': endpoint,
+            'status': response.status_code,
+            'slow': reasons,
+            **fields,
+        }
+        summary = ' '.join(f'{key}={value}' for key, value in fields.items())
+        if reasons:
+            extra['slow_queries'] = metrics.slow_queries
+            logger.warning(
+                "Slow request %s %s %s [%s] %s",
+                request.method, request.path, response.status_code, ','.join(reasons), summary,
+                extra={'request_metrics': extra},
+            )
+        else:
+            logger.info(
+                "%s %s %s %s", request.method, request.path, response.status_code, summary,
+                extra={'request_metrics': extra},
+            )